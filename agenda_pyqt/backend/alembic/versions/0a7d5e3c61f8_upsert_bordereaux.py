@@ -0,0 +1,61 @@
+"""upsert_bordereaux
+
+Revision ID: 0a7d5e3c61f8
+Revises: f2c84a61e907
+Create Date: 2026-10-18 18:15:22.671904
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7d5e3c61f8'
+down_revision: Union[str, None] = 'f2c84a61e907'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQL_REPETIDOS = """
+    SELECT numero_poliza, coalesce(endoso, '') AS endoso, fecha_inicio, array_agg(id ORDER BY id) AS ids
+    FROM movimientos_vigencias
+    GROUP BY 1, 2, 3
+    HAVING count(*) > 1
+    ORDER BY 1, 2, 3
+"""
+MAXIMO_LISTADOS = 50
+
+
+def _verificar_repetidos() -> None:
+    """
+    Detiene la migración si hay movimientos con la misma póliza, endoso e inicio,
+    listando cuáles: hay que decidir a mano cuál queda antes de crear el índice único.
+    """
+    if context.is_offline_mode():
+        # Con --sql no hay datos que revisar: se debe correr SQL_REPETIDOS antes del script
+        return
+    repetidos = op.get_bind().execute(sa.text(SQL_REPETIDOS)).all()
+    if not repetidos:
+        return
+    lineas = [
+        f"  póliza {fila.numero_poliza}, endoso '{fila.endoso}', inicio {fila.fecha_inicio}: ids {list(fila.ids)}"
+        for fila in repetidos[:MAXIMO_LISTADOS]
+    ]
+    if len(repetidos) > MAXIMO_LISTADOS:
+        lineas.append(f"  ... y {len(repetidos) - MAXIMO_LISTADOS} más")
+    raise RuntimeError(
+        f"Hay {len(repetidos)} grupos de movimientos con la misma póliza, endoso y fecha de inicio; "
+        "elimine o corrija los sobrantes y vuelva a aplicar la migración:\n" + "\n".join(lineas)
+    )
+
+
+def upgrade() -> None:
+    _verificar_repetidos()
+    op.create_index('uq_movimientos_poliza_endoso_inicio', 'movimientos_vigencias',
+                    ['numero_poliza', sa.text("coalesce(endoso, '')"), 'fecha_inicio'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_movimientos_poliza_endoso_inicio', table_name='movimientos_vigencias')
@@ -0,0 +1,40 @@
+"""indices_filtros_movimientos
+
+Revision ID: 125b07817132
+Revises: 9683c8c64771
+Create Date: 2026-10-18 15:20:11.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '125b07817132'
+down_revision: Union[str, None] = '9683c8c64771'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_movimientos_corredor_vencimiento', 'movimientos_vigencias',
+                    ['corredor_id', 'fecha_vencimiento'], unique=False)
+    op.create_index('ix_movimientos_corredor_inicio', 'movimientos_vigencias',
+                    ['corredor_id', 'fecha_inicio'], unique=False)
+    op.create_index('ix_movimientos_tipo_seguro_vencimiento', 'movimientos_vigencias',
+                    ['tipo_seguro_id', 'fecha_vencimiento'], unique=False)
+    op.create_index('ix_movimientos_cliente_id', 'movimientos_vigencias',
+                    ['cliente_id', 'id'], unique=False)
+    op.create_index('ix_movimientos_poliza_prefijo', 'movimientos_vigencias',
+                    ['numero_poliza', 'endoso'], unique=False,
+                    postgresql_ops={'numero_poliza': 'text_pattern_ops', 'endoso': 'text_pattern_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_movimientos_poliza_prefijo', table_name='movimientos_vigencias')
+    op.drop_index('ix_movimientos_cliente_id', table_name='movimientos_vigencias')
+    op.drop_index('ix_movimientos_tipo_seguro_vencimiento', table_name='movimientos_vigencias')
+    op.drop_index('ix_movimientos_corredor_inicio', table_name='movimientos_vigencias')
+    op.drop_index('ix_movimientos_corredor_vencimiento', table_name='movimientos_vigencias')
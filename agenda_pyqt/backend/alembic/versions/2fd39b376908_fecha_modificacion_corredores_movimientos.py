@@ -0,0 +1,40 @@
+"""fecha_modificacion_corredores_movimientos
+
+Revision ID: 2fd39b376908
+Revises: ddbca5cfcbd3
+Create Date: 2026-10-18 11:40:03.518214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2fd39b376908'
+down_revision: Union[str, None] = 'ddbca5cfcbd3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('corredores', sa.Column('fecha_modificacion', sa.DateTime(timezone=True),
+                                          server_default=sa.func.now(), nullable=False))
+    op.create_index(op.f('ix_corredores_fecha_modificacion'), 'corredores', ['fecha_modificacion'], unique=False)
+    op.add_column('movimientos_vigencias', sa.Column('fecha_modificacion', sa.DateTime(timezone=True),
+                                                     server_default=sa.func.now(), nullable=False))
+    op.create_index(op.f('ix_movimientos_vigencias_fecha_modificacion'), 'movimientos_vigencias',
+                    ['fecha_modificacion'], unique=False)
+    op.create_index(op.f('ix_clientes_fecha_modificacion'), 'clientes', ['fecha_modificacion'], unique=False)
+    op.create_index('ix_clientes_corredor_fecha_modificacion', 'clientes',
+                    ['corredor', 'fecha_modificacion'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_clientes_corredor_fecha_modificacion', table_name='clientes')
+    op.drop_index(op.f('ix_clientes_fecha_modificacion'), table_name='clientes')
+    op.drop_index(op.f('ix_movimientos_vigencias_fecha_modificacion'), table_name='movimientos_vigencias')
+    op.drop_column('movimientos_vigencias', 'fecha_modificacion')
+    op.drop_index(op.f('ix_corredores_fecha_modificacion'), table_name='corredores')
+    op.drop_column('corredores', 'fecha_modificacion')
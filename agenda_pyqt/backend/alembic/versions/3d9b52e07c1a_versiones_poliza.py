@@ -0,0 +1,76 @@
+"""versiones_poliza
+
+Revision ID: 3d9b52e07c1a
+Revises: 0a7d5e3c61f8
+Create Date: 2026-10-18 19:02:47.318520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9b52e07c1a'
+down_revision: Union[str, None] = '0a7d5e3c61f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('movimientos_vigencias', sa.Column('version_anterior_id', sa.Integer(), nullable=True))
+    op.add_column('movimientos_vigencias',
+                  sa.Column('actual', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+    op.create_foreign_key('movimientos_vigencias_version_anterior_id_fkey', 'movimientos_vigencias',
+                          'movimientos_vigencias', ['version_anterior_id'], ['id'], ondelete='SET NULL')
+    # Cadena inicial de cada póliza (por inicio de vigencia y alta); a partir de
+    # aquí la mantiene la aplicación
+    op.execute("""
+        UPDATE movimientos_vigencias AS m
+        SET version_anterior_id = v.anterior, actual = v.actual
+        FROM (
+            SELECT id,
+                   lag(id) OVER (PARTITION BY numero_poliza ORDER BY fecha_inicio, id) AS anterior,
+                   row_number() OVER (PARTITION BY numero_poliza ORDER BY fecha_inicio DESC, id DESC) = 1 AS actual
+            FROM movimientos_vigencias
+        ) AS v
+        WHERE m.id = v.id
+    """)
+    # El resumen de vencimientos pasa a contar sólo las versiones actuales
+    op.execute("DELETE FROM vencimientos_diarios")
+    op.execute("""
+        INSERT INTO vencimientos_diarios (fecha, corredor, moneda, cantidad, total_prima)
+        SELECT fecha_vencimiento, COALESCE(corredor_id, 0), COALESCE(moneda, ''),
+               count(*), COALESCE(sum(prima), 0)
+        FROM movimientos_vigencias
+        WHERE actual
+        GROUP BY 1, 2, 3
+    """)
+    # Una sola versión actual por póliza mientras la tabla no esté particionada: la
+    # partición (8e4f1b6c2d93) lo reemplaza por un índice no único y desde ahí la
+    # unicidad depende del bloqueo consultivo de models.version_poliza
+    op.create_index('uq_movimientos_poliza_actual', 'movimientos_vigencias', ['numero_poliza'], unique=True,
+                    postgresql_where=sa.text('actual'))
+    op.create_index('ix_movimientos_actuales_vencimiento', 'movimientos_vigencias', ['fecha_vencimiento'],
+                    unique=False, postgresql_where=sa.text('actual'))
+    op.create_index('ix_movimientos_version_anterior', 'movimientos_vigencias', ['version_anterior_id'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_movimientos_version_anterior', table_name='movimientos_vigencias')
+    op.drop_index('ix_movimientos_actuales_vencimiento', table_name='movimientos_vigencias')
+    op.drop_index('uq_movimientos_poliza_actual', table_name='movimientos_vigencias')
+    op.drop_constraint('movimientos_vigencias_version_anterior_id_fkey', 'movimientos_vigencias',
+                       type_='foreignkey')
+    op.drop_column('movimientos_vigencias', 'actual')
+    op.execute("DELETE FROM vencimientos_diarios")
+    op.execute("""
+        INSERT INTO vencimientos_diarios (fecha, corredor, moneda, cantidad, total_prima)
+        SELECT fecha_vencimiento, COALESCE(corredor_id, 0), COALESCE(moneda, ''),
+               count(*), COALESCE(sum(prima), 0)
+        FROM movimientos_vigencias
+        GROUP BY 1, 2, 3
+    """)
+    op.drop_column('movimientos_vigencias', 'version_anterior_id')
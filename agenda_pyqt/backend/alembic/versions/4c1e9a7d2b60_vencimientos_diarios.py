@@ -0,0 +1,44 @@
+"""vencimientos_diarios
+
+Revision ID: 4c1e9a7d2b60
+Revises: 125b07817132
+Create Date: 2026-10-18 15:41:37.206118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1e9a7d2b60'
+down_revision: Union[str, None] = '125b07817132'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_movimientos_fecha_vencimiento', 'movimientos_vigencias',
+                    ['fecha_vencimiento'], unique=False)
+    op.create_table('vencimientos_diarios',
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('corredor', sa.Integer(), nullable=False),
+        sa.Column('moneda', sa.String(length=10), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.Column('total_prima', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('fecha', 'corredor', 'moneda')
+    )
+    # Carga inicial del resumen; a partir de aquí lo mantiene la aplicación
+    op.execute("""
+        INSERT INTO vencimientos_diarios (fecha, corredor, moneda, cantidad, total_prima)
+        SELECT fecha_vencimiento, COALESCE(corredor_id, 0), COALESCE(moneda, ''),
+               count(*), COALESCE(sum(prima), 0)
+        FROM movimientos_vigencias
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('vencimientos_diarios')
+    op.drop_index('ix_movimientos_fecha_vencimiento', table_name='movimientos_vigencias')
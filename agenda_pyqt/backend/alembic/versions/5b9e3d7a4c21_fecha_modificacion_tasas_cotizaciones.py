@@ -0,0 +1,31 @@
+"""fecha_modificacion_tasas_cotizaciones
+
+Revision ID: 5b9e3d7a4c21
+Revises: 8e4f1b6c2d93
+Create Date: 2026-10-18 21:34:12.806415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9e3d7a4c21'
+down_revision: Union[str, None] = '8e4f1b6c2d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Las liquidaciones de comisiones guardadas se validan con la última modificación de estas tablas
+    op.add_column('tasas_comision', sa.Column('fecha_modificacion', sa.DateTime(timezone=True),
+                                              server_default=sa.text('now()'), nullable=False))
+    op.add_column('tipos_cambio', sa.Column('fecha_modificacion', sa.DateTime(timezone=True),
+                                            server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('tipos_cambio', 'fecha_modificacion')
+    op.drop_column('tasas_comision', 'fecha_modificacion')
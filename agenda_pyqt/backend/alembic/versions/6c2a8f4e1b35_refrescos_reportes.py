@@ -0,0 +1,32 @@
+"""refrescos_reportes
+
+Revision ID: 6c2a8f4e1b35
+Revises: 5b9e3d7a4c21
+Create Date: 2026-10-18 22:10:47.214903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2a8f4e1b35'
+down_revision: Union[str, None] = '5b9e3d7a4c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Firma del último refresco de cada vista de reportes, compartida por todos los procesos
+    op.create_table('refrescos_reportes',
+        sa.Column('vista', sa.String(length=63), nullable=False),
+        sa.Column('firma', sa.BigInteger(), nullable=False),
+        sa.Column('fecha', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('vista')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('refrescos_reportes')
@@ -0,0 +1,41 @@
+"""reporte_produccion_mensual
+
+Revision ID: 7a3f0c95e4d1
+Revises: 4c1e9a7d2b60
+Create Date: 2026-10-18 16:05:12.530411
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3f0c95e4d1'
+down_revision: Union[str, None] = '4c1e9a7d2b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS reporte_produccion_mensual AS
+        SELECT date_trunc('month', fecha_inicio)::date AS mes,
+               COALESCE(corredor_id, 0) AS corredor,
+               tipo_seguro_id,
+               COALESCE(moneda, '') AS moneda,
+               count(*) AS cantidad,
+               COALESCE(sum(prima), 0) AS total_prima,
+               COALESCE(sum(suma_asegurada), 0) AS total_suma_asegurada
+        FROM movimientos_vigencias
+        GROUP BY 1, 2, 3, 4
+    """)
+    # Requerido por REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_reporte_produccion_mensual_clave "
+        "ON reporte_produccion_mensual (mes, corredor, tipo_seguro_id, moneda)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS reporte_produccion_mensual")
@@ -0,0 +1,193 @@
+"""particionar_movimientos
+
+Revision ID: 8e4f1b6c2d93
+Revises: 3d9b52e07c1a
+Create Date: 2026-10-18 20:11:05.542187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4f1b6c2d93'
+down_revision: Union[str, None] = '3d9b52e07c1a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNAS = (
+    "id, cliente_id, corredor_id, tipo_seguro_id, carpeta, numero_poliza, endoso, fecha_inicio, "
+    "fecha_vencimiento, moneda, suma_asegurada, prima, comision, cuotas, observaciones, "
+    "version_anterior_id, actual, fecha_modificacion"
+)
+
+SQL_VISTA = """
+    CREATE MATERIALIZED VIEW reporte_produccion_mensual AS
+    SELECT date_trunc('month', fecha_inicio)::date AS mes,
+           COALESCE(corredor_id, 0) AS corredor,
+           tipo_seguro_id,
+           COALESCE(moneda, '') AS moneda,
+           count(*) AS cantidad,
+           COALESCE(sum(prima), 0) AS total_prima,
+           COALESCE(sum(suma_asegurada), 0) AS total_suma_asegurada
+    FROM movimientos_vigencias
+    GROUP BY 1, 2, 3, 4
+"""
+
+
+def _columnas():
+    return [
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cliente_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('corredor_id', sa.Integer(), nullable=True),
+        sa.Column('tipo_seguro_id', sa.Integer(), nullable=False),
+        sa.Column('carpeta', sa.String(length=100), nullable=True),
+        sa.Column('numero_poliza', sa.String(length=100), nullable=False),
+        sa.Column('endoso', sa.String(length=100), nullable=True),
+        sa.Column('fecha_inicio', sa.Date(), nullable=False),
+        sa.Column('fecha_vencimiento', sa.Date(), nullable=False),
+        sa.Column('moneda', sa.String(length=10), nullable=True),
+        sa.Column('suma_asegurada', sa.Float(), nullable=False),
+        sa.Column('prima', sa.Float(), nullable=False),
+        sa.Column('comision', sa.Float(), nullable=True),
+        sa.Column('cuotas', sa.Integer(), nullable=True),
+        sa.Column('observaciones', sa.String(length=500), nullable=True),
+        sa.Column('version_anterior_id', sa.Integer(), nullable=True),
+        sa.Column('actual', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+        sa.Column('fecha_modificacion', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+                  nullable=False),
+        sa.ForeignKeyConstraint(['cliente_id'], ['clientes.id']),
+        sa.ForeignKeyConstraint(['corredor_id'], ['corredores.numero']),
+        sa.ForeignKeyConstraint(['tipo_seguro_id'], ['tipos_de_seguros.Id_tipo']),
+    ]
+
+
+def _apartar_tabla(nombre: str) -> None:
+    """Renombra movimientos_vigencias y sus índices para liberar los nombres."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS reporte_produccion_mensual")
+    op.rename_table('movimientos_vigencias', nombre)
+    op.execute(f"""
+        DO $$
+        DECLARE indice record;
+        BEGIN
+            FOR indice IN SELECT indexname FROM pg_indexes WHERE tablename = '{nombre}' LOOP
+                EXECUTE format('ALTER INDEX %I RENAME TO %I', indice.indexname,
+                               left(indice.indexname, 50) || '_anterior');
+            END LOOP;
+        END $$
+    """)
+
+
+def _tomar_secuencia(anterior: str) -> None:
+    """La nueva tabla sigue numerando con la secuencia de la anterior, que pasa a ser suya."""
+    op.execute(f"""
+        DO $$
+        DECLARE secuencia text := pg_get_serial_sequence('{anterior}', 'id');
+        BEGIN
+            EXECUTE format('ALTER TABLE movimientos_vigencias ALTER COLUMN id SET DEFAULT nextval(%L)', secuencia);
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY movimientos_vigencias.id', secuencia);
+        END $$
+    """)
+
+
+def _crear_indices(particionada: bool) -> None:
+    op.create_index('ix_movimientos_vigencias_id', 'movimientos_vigencias', ['id'], unique=False)
+    op.create_index('ix_movimientos_vigencias_fecha_modificacion', 'movimientos_vigencias',
+                    ['fecha_modificacion'], unique=False)
+    op.create_index('ix_movimientos_fecha_vencimiento', 'movimientos_vigencias', ['fecha_vencimiento'],
+                    unique=False)
+    op.create_index('ix_movimientos_corredor_vencimiento', 'movimientos_vigencias',
+                    ['corredor_id', 'fecha_vencimiento'], unique=False)
+    op.create_index('ix_movimientos_corredor_inicio', 'movimientos_vigencias',
+                    ['corredor_id', 'fecha_inicio'], unique=False)
+    op.create_index('ix_movimientos_fecha_inicio', 'movimientos_vigencias', ['fecha_inicio'], unique=False)
+    op.create_index('ix_movimientos_tipo_seguro_vencimiento', 'movimientos_vigencias',
+                    ['tipo_seguro_id', 'fecha_vencimiento'], unique=False)
+    op.create_index('ix_movimientos_cliente_id', 'movimientos_vigencias', ['cliente_id', 'id'], unique=False)
+    op.create_index('ix_movimientos_poliza_prefijo', 'movimientos_vigencias', ['numero_poliza', 'endoso'],
+                    unique=False,
+                    postgresql_ops={'numero_poliza': 'text_pattern_ops', 'endoso': 'text_pattern_ops'})
+    op.create_index('uq_movimientos_poliza_endoso_inicio', 'movimientos_vigencias',
+                    ['numero_poliza', sa.text("coalesce(endoso, '')"), 'fecha_inicio'], unique=True)
+    op.create_index('ix_movimientos_actuales_vencimiento', 'movimientos_vigencias', ['fecha_vencimiento'],
+                    unique=False, postgresql_where=sa.text('actual'))
+    op.create_index('ix_movimientos_version_anterior', 'movimientos_vigencias', ['version_anterior_id'],
+                    unique=False)
+    if particionada:
+        # Sin la columna de partición no puede ser único: una sola versión actual por
+        # póliza queda a cargo del bloqueo consultivo de models.version_poliza
+        op.create_index('ix_movimientos_poliza_actual', 'movimientos_vigencias', ['numero_poliza'],
+                        unique=False, postgresql_where=sa.text('actual'))
+    else:
+        op.create_index('uq_movimientos_poliza_actual', 'movimientos_vigencias', ['numero_poliza'],
+                        unique=True, postgresql_where=sa.text('actual'))
+
+
+def _crear_vista() -> None:
+    op.execute(SQL_VISTA)
+    op.execute(
+        "CREATE UNIQUE INDEX ix_reporte_produccion_mensual_clave "
+        "ON reporte_produccion_mensual (mes, corredor, tipo_seguro_id, moneda)"
+    )
+
+
+def upgrade() -> None:
+    _apartar_tabla('movimientos_vigencias_sin_particionar')
+
+    # La clave primaria de una tabla particionada debe incluir la columna de partición
+    op.create_table('movimientos_vigencias', *_columnas(),
+                    sa.PrimaryKeyConstraint('id', 'fecha_inicio'),
+                    postgresql_partition_by='RANGE (fecha_inicio)')
+    _tomar_secuencia('movimientos_vigencias_sin_particionar')
+
+    # Una partición por año con datos hasta dos años después del actual, más la DEFAULT
+    # (a partir de aquí las nuevas las crea la aplicación al iniciar, ver crud.particiones)
+    op.execute("""
+        DO $$
+        DECLARE
+            actual integer := extract(year FROM current_date);
+            anio integer;
+        BEGIN
+            FOR anio IN
+                SELECT generate_series(
+                    least(coalesce(min(extract(year FROM fecha_inicio))::integer, actual), actual),
+                    greatest(coalesce(max(extract(year FROM fecha_inicio))::integer, actual), actual + 2)
+                )
+                FROM movimientos_vigencias_sin_particionar
+            LOOP
+                EXECUTE format('CREATE TABLE %I PARTITION OF movimientos_vigencias FOR VALUES FROM (%L) TO (%L)',
+                               'movimientos_vigencias_' || anio, make_date(anio, 1, 1), make_date(anio + 1, 1, 1));
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE movimientos_vigencias_default PARTITION OF movimientos_vigencias DEFAULT")
+
+    op.execute(f"INSERT INTO movimientos_vigencias ({COLUMNAS}) "
+               f"SELECT {COLUMNAS} FROM movimientos_vigencias_sin_particionar")
+    # CASCADE quita también la clave foránea de cuotas.movimiento_id: una tabla
+    # particionada sólo puede ser referenciada por su clave primaria completa
+    op.execute("DROP TABLE movimientos_vigencias_sin_particionar CASCADE")
+
+    _crear_indices(particionada=True)
+    op.execute("ANALYZE movimientos_vigencias")
+    _crear_vista()
+
+
+def downgrade() -> None:
+    _apartar_tabla('movimientos_vigencias_particionada')
+
+    op.create_table('movimientos_vigencias', *_columnas(), sa.PrimaryKeyConstraint('id'))
+    _tomar_secuencia('movimientos_vigencias_particionada')
+    op.execute(f"INSERT INTO movimientos_vigencias ({COLUMNAS}) "
+               f"SELECT {COLUMNAS} FROM movimientos_vigencias_particionada")
+    op.execute("DROP TABLE movimientos_vigencias_particionada CASCADE")
+
+    _crear_indices(particionada=False)
+    op.create_foreign_key('movimientos_vigencias_version_anterior_id_fkey', 'movimientos_vigencias',
+                          'movimientos_vigencias', ['version_anterior_id'], ['id'], ondelete='SET NULL')
+    op.create_foreign_key('cuotas_movimiento_id_fkey', 'cuotas', 'movimientos_vigencias',
+                          ['movimiento_id'], ['id'], ondelete='CASCADE')
+    _crear_vista()
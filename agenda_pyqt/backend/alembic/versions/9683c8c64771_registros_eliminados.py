@@ -0,0 +1,35 @@
+"""registros_eliminados
+
+Revision ID: 9683c8c64771
+Revises: 2fd39b376908
+Create Date: 2026-10-18 12:26:51.907342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9683c8c64771'
+down_revision: Union[str, None] = '2fd39b376908'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('registros_eliminados',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('tabla', sa.String(length=50), nullable=False),
+        sa.Column('registro_id', sa.String(length=64), nullable=False),
+        sa.Column('fecha_eliminacion', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_registros_eliminados_fecha_eliminacion'), 'registros_eliminados',
+                    ['fecha_eliminacion'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_registros_eliminados_fecha_eliminacion'), table_name='registros_eliminados')
+    op.drop_table('registros_eliminados')
@@ -0,0 +1,40 @@
+"""tasas_comision
+
+Revision ID: b3e61d2f7a58
+Revises: 7a3f0c95e4d1
+Create Date: 2026-10-18 16:40:37.114260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e61d2f7a58'
+down_revision: Union[str, None] = '7a3f0c95e4d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tasas_comision',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('corredor', sa.Integer(), nullable=True),
+        sa.Column('tipo_seguro_id', sa.Integer(), nullable=False),
+        sa.Column('porcentaje', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['corredor'], ['corredores.numero'], ),
+        sa.ForeignKeyConstraint(['tipo_seguro_id'], ['tipos_de_seguros.Id_tipo'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('corredor', 'tipo_seguro_id', name='uq_tasas_comision_corredor_tipo')
+    )
+    op.create_index(op.f('ix_tasas_comision_id'), 'tasas_comision', ['id'], unique=False)
+    op.create_index('ix_movimientos_fecha_inicio', 'movimientos_vigencias', ['fecha_inicio'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_movimientos_fecha_inicio', table_name='movimientos_vigencias')
+    op.drop_index(op.f('ix_tasas_comision_id'), table_name='tasas_comision')
+    op.drop_table('tasas_comision')
@@ -0,0 +1,43 @@
+"""indices_busqueda_clientes
+
+Revision ID: ddbca5cfcbd3
+Revises: d8107de5e4bb
+Create Date: 2026-10-18 09:12:41.203518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ddbca5cfcbd3'
+down_revision: Union[str, None] = 'd8107de5e4bb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() no es IMMUTABLE, por lo que no puede usarse directamente en un índice
+    op.execute("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text AS
+        $$ SELECT public.unaccent('public.unaccent', $1) $$
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_clientes_busqueda_trgm ON clientes
+        USING gin (f_unaccent(lower(nombres || ' ' || apellidos || ' ' || numero_documento || ' ' || mail)) gin_trgm_ops)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_clientes_documento_trgm ON clientes
+        USING gin (regexp_replace(numero_documento, '[^0-9A-Za-z]', '', 'g') gin_trgm_ops)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_clientes_documento_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_clientes_busqueda_trgm")
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
@@ -0,0 +1,61 @@
+"""cuotas
+
+Revision ID: e5a0c7d93b14
+Revises: b3e61d2f7a58
+Create Date: 2026-10-18 17:12:48.903127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a0c7d93b14'
+down_revision: Union[str, None] = 'b3e61d2f7a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('cuotas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('movimiento_id', sa.Integer(), nullable=False),
+        sa.Column('numero', sa.Integer(), nullable=False),
+        sa.Column('monto', sa.Float(), nullable=False),
+        sa.Column('fecha_vencimiento', sa.Date(), nullable=False),
+        sa.Column('pagada', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+        sa.Column('fecha_pago', sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(['movimiento_id'], ['movimientos_vigencias.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('movimiento_id', 'numero', name='uq_cuotas_movimiento_numero')
+    )
+    # Plan de cuotas de los movimientos existentes. Como hasta ahora no se
+    # registraban los cobros, las cuotas ya vencidas se dan por pagadas.
+    op.execute("""
+        INSERT INTO cuotas (movimiento_id, numero, monto, fecha_vencimiento, pagada)
+        SELECT id, numero,
+               CASE WHEN numero = cantidad
+                    THEN prima - round((prima / cantidad)::numeric, 2) * (cantidad - 1)
+                    ELSE round((prima / cantidad)::numeric, 2) END,
+               vencimiento,
+               vencimiento < current_date
+        FROM (
+            SELECT id, prima, cantidad, numero,
+                   (fecha_inicio + make_interval(0, numero - 1))::date AS vencimiento
+            FROM (
+                SELECT id, prima, fecha_inicio,
+                       greatest(coalesce(cuotas, 1), 1) AS cantidad,
+                       generate_series(1, greatest(coalesce(cuotas, 1), 1)) AS numero
+                FROM movimientos_vigencias
+            ) AS expandidos
+        ) AS cuotas_movimientos
+    """)
+    op.create_index('ix_cuotas_pendientes_vencimiento', 'cuotas', ['fecha_vencimiento'], unique=False,
+                    postgresql_where=sa.text('NOT pagada'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cuotas_pendientes_vencimiento', table_name='cuotas')
+    op.drop_table('cuotas')
@@ -0,0 +1,31 @@
+"""tipos_cambio
+
+Revision ID: f2c84a61e907
+Revises: e5a0c7d93b14
+Create Date: 2026-10-18 17:46:05.338412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c84a61e907'
+down_revision: Union[str, None] = 'e5a0c7d93b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tipos_cambio',
+        sa.Column('moneda', sa.String(length=10), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('valor', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('moneda', 'fecha')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('tipos_cambio')
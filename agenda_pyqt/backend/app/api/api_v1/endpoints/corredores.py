@@ -1,12 +1,24 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from ....db.session import get_db
 from .... import models, schemas
 from ....core.security import get_current_user
+from ....core.paginacion import paginar_con_total, agregar_headers_total
+from ....core.etag import agregar_versiones, calcular_etag, etag_pagina, no_modificado
+from ....core.campos import parsear_campos, seleccionar_campos, respuesta_campos
+from ....core.serializacion import respuesta_lista
+from ....crud.corredores import cache_corredores, get_resumen_corredor
 
 router = APIRouter()
 
+# Campos que admite el parámetro fields del listado de corredores
+CAMPOS_CORREDOR = {
+    campo: getattr(models.Corredor, campo)
+    for campo in schemas.Corredor.model_fields
+    if campo != "movimientos"
+}
+
 @router.post("/", response_model=schemas.Corredor)
 def create_corredor(
     corredor: schemas.CorredorCreate,
@@ -26,50 +38,94 @@ def create_corredor(
     db_corredor = models.Corredor(**corredor.model_dump())
     db.add(db_corredor)
     db.commit()
+    cache_corredores.invalidar()
     db.refresh(db_corredor)
     return db_corredor
 
 @router.get("/", response_model=List[schemas.Corredor])
 def read_corredores(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas, ej: apellidos,mail"),
     db: Session = Depends(get_db),
     current_user: models.Usuario = Depends(get_current_user)
 ):
-    """Obtener lista de corredores"""
-    corredores = db.query(models.Corredor).offset(skip).limit(limit).all()
-    return [
-        schemas.Corredor(
-            numero=corredor.numero,
-            nombres=corredor.nombres,
-            apellidos=corredor.apellidos,
-            documento=corredor.documento,
-            direccion=corredor.direccion,
-            localidad=corredor.localidad,
-            telefonos=corredor.telefonos,
-            movil=corredor.movil,
-            mail=corredor.mail,
-            observaciones=corredor.observaciones,
-            movimientos=[]  # Lista vacía por defecto
+    """
+    Obtener lista de corredores (el total se devuelve en el header X-Total-Count).
+    Con fields sólo se leen y devuelven esos campos (numero se incluye siempre).
+    Admite If-None-Match: si no hubo cambios devuelve 304.
+    Cada página se guarda en memoria (con su ETag) hasta que se modifica un
+    corredor o vence REFERENCIAS_CACHE_SEGUNDOS, sin consultar la base.
+    """
+    campos = parsear_campos(fields, CAMPOS_CORREDOR, "numero")
+
+    def cargar():
+        query = db.query(models.Corredor).order_by(models.Corredor.numero)
+        # Leer sólo columnas (sin objetos ORM): todas o las pedidas en fields
+        query = seleccionar_campos(query, CAMPOS_CORREDOR, campos or list(CAMPOS_CORREDOR))
+        filas, total, estimado = paginar_con_total(
+            db, agregar_versiones(query, models.Corredor.fecha_modificacion), skip, limit
         )
-        for corredor in corredores
-    ]
+        return etag_pagina(filas, "numero", skip, limit, campos, total), filas, total, estimado
+
+    etag, corredores, total, estimado = cache_corredores.obtener((skip, limit, tuple(campos or ())), cargar)
+    respuesta_304 = no_modificado(request, etag)
+    if respuesta_304:
+        return respuesta_304
+    response.headers["ETag"] = etag
+    agregar_headers_total(response, total, estimado)
+    if campos:
+        return respuesta_campos(corredores, campos, response)
+    return respuesta_lista(schemas.Corredor, corredores, response)
 
 @router.get("/{numero}", response_model=schemas.Corredor)
 def read_corredor(
     numero: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.Usuario = Depends(get_current_user)
 ):
-    """Obtener un corredor específico por su número"""
+    """Obtener un corredor específico por su número (admite If-None-Match)"""
+    if "if-none-match" in request.headers:
+        # Validar el ETag leyendo sólo la fecha de modificación
+        fila = db.query(models.Corredor.fecha_modificacion).filter(models.Corredor.numero == numero).first()
+        if fila is not None:
+            respuesta_304 = no_modificado(request, calcular_etag(numero, fila.fecha_modificacion))
+            if respuesta_304:
+                return respuesta_304
+
     corredor = db.query(models.Corredor).filter(models.Corredor.numero == numero).first()
     if corredor is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No se encontró el corredor con número {numero}"
         )
+    response.headers["ETag"] = calcular_etag(numero, corredor.fecha_modificacion)
     return corredor
 
+@router.get("/{numero}/resumen", response_model=schemas.CorredorResumen)
+def read_resumen_corredor(
+    numero: int,
+    dias: int = Query(30, ge=1, le=365, description="Días hacia adelante para contar los vencimientos"),
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(get_current_user)
+):
+    """
+    Indicadores del corredor: clientes, pólizas activas, primas por moneda y
+    vencimientos de los próximos días, calculados en una sola consulta y
+    guardados en memoria unos segundos.
+    """
+    resumen = get_resumen_corredor(db, numero, dias)
+    if resumen is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No se encontró el corredor con número {numero}"
+        )
+    return resumen
+
 @router.put("/{numero}", response_model=schemas.Corredor)
 def update_corredor(
     numero: int,
@@ -90,6 +146,7 @@ def update_corredor(
         setattr(db_corredor, key, value)
     
     db.commit()
+    cache_corredores.invalidar()
     db.refresh(db_corredor)
     return db_corredor
 
@@ -109,4 +166,5 @@ def delete_corredor(
     
     db.delete(db_corredor)
     db.commit()
+    cache_corredores.invalidar()
     return db_corredor
@@ -0,0 +1,77 @@
+"""
+Caché en memoria del proceso con vencimiento por tiempo (TTL) y desalojo LRU.
+
+Para respuestas que se piden seguido y pueden mostrarse con unos segundos de
+atraso, y para datos de referencia (corredores, tipos de seguro, cotizaciones)
+que cambian rara vez. Cada caché tiene una versión: invalidar() la incrementa y
+los valores guardados con una versión anterior dejan de servirse, incluidos los
+que se estaban cargando en ese momento. Al llegar al máximo de entradas se
+descarta la usada hace más tiempo. Cada proceso del servidor tiene su propia
+copia; los cambios hechos a través de otro proceso se ven al vencer el TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+# Cachés creadas con nombre, para consultar sus contadores (GET /api/v1/cache)
+CACHES: Dict[str, "CacheTTL"] = {}
+
+class CacheTTL:
+    """
+    Valores por clave que se descartan `segundos` después de guardarse.
+    Con guardar_none=False un resultado None no se guarda (se vuelve a cargar
+    en el pedido siguiente), para datos que pueden aparecer más tarde.
+    """
+
+    def __init__(self, segundos: float, maximo: int = 1024, nombre: str = None, guardar_none: bool = True):
+        self.segundos = segundos
+        self.maximo = maximo
+        self.guardar_none = guardar_none
+        self.version = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._valores: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if nombre:
+            CACHES[nombre] = self
+
+    def obtener(self, clave: Hashable, cargar: Callable[[], Any]) -> Any:
+        """Devuelve el valor guardado si no venció; si no, lo carga con `cargar()` y lo guarda."""
+        ahora = time.monotonic()
+        with self._lock:
+            guardado = self._valores.get(clave)
+            version = self.version
+            if guardado is not None and guardado[0] > ahora and guardado[1] == version:
+                self._valores.move_to_end(clave)
+                self.aciertos += 1
+                return guardado[2]
+            self.fallos += 1
+        # Se carga fuera del lock: dos pedidos simultáneos pueden cargar el mismo valor
+        valor = cargar()
+        if valor is None and not self.guardar_none:
+            return valor
+        with self._lock:
+            # Si se invalidó durante la carga el valor puede ser anterior al cambio: no se guarda
+            if version == self.version:
+                self._valores[clave] = (ahora + self.segundos, version, valor)
+                self._valores.move_to_end(clave)
+                while len(self._valores) > self.maximo:
+                    self._valores.popitem(last=False)
+        return valor
+
+    def invalidar(self) -> None:
+        """Descarta todos los valores (llamar después del commit que los modifica)."""
+        with self._lock:
+            self.version += 1
+            self._valores.clear()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self.version,
+                "entradas": len(self._valores),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "ttl_segundos": self.segundos,
+            }
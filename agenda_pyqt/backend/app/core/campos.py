@@ -0,0 +1,47 @@
+"""
+Selección de campos (sparse fieldsets) para los listados.
+
+Con fields=a,b,c el SELECT se limita a las columnas pedidas y la respuesta a
+esas claves: no se hidratan objetos ORM ni se arma el schema completo por fila.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Query
+
+def parsear_campos(fields: Optional[str], disponibles: Dict[str, Any], clave: str) -> Optional[List[str]]:
+    """
+    Interpreta el parámetro fields (nombres separados por comas).
+    La clave del recurso se incluye siempre, en primer lugar, porque la usan la
+    paginación por cursor y las pantallas que editan o eliminan el registro.
+
+    Returns:
+        Los campos a devolver, o None si no se pidió una selección.
+    """
+    if not fields:
+        return None
+    pedidos = [campo.strip() for campo in fields.split(",") if campo.strip()]
+    desconocidos = [campo for campo in pedidos if campo not in disponibles]
+    if desconocidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos desconocidos: {', '.join(desconocidos)}. "
+                   f"Disponibles: {', '.join(disponibles)}"
+        )
+    return [clave] + [campo for campo in dict.fromkeys(pedidos) if campo != clave]
+
+def seleccionar_campos(query: Query, disponibles: Dict[str, Any], campos: Sequence[str]) -> Query:
+    """Reemplaza las entidades de la consulta por las columnas de los campos pedidos."""
+    return query.with_entities(*(disponibles[campo].label(campo) for campo in campos))
+
+def respuesta_campos(filas: Sequence[Sequence[Any]], campos: Sequence[str], response: Response) -> JSONResponse:
+    """
+    Serializa las filas sólo con los campos pedidos, conservando los headers
+    (ETag, X-Total-Count...) ya cargados en `response`.
+    """
+    return JSONResponse(
+        content=jsonable_encoder([dict(zip(campos, fila)) for fila in filas]),
+        headers=dict(response.headers)
+    )
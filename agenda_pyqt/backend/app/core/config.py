@@ -20,6 +20,44 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Paginación: por encima de este número de filas estimadas el total
+    # se informa con la estimación del planificador en lugar de contarse
+    CONTEO_EXACTO_MAXIMO: int = 100000
+    # Segundos que se reutiliza la estimación de un mismo filtro (evita un EXPLAIN por página)
+    CONTEO_ESTIMADO_CACHE_SEGUNDOS: int = 60
+
+    # Máximo de clientes aceptados por POST /clientes/bulk
+    CLIENTES_BULK_MAXIMO: int = 50000
+
+    # Segundos que se conservan el estado y el CSV de errores de una importación terminada
+    IMPORTACIONES_RETENCION_SEGUNDOS: int = 86400
+
+    # Máximo de movimientos aceptados por POST /movimientos/batch (se insertan en una sentencia)
+    MOVIMIENTOS_BATCH_MAXIMO: int = 1000
+
+    # Margen de seguridad de GET /sync para cambios de transacciones aún no confirmadas
+    SYNC_MARGEN_SEGUNDOS: int = 5
+
+    # Cada cuántos segundos se refresca la vista de reportes si hubo cambios (0: nunca)
+    REPORTES_REFRESCO_SEGUNDOS: int = 300
+
+    # Moneda en que se expresan los tipos de cambio y, por defecto, los totales normalizados
+    MONEDA_BASE: str = "$"
+
+    # Cotizaciones (moneda, fecha) que se guardan en memoria y por cuántos segundos
+    TIPOS_CAMBIO_CACHE: int = 4096
+    TIPOS_CAMBIO_CACHE_SEGUNDOS: int = 60
+
+    # Segundos que se guardan en memoria los listados de corredores y tipos de seguro
+    # (cada proceso; se invalidan al modificarlos)
+    REFERENCIAS_CACHE_SEGUNDOS: int = 300
+
+    # Segundos que se guarda en memoria el resumen de cada corredor (GET /corredores/{numero}/resumen)
+    RESUMEN_CORREDOR_SEGUNDOS: int = 30
+
+    # Años siguientes al actual cuyas particiones de movimientos se crean al iniciar
+    PARTICIONES_ANIOS_FUTUROS: int = 2
+
     # Usuario inicial
     FIRST_SUPERUSER: str = "admin@example.com"
     FIRST_SUPERUSER_PASSWORD: str = "admin12345"
@@ -0,0 +1,77 @@
+"""
+GET condicional (ETag / If-None-Match).
+
+El ETag de una página de un listado se deriva de la clave y la fecha_modificacion
+de cada fila leída, el total y los parámetros de la petición, de modo que no hace
+falta otra consulta sobre el conjunto filtrado; el de un listado completo, de
+max(fecha_modificacion) y la cantidad de filas; el de un detalle, de la
+fecha_modificacion del registro. Una respuesta 304 evita hidratar objetos ORM y
+serializarlos.
+"""
+import hashlib
+from typing import Any, Optional, Sequence, Union
+
+from fastapi import Request, Response, status
+from sqlalchemy import func
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query
+
+# Prefijo de las columnas que agregar_versiones suma a una consulta de columnas
+PREFIJO_VERSION = "version_fila_"
+
+def calcular_etag(*partes: Any) -> str:
+    """ETag fuerte a partir de los valores que determinan el contenido de la respuesta."""
+    huella = hashlib.sha1("|".join(str(parte) for parte in partes).encode("utf-8")).hexdigest()
+    return f'"{huella}"'
+
+def etag_lista(query: Query, columnas_fecha: Union[Any, Sequence[Any]], *partes: Any) -> str:
+    """
+    ETag de un listado completo: max() de cada columna de fecha y count(*) del
+    conjunto filtrado, más los parámetros de la petición.
+    Se pueden pasar varias columnas cuando la respuesta incluye datos de tablas unidas.
+    """
+    if not isinstance(columnas_fecha, (list, tuple)):
+        columnas_fecha = [columnas_fecha]
+    valores = query.order_by(None).with_entities(
+        *(func.max(columna) for columna in columnas_fecha), func.count()
+    ).one()
+    return calcular_etag(*valores, *partes)
+
+def agregar_versiones(query: Query, *columnas_fecha: Any) -> Query:
+    """
+    Agrega a una consulta de columnas las fechas de modificación de cada fila (una
+    por tabla de la respuesta) para etag_pagina. Van después de los campos, por lo
+    que la serialización las ignora.
+    """
+    return query.add_columns(
+        *(columna.label(f"{PREFIJO_VERSION}{i}") for i, columna in enumerate(columnas_fecha))
+    )
+
+def etag_pagina(filas: Sequence[Any], clave: str, *partes: Any) -> str:
+    """
+    ETag de una página ya leída: la clave y las fechas de modificación de cada fila
+    (las columnas de agregar_versiones, o fecha_modificacion si son objetos ORM),
+    más los parámetros de la petición y el total. Cambia si se modifica, agrega o
+    quita una fila de la página.
+    """
+    versiones = []
+    for fila in filas:
+        if isinstance(fila, Row):
+            fechas = [valor for nombre, valor in zip(fila._fields, fila) if nombre.startswith(PREFIJO_VERSION)]
+        else:
+            fechas = [fila.fecha_modificacion]
+        versiones.append((getattr(fila, clave), *fechas))
+    return calcular_etag(*partes, versiones)
+
+def no_modificado(request: Request, etag: str) -> Optional[Response]:
+    """
+    Devuelve una respuesta 304 si el ETag coincide con If-None-Match, o None
+    si hay que generar la respuesta completa.
+    """
+    cabecera = request.headers.get("if-none-match")
+    if not cabecera:
+        return None
+    candidatos = {valor.strip().removeprefix("W/") for valor in cabecera.split(",")}
+    if "*" in candidatos or etag in candidatos:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
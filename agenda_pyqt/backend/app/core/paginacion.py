@@ -0,0 +1,116 @@
+"""
+Utilidades de paginación por cursor (keyset).
+"""
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from .cache import CacheTTL
+from .config import settings
+
+# Estimaciones del planificador por sentencia y parámetros
+cache_estimaciones = CacheTTL(settings.CONTEO_ESTIMADO_CACHE_SEGUNDOS, nombre="estimaciones_total")
+
+class Explicar(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) de una sentencia, con sus parámetros enviados como tales."""
+    inherit_cache = False
+
+    def __init__(self, sentencia: Any):
+        self.sentencia = sentencia
+
+@compiles(Explicar, "postgresql")
+def _compilar_explicar(elemento, compilador, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compilador.process(elemento.sentencia, **kw)
+
+def codificar_cursor(valores: Dict[str, Any]) -> str:
+    """Codifica la posición de la última fila devuelta como un cursor opaco."""
+    crudo = json.dumps(valores, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+def decodificar_cursor(cursor: str, **tipos: type) -> Dict[str, Any]:
+    """
+    Decodifica un cursor generado por codificar_cursor. Cada clave indicada debe
+    estar y ser del tipo correspondiente, p. ej. decodificar_cursor(cursor, numero_cliente=int).
+    Lanza un error 400 si el cursor no es válido, le falta alguna clave o tiene otro
+    tipo (el valor llega a la consulta, donde fallaría con un error interno).
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(valores, dict):
+            raise ValueError("El cursor no contiene un objeto")
+        faltantes = [clave for clave in tipos if valores.get(clave) is None]
+        if faltantes:
+            raise ValueError(f"Faltan claves en el cursor: {faltantes}")
+        # bool es subclase de int, pero true no es un número de cliente
+        invalidas = [
+            clave for clave, tipo in tipos.items()
+            if not isinstance(valores[clave], tipo) or isinstance(valores[clave], bool)
+        ]
+        if invalidas:
+            raise ValueError(f"Claves del cursor con tipo inválido: {invalidas}")
+        return valores
+    except (ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido"
+        ) from e
+
+def total_estimado(db: Session, query: Query) -> Optional[int]:
+    """
+    Estimación del número de filas de la consulta según las estadísticas del
+    planificador (EXPLAIN, sin ejecutarla). Se guarda por sentencia y parámetros
+    durante CONTEO_ESTIMADO_CACHE_SEGUNDOS, de modo que recorrer las páginas de un
+    mismo filtro no repite el EXPLAIN. Devuelve None fuera de PostgreSQL.
+    """
+    if db.bind is None or db.bind.dialect.name != "postgresql":
+        return None
+    sentencia = query.order_by(None).statement
+    compilada = sentencia.compile(dialect=db.bind.dialect)
+    clave = (str(compilada), repr(sorted(compilada.params.items())))
+
+    def cargar() -> int:
+        plan = db.execute(Explicar(sentencia)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    return cache_estimaciones.obtener(clave, cargar)
+
+def paginar_con_total(db: Session, query: Query, skip: int, limit: int) -> Tuple[List[Any], int, bool]:
+    """
+    Ejecuta la página (offset/limit) y obtiene el total en la misma sentencia
+    con count(*) OVER (). Si el planificador estima más de
+    settings.CONTEO_EXACTO_MAXIMO filas, no se cuenta y se devuelve la estimación.
+
+    Si la consulta tiene una sola entidad se devuelven sus objetos; si tiene
+    varias columnas (ver core.campos), las filas tal como llegan, que se leen
+    por nombre o posición y llevan la columna total al final.
+
+    Returns:
+        (filas de la página, total, True si el total es estimado)
+    """
+    estimado = total_estimado(db, query)
+    if estimado is not None and estimado > settings.CONTEO_EXACTO_MAXIMO:
+        return query.offset(skip).limit(limit).all(), estimado, True
+
+    descripciones = query.column_descriptions
+    una_entidad = len(descripciones) == 1 and descripciones[0]["expr"] is descripciones[0]["entity"]
+    filas = query.add_columns(func.count().over().label("total")).offset(skip).limit(limit).all()
+    if filas:
+        if una_entidad:
+            return [fila[0] for fila in filas], filas[0].total, False
+        return filas, filas[0].total, False
+    # Página vacía: el total no viaja con las filas
+    return [], (query.order_by(None).count() if skip > 0 else 0), False
+
+def agregar_headers_total(response: Response, total: int, estimado: bool = False) -> None:
+    """Informa el total de registros en los headers X-Total-Count y X-Total-Count-Estimado."""
+    response.headers["X-Total-Count"] = str(total)
+    response.headers["X-Total-Count-Estimado"] = "true" if estimado else "false"
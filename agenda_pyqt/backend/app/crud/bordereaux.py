@@ -0,0 +1,271 @@
+"""
+Ingesta de los bordereaux mensuales de las aseguradoras (pólizas emitidas y endosadas).
+
+Reutiliza la cadena de generadores de la importación de clientes (lectura ->
+normalización -> lotes) y termina en un INSERT ... ON CONFLICT DO UPDATE por lote
+sobre (numero_poliza, endoso, fecha_inicio), con un commit por lote. Clientes y
+tipos de seguro se resuelven con diccionarios armados una vez por archivo, de modo
+que la memoria usada no depende del largo del archivo.
+"""
+import csv
+import os
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import func, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..models.cliente import Cliente, get_utc_now
+from ..models.movimiento import CLAVE_POLIZA_ENDOSO_INICIO, MovimientoVigencia
+from ..models.tipo_seguro import TipoSeguro
+from ..models.version_poliza import encadenar_versiones
+from ..schemas.movimiento import FilaBordereau, ImportacionBordereau
+from .clientes_masivo import formatear_error_validacion
+from .cuotas import generar_cuotas, regenerar_cuotas
+from .importacion_clientes import en_lotes, leer_csv, leer_xlsx, normalizar_fila
+
+TAMANO_LOTE_BORDEREAU = 1000
+
+# Nombres de columna habituales en los archivos de las aseguradoras
+ALIAS_BORDEREAU = {
+    "documento": "numero_documento",
+    "nro_documento": "numero_documento",
+    "ci": "numero_documento",
+    "rut": "numero_documento",
+    "poliza": "numero_poliza",
+    "nro_poliza": "numero_poliza",
+    "ramo": "codigo",
+    "codigo_ramo": "codigo",
+    "desde": "fecha_inicio",
+    "vigencia_desde": "fecha_inicio",
+    "inicio": "fecha_inicio",
+    "hasta": "fecha_vencimiento",
+    "vigencia_hasta": "fecha_vencimiento",
+    "vencimiento": "fecha_vencimiento",
+    "capital": "suma_asegurada",
+    "premio": "prima",
+}
+
+# Columnas que un bordereau posterior puede corregir en un movimiento existente
+CAMPOS_ACTUALIZABLES = [
+    "cliente_id", "tipo_seguro_id", "fecha_vencimiento",
+    "suma_asegurada", "prima", "fecha_modificacion",
+]
+# ... y las opcionales, que sólo se sobrescriben si el archivo las trae
+CAMPOS_OPCIONALES = ["moneda", "cuotas", "carpeta", "observaciones"]
+# Sin corredor en el archivo se usa el del cliente al insertar, pero una
+# actualización conserva el que ya tenía el movimiento
+CORREDOR_INFORMADO = "corredor_informado"
+
+# Estado de las ingestas de este proceso
+_importaciones: Dict[str, ImportacionBordereau] = {}
+_importaciones_lock = threading.Lock()
+
+def registrar_importacion(aseguradora: str, formato: str) -> ImportacionBordereau:
+    """Da de alta una ingesta pendiente y devuelve su estado."""
+    importacion = ImportacionBordereau(id=uuid.uuid4().hex, aseguradora=aseguradora, formato=formato)
+    with _importaciones_lock:
+        _importaciones[importacion.id] = importacion
+    return importacion
+
+def obtener_importacion(importacion_id: str) -> Optional[ImportacionBordereau]:
+    """Estado de una ingesta de este proceso, o None si no existe."""
+    with _importaciones_lock:
+        return _importaciones.get(importacion_id)
+
+def cargar_referencias(db: Session, aseguradora: str) -> Tuple[Dict[str, Tuple[Any, Optional[int]]], Dict[str, int]]:
+    """
+    Diccionarios de búsqueda del archivo: documento -> (id, corredor) de los clientes
+    y código -> id de los tipos de seguro de la aseguradora.
+    """
+    clientes = {
+        documento: (id_cliente, corredor)
+        for documento, id_cliente, corredor in db.execute(
+            select(Cliente.numero_documento, Cliente.id, Cliente.corredor)
+        )
+    }
+    tipos = dict(db.execute(
+        select(TipoSeguro.Codigo, TipoSeguro.Id_tipo).where(TipoSeguro.Aseguradora == aseguradora)
+    ).all())
+    return clientes, tipos
+
+def resolver_filas(
+    lote: List[Tuple[int, Dict[str, Any]]],
+    clientes: Dict[str, Tuple[Any, Optional[int]]],
+    tipos: Dict[str, int],
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Valida cada fila y la convierte en los valores de un movimiento. Si la misma
+    póliza/endoso/inicio aparece dos veces en el lote queda la última.
+
+    Returns:
+        (filas como (índice, valores), errores como {"indice", "error"})
+    """
+    errores: List[Dict[str, Any]] = []
+    por_clave: Dict[Tuple[str, str, Any], Tuple[int, Dict[str, Any]]] = {}
+    ahora = get_utc_now()
+    for indice, datos in lote:
+        try:
+            fila = FilaBordereau.model_validate(datos)
+        except ValidationError as e:
+            errores.append({"indice": indice, "error": formatear_error_validacion(e)})
+            continue
+        cliente = clientes.get(fila.numero_documento)
+        if cliente is None:
+            errores.append({"indice": indice, "error": f"No existe un cliente con documento {fila.numero_documento}"})
+            continue
+        if fila.codigo not in tipos:
+            errores.append({"indice": indice, "error": f"La aseguradora no tiene el tipo de seguro {fila.codigo}"})
+            continue
+
+        clave = (fila.numero_poliza, fila.endoso or "", fila.fecha_inicio)
+        if clave in por_clave:
+            anterior = por_clave[clave][0]
+            errores.append({"indice": anterior, "error": f"Reemplazada por la fila {indice + 2} (misma póliza y endoso)"})
+        por_clave[clave] = (indice, {
+            "cliente_id": cliente[0],
+            "corredor_id": fila.corredor if fila.corredor is not None else cliente[1],
+            CORREDOR_INFORMADO: fila.corredor is not None,
+            "tipo_seguro_id": tipos[fila.codigo],
+            "numero_poliza": fila.numero_poliza,
+            "endoso": fila.endoso,
+            "fecha_inicio": fila.fecha_inicio,
+            "fecha_vencimiento": fila.fecha_vencimiento,
+            "moneda": fila.moneda,
+            "suma_asegurada": fila.suma_asegurada,
+            "prima": fila.prima,
+            "cuotas": fila.cuotas,
+            "carpeta": fila.carpeta,
+            "observaciones": fila.observaciones,
+            "fecha_modificacion": ahora,
+        })
+    return list(por_clave.values()), errores
+
+def _upsert_grupo(db: Session, filas: List[Dict[str, Any]], corredor_informado: bool) -> List[Any]:
+    """INSERT ... ON CONFLICT DO UPDATE de filas que traen (o no) el corredor."""
+    sentencia = insert(MovimientoVigencia).values(filas)
+    corredor = sentencia.excluded.corredor_id
+    if not corredor_informado:
+        corredor = func.coalesce(MovimientoVigencia.corredor_id, corredor)
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=CLAVE_POLIZA_ENDOSO_INICIO,
+        set_={
+            **{campo: sentencia.excluded[campo] for campo in CAMPOS_ACTUALIZABLES},
+            **{
+                campo: func.coalesce(sentencia.excluded[campo], getattr(MovimientoVigencia, campo))
+                for campo in CAMPOS_OPCIONALES
+            },
+            "corredor_id": corredor,
+        },
+    ).returning(
+        MovimientoVigencia.id,
+        MovimientoVigencia.numero_poliza,
+        MovimientoVigencia.fecha_vencimiento,
+        MovimientoVigencia.corredor_id,
+        MovimientoVigencia.moneda,
+        MovimientoVigencia.prima,
+        MovimientoVigencia.cuotas,
+        literal_column("(xmax = 0)").label("insertado"),
+    )
+    return db.execute(sentencia).all()
+
+def upsert_movimientos(db: Session, filas: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Inserta o actualiza los movimientos (una sentencia por lote, dos si el archivo
+    trae el corredor sólo en algunas filas) y mantiene el resumen de vencimientos,
+    la cadena de versiones y las cuotas: se generan las de los nuevos y se rehacen
+    las impagas de los actualizados cuya prima o cantidad de cuotas cambió.
+    No hace commit: lo decide quien llama.
+
+    Returns:
+        (insertados, actualizados)
+    """
+    if not filas:
+        return 0, 0
+    clave = tuple_(*CLAVE_POLIZA_ENDOSO_INICIO)
+    # Días del resumen que pierden el movimiento si la actualización les cambia la fecha,
+    # y plan de pagos anterior de los que ya existían
+    anteriores = db.execute(
+        select(
+            MovimientoVigencia.id,
+            MovimientoVigencia.fecha_vencimiento,
+            MovimientoVigencia.corredor_id,
+            MovimientoVigencia.moneda,
+            MovimientoVigencia.prima,
+            MovimientoVigencia.cuotas,
+        )
+        .where(clave.in_([(fila["numero_poliza"], fila["endoso"] or "", fila["fecha_inicio"]) for fila in filas]))
+    ).all()
+
+    grupos: Dict[bool, List[Dict[str, Any]]] = {}
+    for fila in filas:
+        valores = dict(fila)
+        grupos.setdefault(valores.pop(CORREDOR_INFORMADO, True), []).append(valores)
+    resultado = [
+        fila for informado, grupo in grupos.items() for fila in _upsert_grupo(db, grupo, informado)
+    ]
+
+    nuevos = [fila.id for fila in resultado if fila.insertado]
+    # Un endoso nuevo pasa a ser la versión actual de su póliza (si es el último);
+    # el resumen de vencimientos se recalcula al final, con los días anteriores y nuevos
+    encadenar_versiones(
+        db.connection(),
+        (fila.numero_poliza for fila in resultado if fila.insertado),
+        ((fila.fecha_vencimiento, fila.corredor_id, fila.moneda) for fila in anteriores + resultado),
+    )
+    generar_cuotas(db, nuevos)
+    plan_anterior = {fila.id: (fila.prima, fila.cuotas) for fila in anteriores}
+    regenerar_cuotas(db, (
+        fila.id for fila in resultado
+        if not fila.insertado and plan_anterior.get(fila.id) != (fila.prima, fila.cuotas)
+    ))
+    return len(nuevos), len(resultado) - len(nuevos)
+
+def procesar_bordereau(db: Session, importacion: ImportacionBordereau, ruta: str) -> None:
+    """
+    Procesa el archivo por lotes, actualizando el progreso de `importacion`.
+    Los rechazos se escriben a medida que aparecen en un CSV de errores
+    (fila, numero_poliza, error) cuya ruta queda en importacion.ruta_errores.
+    """
+    descriptor, ruta_errores = tempfile.mkstemp(prefix="bordereau_errores_", suffix=".csv")
+    importacion.estado = "procesando"
+    try:
+        clientes, tipos = cargar_referencias(db, importacion.aseguradora)
+        lector = leer_xlsx if importacion.formato == "xlsx" else leer_csv
+        with os.fdopen(descriptor, "w", newline="", encoding="utf-8") as archivo_errores:
+            escritor = csv.writer(archivo_errores)
+            escritor.writerow(["fila", "numero_poliza", "error"])
+
+            filas = enumerate(normalizar_fila(fila, ALIAS_BORDEREAU) for fila in lector(ruta))
+            for lote in en_lotes(filas, TAMANO_LOTE_BORDEREAU):
+                validas, errores = resolver_filas(lote, clientes, tipos)
+                insertados, actualizados = upsert_movimientos(db, [valores for _, valores in validas])
+                db.commit()
+
+                datos_por_indice = dict(lote)
+                for error in sorted(errores, key=lambda e: e["indice"]):
+                    escritor.writerow([
+                        # La fila 1 del archivo es el encabezado
+                        error["indice"] + 2,
+                        datos_por_indice[error["indice"]].get("numero_poliza", ""),
+                        error["error"],
+                    ])
+                importacion.filas_procesadas += len(lote)
+                importacion.insertados += insertados
+                importacion.actualizados += actualizados
+                importacion.errores += len(errores)
+        importacion.ruta_errores = ruta_errores
+        importacion.estado = "terminada"
+    except Exception as e:
+        db.rollback()
+        importacion.ruta_errores = ruta_errores
+        importacion.estado = "fallida"
+        importacion.detalle = str(e)
+        raise
+    finally:
+        importacion.fecha_fin = datetime.now(timezone.utc)
@@ -0,0 +1,76 @@
+"""
+Búsqueda indexada de clientes (pg_trgm + unaccent).
+
+Las expresiones de este módulo deben coincidir exactamente con las de los
+índices ix_clientes_busqueda_trgm e ix_clientes_documento_trgm para que
+PostgreSQL pueda usarlos.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import case, func, literal, or_
+from sqlalchemy.orm import Session
+
+from ..models.cliente import Cliente
+
+def expresion_busqueda():
+    """Texto normalizado (minúsculas y sin tildes) sobre el que se busca."""
+    return func.f_unaccent(func.lower(
+        Cliente.nombres + " " + Cliente.apellidos + " " + Cliente.numero_documento + " " + Cliente.mail
+    ))
+
+def expresion_documento():
+    """Número de documento sin puntos, guiones ni espacios."""
+    return func.regexp_replace(Cliente.numero_documento, "[^0-9A-Za-z]", "", "g")
+
+def normalizar_documento(termino: str) -> str:
+    """Quita los separadores de un número de documento ingresado por el usuario."""
+    return re.sub(r"[^0-9A-Za-z]", "", termino)
+
+def _escapar_like(termino: str) -> str:
+    return termino.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def filtro_busqueda(termino: str):
+    """
+    Condición que usa los índices trigram: coincidencia parcial sobre el texto
+    normalizado, similitud de palabras (errores de tipeo) o documento parcial.
+    """
+    expresion = expresion_busqueda()
+    patron = func.f_unaccent(func.lower(literal(_escapar_like(termino))))
+    condiciones = [
+        expresion.like("%" + patron + "%"),
+        func.f_unaccent(func.lower(literal(termino))).op("<%")(expresion),
+    ]
+    documento = normalizar_documento(termino)
+    if documento:
+        condiciones.append(expresion_documento().like(f"%{_escapar_like(documento)}%"))
+    return or_(*condiciones)
+
+def buscar_clientes(
+    db: Session,
+    termino: str,
+    corredor: Optional[int] = None,
+    limit: int = 20
+) -> List[Tuple[Cliente, float]]:
+    """
+    Busca clientes por nombre, apellido, documento o email y los ordena por relevancia.
+    Los documentos que empiezan con el término van primero.
+    """
+    termino_normalizado = func.f_unaccent(func.lower(literal(termino)))
+    relevancia = func.word_similarity(termino_normalizado, expresion_busqueda())
+    documento = normalizar_documento(termino)
+    prefijo_documento = (
+        case((expresion_documento().like(f"{_escapar_like(documento)}%"), 1), else_=0)
+        if documento else literal(0)
+    )
+
+    query = db.query(Cliente, relevancia.label("relevancia")).filter(filtro_busqueda(termino))
+    if corredor is not None:
+        query = query.filter(Cliente.corredor == corredor)
+
+    return query.order_by(
+        prefijo_documento.desc(),
+        relevancia.desc(),
+        Cliente.apellidos,
+        Cliente.nombres
+    ).limit(limit).all()
@@ -0,0 +1,234 @@
+"""
+Alta masiva de clientes con inserciones por conjuntos.
+"""
+import uuid
+from typing import Any, Dict, Iterable, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.cliente import Cliente, get_utc_now
+from ..models.corredor import Corredor
+from ..schemas.cliente import ClienteCreate
+
+# Filas por sentencia INSERT (17 columnas por fila, muy por debajo del límite de parámetros)
+TAMANO_LOTE_INSERT = 1000
+
+def formatear_error_validacion(error: ValidationError) -> str:
+    """Resume los errores de Pydantic en una línea legible."""
+    return "; ".join(
+        f"{'.'.join(str(parte) for parte in detalle['loc'])}: {detalle['msg']}"
+        for detalle in error.errors()
+    )
+
+def validar_clientes(
+    filas: Iterable[Tuple[int, Dict[str, Any]]]
+) -> Tuple[List[Tuple[int, ClienteCreate]], List[Dict[str, Any]]]:
+    """
+    Valida cada fila con ClienteCreate.
+
+    Returns:
+        (filas válidas como (índice, cliente), errores como {"indice", "error"})
+    """
+    validos: List[Tuple[int, ClienteCreate]] = []
+    errores: List[Dict[str, Any]] = []
+    for indice, datos in filas:
+        try:
+            validos.append((indice, ClienteCreate.model_validate(datos)))
+        except ValidationError as e:
+            errores.append({"indice": indice, "error": formatear_error_validacion(e)})
+    return validos, errores
+
+def asignar_numeros_cliente(db: Session, cantidad: int) -> List[int]:
+    """Reserva un bloque de valores de cliente_numero_seq en un solo viaje a la base."""
+    if cantidad <= 0:
+        return []
+    return list(db.execute(
+        select(func.nextval(Cliente.cliente_seq.name)).select_from(func.generate_series(1, cantidad))
+    ).scalars())
+
+def descartar_conflictos_conocidos(
+    db: Session,
+    clientes: List[Tuple[int, ClienteCreate]]
+) -> Tuple[List[Tuple[int, ClienteCreate]], List[Dict[str, Any]]]:
+    """
+    Detecta por anticipado los errores que harían fallar el lote completo o que
+    conviene informar con precisión: duplicados dentro del lote y corredores inexistentes.
+    """
+    errores: List[Dict[str, Any]] = []
+    aceptados: List[Tuple[int, ClienteCreate]] = []
+
+    corredores = {c.corredor for _, c in clientes if c.corredor is not None}
+    existentes = set(
+        db.execute(select(Corredor.numero).where(Corredor.numero.in_(corredores))).scalars()
+    ) if corredores else set()
+
+    documentos_vistos: Dict[str, int] = {}
+    mails_vistos: Dict[str, int] = {}
+    for indice, cliente in clientes:
+        if cliente.corredor is not None and cliente.corredor not in existentes:
+            errores.append({"indice": indice, "error": f"El corredor {cliente.corredor} no existe"})
+        elif cliente.numero_documento in documentos_vistos:
+            errores.append({
+                "indice": indice,
+                "error": f"Documento {cliente.numero_documento} repetido en la fila {documentos_vistos[cliente.numero_documento]}"
+            })
+        elif cliente.mail in mails_vistos:
+            errores.append({
+                "indice": indice,
+                "error": f"Email {cliente.mail} repetido en la fila {mails_vistos[cliente.mail]}"
+            })
+        else:
+            documentos_vistos[cliente.numero_documento] = indice
+            mails_vistos[cliente.mail] = indice
+            aceptados.append((indice, cliente))
+    return aceptados, errores
+
+def _insertar_lote(db: Session, valores: List[Dict[str, Any]]) -> List[Tuple[Any, int]]:
+    sentencia = insert(Cliente).values(valores).on_conflict_do_nothing().returning(
+        Cliente.id, Cliente.numero_cliente
+    )
+    return db.execute(sentencia).all()
+
+def insertar_clientes(
+    db: Session,
+    clientes: List[Tuple[int, ClienteCreate]],
+    user_id: int
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Inserta los clientes con INSERT multi-fila ... ON CONFLICT DO NOTHING RETURNING.
+    Las filas que chocan con un documento o email existente se informan como error
+    sin abortar el resto. Si el lote falla por otro motivo (un valor que la base
+    rechaza), se reintenta fila por fila en savepoints para informar a las culpables.
+    No hace commit: lo decide quien llama.
+
+    Returns:
+        (creados como {"indice", "id", "numero_cliente"}, errores como {"indice", "error"})
+    """
+    clientes, errores = descartar_conflictos_conocidos(db, clientes)
+    numeros = asignar_numeros_cliente(db, len(clientes))
+    ahora = get_utc_now()
+
+    creados: List[Dict[str, Any]] = []
+    for inicio in range(0, len(clientes), TAMANO_LOTE_INSERT):
+        lote = clientes[inicio:inicio + TAMANO_LOTE_INSERT]
+        indices_por_numero: Dict[int, int] = {}
+        valores = []
+        for (indice, cliente), numero in zip(lote, numeros[inicio:inicio + TAMANO_LOTE_INSERT]):
+            indices_por_numero[numero] = indice
+            valores.append({
+                **cliente.model_dump(),
+                "id": uuid.uuid4(),
+                "numero_cliente": numero,
+                "creado_por_id": user_id,
+                "modificado_por_id": user_id,
+                "fecha_creacion": ahora,
+                "fecha_modificacion": ahora,
+            })
+
+        try:
+            with db.begin_nested():
+                insertados = _insertar_lote(db, valores)
+        except (IntegrityError, DataError):
+            insertados = []
+            for fila in valores:
+                try:
+                    with db.begin_nested():
+                        insertados.extend(_insertar_lote(db, [fila]))
+                except (IntegrityError, DataError) as e:
+                    errores.append({
+                        "indice": indices_por_numero.pop(fila["numero_cliente"]),
+                        "error": str(e.orig).splitlines()[0]
+                    })
+        for id_cliente, numero in insertados:
+            creados.append({
+                "indice": indices_por_numero.pop(numero),
+                "id": id_cliente,
+                "numero_cliente": numero
+            })
+        # Lo que no volvió en RETURNING chocó con un cliente existente
+        for indice in indices_por_numero.values():
+            errores.append({"indice": indice, "error": "Ya existe un cliente con ese documento o email"})
+
+    errores.sort(key=lambda error: error["indice"])
+    return creados, errores
+
+# Campos que una reimportación puede sobrescribir en un cliente existente
+CAMPOS_ACTUALIZABLES = [
+    "nombres", "apellidos", "tipo_documento", "fecha_nacimiento", "direccion", "localidad",
+    "telefonos", "movil", "mail", "corredor", "observaciones",
+]
+
+def _sentencia_upsert(valores: List[Dict[str, Any]], campos: Iterable[str]):
+    """Upsert por numero_documento que en los clientes existentes sólo sobrescribe `campos`."""
+    sentencia = insert(Cliente).values(valores)
+    actualizar = {campo: sentencia.excluded[campo] for campo in campos}
+    actualizar["modificado_por_id"] = sentencia.excluded.modificado_por_id
+    actualizar["fecha_modificacion"] = sentencia.excluded.fecha_modificacion
+    return sentencia.on_conflict_do_update(
+        index_elements=[Cliente.numero_documento], set_=actualizar
+    ).returning(Cliente.numero_documento, literal_column("(xmax = 0)").label("insertado"))
+
+def upsert_clientes(
+    db: Session,
+    clientes: List[Tuple[int, ClienteCreate]],
+    user_id: int
+) -> Tuple[int, int, List[Dict[str, Any]]]:
+    """
+    Inserta o actualiza (por numero_documento) los clientes. En los existentes sólo
+    se sobrescriben los campos que trae la fila (una columna ausente o una celda
+    vacía conserva el valor guardado, no el valor por defecto del schema), por lo
+    que se ejecuta una sentencia por cada combinación de campos presentes
+    (normalmente una sola por lote). Si una sentencia choca con otra restricción
+    (por ejemplo un email ya usado por otro cliente), se reintenta fila por fila
+    para aislar a las culpables. No hace commit: lo decide quien llama.
+
+    Returns:
+        (insertados, actualizados, errores como {"indice", "error"})
+    """
+    clientes, errores = descartar_conflictos_conocidos(db, clientes)
+    if not clientes:
+        return 0, 0, errores
+    numeros = asignar_numeros_cliente(db, len(clientes))
+    ahora = get_utc_now()
+    grupos: Dict[Tuple[str, ...], List[Tuple[int, Dict[str, Any]]]] = {}
+    for (indice, cliente), numero in zip(clientes, numeros):
+        campos = tuple(campo for campo in CAMPOS_ACTUALIZABLES if campo in cliente.model_fields_set)
+        grupos.setdefault(campos, []).append((indice, {
+            **cliente.model_dump(),
+            "id": uuid.uuid4(),
+            "numero_cliente": numero,
+            "creado_por_id": user_id,
+            "modificado_por_id": user_id,
+            "fecha_creacion": ahora,
+            "fecha_modificacion": ahora,
+        }))
+
+    insertados = actualizados = 0
+    for campos, filas in grupos.items():
+        try:
+            with db.begin_nested():
+                resultado = db.execute(_sentencia_upsert([valores for _, valores in filas], campos)).all()
+        except (IntegrityError, DataError):
+            for indice, valores in filas:
+                try:
+                    with db.begin_nested():
+                        _, insertado = db.execute(_sentencia_upsert([valores], campos)).one()
+                    if insertado:
+                        insertados += 1
+                    else:
+                        actualizados += 1
+                except (IntegrityError, DataError) as e:
+                    errores.append({"indice": indice, "error": str(e.orig).splitlines()[0]})
+        else:
+            for _, insertado in resultado:
+                if insertado:
+                    insertados += 1
+                else:
+                    actualizados += 1
+
+    errores.sort(key=lambda error: error["indice"])
+    return insertados, actualizados, errores
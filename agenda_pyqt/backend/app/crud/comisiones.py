@@ -0,0 +1,235 @@
+"""
+Liquidación de comisiones por período (mes de inicio de vigencia).
+
+Las primas del período se cargan de una vez en arreglos de NumPy, las tasas de
+tasas_comision y el porcentaje de cada usuario se aplican de forma vectorizada
+y las comisiones que cambiaron se graban con una sola sentencia UPDATE.
+
+La comisión de un movimiento es prima * tasa / 100, donde la tasa es la del
+corredor y tipo de seguro o, si no hay, la general del tipo. La parte del
+usuario (el que dio de alta al cliente) es comision * comision_porcentaje / 100.
+Los totales también se informan en la moneda base, convertidos en la consulta
+con la cotización de la fecha de inicio de cada movimiento.
+
+Cada liquidación se guarda con una firma leída de la base: cantidad y última
+fecha_modificacion de los movimientos del período, de las tasas y de los tipos
+de cambio, y última modificación de los usuarios (su porcentaje). Mientras no
+cambie se devuelve de la caché. Un alta posterior en el período (bordereaux, alta
+por lote, renovaciones), una modificación o un cambio de tasas o cotizaciones,
+hecho a través de cualquier proceso del servidor, cambia la firma y la
+liquidación siguiente recalcula el período y graba las comisiones nuevas.
+"""
+import threading
+from datetime import date
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import Float, Integer, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from ..models.cliente import Cliente
+from ..models.movimiento import MovimientoVigencia
+from ..models.tasa_comision import TasaComision
+from ..models.tipo_cambio import TipoCambio
+from ..models.usuario import Usuario
+from ..schemas.comision import TasaComisionBase, LiquidacionComisiones
+from .tipos_cambio import cotizacion
+
+# Liquidaciones de este proceso por (año, mes), con la firma del período al calcularlas
+_liquidaciones: Dict[Tuple[int, int], Tuple[Tuple[Any, ...], LiquidacionComisiones]] = {}
+_liquidaciones_lock = threading.Lock()
+
+def limites_periodo(anio: int, mes: int) -> Tuple[date, date]:
+    """Primer día del mes y primer día del mes siguiente."""
+    inicio = date(anio, mes, 1)
+    fin = date(anio + 1, 1, 1) if mes == 12 else date(anio, mes + 1, 1)
+    return inicio, fin
+
+def periodo_cerrado(anio: int, mes: int) -> bool:
+    return limites_periodo(anio, mes)[1] <= date.today()
+
+def get_tasas(db: Session) -> List[TasaComision]:
+    return db.query(TasaComision).order_by(TasaComision.tipo_seguro_id, TasaComision.corredor).all()
+
+def reemplazar_tasas(db: Session, tasas: List[TasaComisionBase]) -> List[TasaComision]:
+    """
+    Reemplaza la tabla de tasas completa. Las liquidaciones en caché de este
+    proceso se descartan; en los demás, las tasas nuevas cambian la firma.
+    """
+    db.query(TasaComision).delete(synchronize_session=False)
+    db.add_all(TasaComision(**tasa.model_dump()) for tasa in tasas)
+    db.commit()
+    invalidar_liquidaciones()
+    return get_tasas(db)
+
+def invalidar_liquidaciones() -> None:
+    with _liquidaciones_lock:
+        _liquidaciones.clear()
+
+def firma_periodo(db: Session, desde: date, hasta: date) -> Tuple[Any, ...]:
+    """
+    Cantidad y última modificación de los movimientos con fecha_inicio en
+    [desde, hasta), de las tasas y de los tipos de cambio, más la última
+    modificación de los usuarios, en una sola consulta.
+    """
+    movimientos = select(func.count(MovimientoVigencia.id), func.max(MovimientoVigencia.fecha_modificacion)).where(
+        MovimientoVigencia.fecha_inicio >= desde, MovimientoVigencia.fecha_inicio < hasta
+    ).subquery()
+    tasas = select(func.count(TasaComision.id), func.max(TasaComision.fecha_modificacion)).subquery()
+    cotizaciones = select(func.count(), func.max(TipoCambio.fecha_modificacion)).subquery()
+    usuarios = select(func.max(Usuario.fecha_modificacion)).scalar_subquery()
+    return tuple(db.execute(select(movimientos, tasas, cotizaciones, usuarios)).one())
+
+# Columnas que se cargan de cada movimiento y su tipo en NumPy
+COLUMNAS_LIQUIDACION = {
+    "id": (MovimientoVigencia.id, np.int64),
+    "prima": (MovimientoVigencia.prima, np.float64),
+    "comision": (MovimientoVigencia.comision, np.float64),
+    "corredor": (func.coalesce(MovimientoVigencia.corredor_id, 0), np.int64),
+    "tipo_seguro": (MovimientoVigencia.tipo_seguro_id, np.int64),
+    "moneda": (func.coalesce(MovimientoVigencia.moneda, ""), str),
+    "usuario": (Cliente.creado_por_id, np.int64),
+    # Cotización en la moneda base a la fecha de inicio (NULL -> NaN si falta)
+    "cotizacion": (cotizacion(MovimientoVigencia.moneda, MovimientoVigencia.fecha_inicio), np.float64),
+}
+
+def cargar_movimientos(db: Session, desde: date, hasta: date) -> Dict[str, np.ndarray]:
+    """
+    Columnas de los movimientos con fecha_inicio en [desde, hasta) como arreglos,
+    más el porcentaje del usuario de cada uno. Los NULL de corredor y moneda se
+    cargan como 0 y ''; los de comisión, como NaN.
+    """
+    expresiones = [expresion for expresion, _ in COLUMNAS_LIQUIDACION.values()]
+    periodo = (MovimientoVigencia.fecha_inicio >= desde, MovimientoVigencia.fecha_inicio < hasta)
+    if db.get_bind().dialect.name == "postgresql":
+        # Una fila con un arreglo por columna: no se construye un objeto por movimiento
+        sentencia = select(*[func.array_agg(expresion) for expresion in expresiones])
+        columnas = [valores or [] for valores in db.execute(
+            sentencia.select_from(MovimientoVigencia).join(Cliente).where(*periodo)
+        ).one()]
+    else:
+        sentencia = select(*expresiones).join(Cliente, MovimientoVigencia.cliente_id == Cliente.id)
+        columnas = list(zip(*db.execute(sentencia.where(*periodo)).all())) or [()] * len(expresiones)
+    datos = {
+        nombre: np.array(valores, dtype=tipo)
+        for (nombre, (_, tipo)), valores in zip(COLUMNAS_LIQUIDACION.items(), columnas)
+    }
+
+    usuarios = np.unique(datos["usuario"])
+    porcentajes = dict(db.query(Usuario.id, func.coalesce(Usuario.comision_porcentaje, 0))
+                       .filter(Usuario.id.in_(usuarios.tolist())).all())
+    por_usuario = np.array([porcentajes.get(usuario, 0.0) for usuario in usuarios.tolist()], dtype=np.float64)
+    datos["porcentaje_usuario"] = por_usuario[np.searchsorted(usuarios, datos["usuario"])]
+    return datos
+
+def tasas_por_movimiento(tasas: List[Tuple[int, int, float]], corredor: np.ndarray,
+                         tipo_seguro: np.ndarray) -> np.ndarray:
+    """
+    Porcentaje aplicable a cada movimiento. tasas son (corredor, tipo, porcentaje)
+    con corredor 0 para la tasa general; se busca primero la del corredor.
+    """
+    if not tasas or not len(tipo_seguro):
+        return np.zeros(len(tipo_seguro))
+    tabla = np.array(tasas, dtype=np.float64)
+    base = int(max(tabla[:, 1].max(), tipo_seguro.max())) + 1
+    claves = tabla[:, 0].astype(np.int64) * base + tabla[:, 1].astype(np.int64)
+    orden = np.argsort(claves)
+    claves, porcentajes = claves[orden], tabla[orden, 2]
+
+    def buscar(buscadas: np.ndarray) -> np.ndarray:
+        posiciones = np.minimum(np.searchsorted(claves, buscadas), len(claves) - 1)
+        return np.where(claves[posiciones] == buscadas, porcentajes[posiciones], np.nan)
+
+    del_corredor = buscar(corredor * base + tipo_seguro)
+    general = np.nan_to_num(buscar(tipo_seguro))
+    return np.where(np.isnan(del_corredor), general, del_corredor)
+
+def agrupar_comisiones(datos: Dict[str, np.ndarray], comision: np.ndarray) -> List[dict]:
+    """Totales por usuario, corredor y moneda."""
+    if not len(comision):
+        return []
+    monedas, codigo_moneda = np.unique(datos["moneda"], return_inverse=True)
+    # Una clave entera por combinación (más rápido que np.unique por filas)
+    dimensiones = (int(datos["usuario"].max()) + 1, int(datos["corredor"].max()) + 1, len(monedas))
+    claves = np.ravel_multi_index((datos["usuario"], datos["corredor"], codigo_moneda.ravel()), dimensiones)
+    grupos, grupo = np.unique(claves, return_inverse=True)
+    grupo = grupo.ravel()
+    cantidad = np.bincount(grupo)
+    total_prima = np.bincount(grupo, weights=datos["prima"])
+    total_comision = np.bincount(grupo, weights=comision)
+    comision_usuario = np.bincount(grupo, weights=comision * datos["porcentaje_usuario"] / 100)
+    # Un grupo con algún movimiento sin cotización queda en NaN y se informa como None
+    total_prima_base = np.bincount(grupo, weights=datos["prima"] * datos["cotizacion"])
+    total_comision_base = np.bincount(grupo, weights=comision * datos["cotizacion"])
+    return [
+        {
+            "usuario_id": int(usuario),
+            "corredor": int(corredor),
+            "moneda": str(monedas[moneda]),
+            "cantidad": int(cantidad[i]),
+            "total_prima": round(float(total_prima[i]), 2),
+            "total_comision": round(float(total_comision[i]), 2),
+            "comision_usuario": round(float(comision_usuario[i]), 2),
+            "total_prima_base": None if np.isnan(total_prima_base[i]) else round(float(total_prima_base[i]), 2),
+            "total_comision_base": None if np.isnan(total_comision_base[i]) else round(float(total_comision_base[i]), 2),
+        }
+        for i, (usuario, corredor, moneda) in enumerate(zip(*np.unravel_index(grupos, dimensiones)))
+    ]
+
+def grabar_comisiones(db: Session, ids: np.ndarray, comisiones: np.ndarray) -> None:
+    """Graba las comisiones por id en una sola sentencia (unnest de dos arreglos en PostgreSQL)."""
+    if not len(ids):
+        return
+    tabla = MovimientoVigencia.__table__
+    if db.get_bind().dialect.name == "postgresql":
+        valores = func.unnest(
+            bindparam("ids", type_=ARRAY(Integer)), bindparam("comisiones", type_=ARRAY(Float))
+        ).table_valued("id", "comision").render_derived(name="valores")
+        db.execute(
+            update(tabla).where(tabla.c.id == valores.c.id).values(comision=valores.c.comision),
+            {"ids": ids.tolist(), "comisiones": comisiones.tolist()},
+        )
+    else:
+        db.execute(
+            update(tabla).where(tabla.c.id == bindparam("b_id")).values(comision=bindparam("b_comision")),
+            [{"b_id": id_, "b_comision": comision} for id_, comision in zip(ids.tolist(), comisiones.tolist())],
+        )
+
+def liquidar_comisiones(db: Session, anio: int, mes: int, recalcular: bool = False) -> LiquidacionComisiones:
+    """
+    Calcula y graba las comisiones de los movimientos que empiezan en el mes.
+    Si la firma (movimientos del período, tasas, cotizaciones y usuarios) no
+    cambió desde la última liquidación de este proceso se devuelve la guardada,
+    salvo recalcular=True.
+    """
+    desde, hasta = limites_periodo(anio, mes)
+    if not recalcular:
+        with _liquidaciones_lock:
+            guardada = _liquidaciones.get((anio, mes))
+        if guardada is not None and guardada[0] == firma_periodo(db, desde, hasta):
+            return guardada[1].model_copy(update={"actualizados": 0, "cerrado": periodo_cerrado(anio, mes)})
+
+    datos = cargar_movimientos(db, desde, hasta)
+    tasas = [(tasa.corredor or 0, tasa.tipo_seguro_id, tasa.porcentaje) for tasa in get_tasas(db)]
+    porcentaje = tasas_por_movimiento(tasas, datos["corredor"], datos["tipo_seguro"])
+    comision = np.round(datos["prima"] * porcentaje / 100, 2)
+
+    # Sólo se escriben las que cambiaron (las NULL siempre)
+    cambiadas = ~np.isclose(comision, datos["comision"])
+    grabar_comisiones(db, datos["id"][cambiadas], comision[cambiadas])
+    db.commit()
+
+    liquidacion = LiquidacionComisiones(
+        anio=anio,
+        mes=mes,
+        cerrado=periodo_cerrado(anio, mes),
+        movimientos=len(comision),
+        actualizados=int(cambiadas.sum()),
+        grupos=agrupar_comisiones(datos, comision),
+    )
+    # La firma se toma después de grabar: las comisiones escritas también la cambian
+    firma = firma_periodo(db, desde, hasta)
+    with _liquidaciones_lock:
+        _liquidaciones[(anio, mes)] = (firma, liquidacion)
+    return liquidacion
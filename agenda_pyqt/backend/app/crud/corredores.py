@@ -1,6 +1,17 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
+from ..core.cache import CacheTTL
+from ..core.config import settings
+from ..models.cliente import Cliente
 from ..models.corredor import Corredor
-from ..schemas.corredor import CorredorCreate, CorredorUpdate
+from ..models.movimiento import MovimientoVigencia
+from ..schemas.corredor import CorredorCreate, CorredorResumen, CorredorUpdate, PrimaMoneda
+
+# Listados de corredores (datos de referencia: cambian rara vez y se piden en cada diálogo)
+cache_corredores = CacheTTL(settings.REFERENCIAS_CACHE_SEGUNDOS, nombre="corredores")
 
 def get_corredor(db: Session, corredor_id: int):
     """Obtener un corredor por ID"""
@@ -15,6 +26,7 @@ def create_corredor(db: Session, corredor: CorredorCreate):
     db_corredor = Corredor(**corredor.dict())
     db.add(db_corredor)
     db.commit()
+    cache_corredores.invalidar()
     db.refresh(db_corredor)
     return db_corredor
 
@@ -25,6 +37,7 @@ def update_corredor(db: Session, corredor_id: int, corredor: CorredorUpdate):
         for key, value in corredor.dict(exclude_unset=True).items():
             setattr(db_corredor, key, value)
         db.commit()
+        cache_corredores.invalidar()
         db.refresh(db_corredor)
     return db_corredor
 
@@ -34,5 +47,58 @@ def delete_corredor(db: Session, corredor_id: int):
     if db_corredor:
         db.delete(db_corredor)
         db.commit()
+        cache_corredores.invalidar()
         return True
     return False
+
+_resumenes = CacheTTL(settings.RESUMEN_CORREDOR_SEGUNDOS, nombre="resumen_corredor")
+
+def consultar_resumen_corredor(db: Session, numero: int, dias: int = 30) -> Optional[CorredorResumen]:
+    """
+    Indicadores de un corredor en una sola sentencia: sus pólizas activas
+    (versiones actuales no vencidas) agrupadas por moneda, con las que vencen en
+    los próximos `dias` como agregado FILTER y los clientes como subconsulta.
+    None si el corredor no existe.
+    """
+    hoy = date.today()
+    hasta = hoy + timedelta(days=dias)
+    movimiento = MovimientoVigencia
+    moneda = func.coalesce(movimiento.moneda, "")
+    clientes = select(func.count()).select_from(Cliente).where(Cliente.corredor == numero).scalar_subquery()
+    filas = db.execute(
+        select(
+            moneda.label("moneda"),
+            clientes.label("clientes"),
+            func.count(movimiento.id).label("cantidad"),
+            func.coalesce(func.sum(movimiento.prima), 0).label("total_prima"),
+            func.count(movimiento.id).filter(movimiento.fecha_vencimiento <= hasta).label("vencen"),
+        )
+        .select_from(Corredor)
+        .outerjoin(movimiento, and_(
+            movimiento.corredor_id == Corredor.numero,
+            movimiento.actual,
+            movimiento.fecha_vencimiento >= hoy,
+        ))
+        .where(Corredor.numero == numero)
+        .group_by(moneda)
+        .order_by(moneda)
+    ).all()
+    if not filas:
+        return None
+    # Sin pólizas activas el LEFT JOIN deja una sola fila con cantidad 0
+    filas_con_polizas = [fila for fila in filas if fila.cantidad]
+    return CorredorResumen(
+        numero=numero,
+        clientes=filas[0].clientes,
+        polizas_activas=sum(fila.cantidad for fila in filas_con_polizas),
+        vencen_proximos=sum(fila.vencen for fila in filas_con_polizas),
+        hasta=hasta,
+        primas=[
+            PrimaMoneda(moneda=fila.moneda, cantidad=fila.cantidad, total_prima=fila.total_prima)
+            for fila in filas_con_polizas
+        ],
+    )
+
+def get_resumen_corredor(db: Session, numero: int, dias: int = 30) -> Optional[CorredorResumen]:
+    """Resumen del corredor guardado en memoria unos segundos (RESUMEN_CORREDOR_SEGUNDOS)."""
+    return _resumenes.obtener((numero, dias, date.today()), lambda: consultar_resumen_corredor(db, numero, dias))
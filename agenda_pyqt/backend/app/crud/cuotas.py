@@ -0,0 +1,151 @@
+"""
+Cuotas de los movimientos: generación masiva y cobranza de las vencidas.
+
+Las cuotas de un lote de movimientos se generan con un único INSERT ... SELECT
+(cada movimiento unido a la serie 1..cantidad de cuotas), de modo que una
+renovación masiva no hace una sentencia por póliza. Vencen mensualmente desde el
+inicio de vigencia; la última absorbe el redondeo para que la suma sea
+exactamente la prima. Si después cambia la prima, la cantidad de cuotas o el
+inicio de vigencia, las impagas se vuelven a generar.
+"""
+from datetime import date
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import Date, Integer, Numeric, Select, case, cast, delete, exists, func, insert, literal_column, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+from ..models.cliente import Cliente
+from ..models.cuota import Cuota
+from ..models.movimiento import MovimientoVigencia
+
+class sumar_meses(FunctionElement):
+    """sumar_meses(fecha, meses): la fecha `meses` meses después."""
+    type = Date()
+    inherit_cache = True
+
+@compiles(sumar_meses)
+def _sumar_meses(elemento, compilador, **kw):
+    fecha, meses = list(elemento.clauses)
+    return (f"CAST({compilador.process(fecha, **kw)} + "
+            f"make_interval(0, {compilador.process(meses, **kw)}) AS DATE)")
+
+@compiles(sumar_meses, "sqlite")
+def _sumar_meses_sqlite(elemento, compilador, **kw):
+    fecha, meses = list(elemento.clauses)
+    return f"date({compilador.process(fecha, **kw)}, '+' || ({compilador.process(meses, **kw)}) || ' months')"
+
+def sentencia_cuotas(movimiento_ids: List[int]) -> Select:
+    """SELECT de las cuotas de los movimientos indicados (una cuota si no tienen cantidad)."""
+    cuotas = func.coalesce(MovimientoVigencia.cuotas, 1)
+    cantidad = case((cuotas > 1, cuotas), else_=1)
+    # Serie 1..máximo de cuotas del lote (CTE recursiva: igual en PostgreSQL y SQLite)
+    maximo = select(func.max(cantidad)).where(MovimientoVigencia.id.in_(movimiento_ids)).scalar_subquery()
+    serie = select(literal_column("1", Integer).label("numero")).cte("serie", recursive=True)
+    serie = serie.union_all(select(serie.c.numero + 1).where(serie.c.numero < maximo))
+    expandidos = (
+        select(
+            MovimientoVigencia.id,
+            MovimientoVigencia.prima,
+            MovimientoVigencia.fecha_inicio,
+            cantidad.label("cantidad"),
+            serie.c.numero,
+        )
+        .join(serie, serie.c.numero <= cantidad)
+        .where(MovimientoVigencia.id.in_(movimiento_ids))
+        .subquery()
+    )
+    monto_cuota = func.round(cast(expandidos.c.prima / expandidos.c.cantidad, Numeric), 2)
+    return select(
+        expandidos.c.id.label("movimiento_id"),
+        expandidos.c.numero,
+        case(
+            (expandidos.c.numero == expandidos.c.cantidad,
+             expandidos.c.prima - monto_cuota * (expandidos.c.cantidad - 1)),
+            else_=monto_cuota,
+        ).label("monto"),
+        sumar_meses(expandidos.c.fecha_inicio, expandidos.c.numero - 1).label("fecha_vencimiento"),
+    )
+
+def generar_cuotas(db: Session, movimiento_ids: Iterable[int]) -> None:
+    """
+    Inserta las cuotas de los movimientos en una sola sentencia.
+    No hace commit: lo decide quien llama (va en la transacción del alta).
+    """
+    movimiento_ids = list(movimiento_ids)
+    if not movimiento_ids:
+        return
+    db.execute(
+        insert(Cuota).from_select(
+            ["movimiento_id", "numero", "monto", "fecha_vencimiento"], sentencia_cuotas(movimiento_ids)
+        )
+    )
+
+def regenerar_cuotas(db: Session, movimiento_ids: Iterable[int]) -> None:
+    """
+    Rehace las cuotas impagas de los movimientos según su prima, cantidad de
+    cuotas e inicio de vigencia actuales. Las pagadas se conservan como se cobraron y su número no se
+    vuelve a generar. No hace commit (va en la transacción de la modificación).
+    """
+    movimiento_ids = list(movimiento_ids)
+    if not movimiento_ids:
+        return
+    db.execute(
+        delete(Cuota).where(Cuota.movimiento_id.in_(movimiento_ids), ~Cuota.pagada),
+        execution_options={"synchronize_session": False},
+    )
+    nuevas = sentencia_cuotas(movimiento_ids).subquery()
+    pagada = exists().where(Cuota.movimiento_id == nuevas.c.movimiento_id, Cuota.numero == nuevas.c.numero)
+    db.execute(
+        insert(Cuota).from_select(
+            ["movimiento_id", "numero", "monto", "fecha_vencimiento"],
+            select(nuevas.c.movimiento_id, nuevas.c.numero, nuevas.c.monto, nuevas.c.fecha_vencimiento)
+            .where(~pagada),
+        )
+    )
+
+def get_cuotas_movimiento(db: Session, movimiento_id: int) -> List[Cuota]:
+    return db.query(Cuota).filter(Cuota.movimiento_id == movimiento_id).order_by(Cuota.numero).all()
+
+def cuotas_vencidas(
+    db: Session, al: date, corredor: Optional[int] = None, limit: int = 500
+) -> List[Any]:
+    """
+    Cuotas impagas que vencieron antes de `al`, ordenadas por corredor y atraso.
+    Recorre sólo el índice parcial de cuotas pendientes y llega al movimiento y
+    al cliente por clave primaria.
+    """
+    sentencia = (
+        select(
+            Cuota.id,
+            Cuota.movimiento_id,
+            Cuota.numero,
+            Cuota.monto,
+            Cuota.fecha_vencimiento,
+            MovimientoVigencia.corredor_id.label("corredor"),
+            MovimientoVigencia.numero_poliza,
+            MovimientoVigencia.moneda,
+            Cliente.numero_cliente.label("cliente"),
+            (func.coalesce(Cliente.nombres, "") + " " + Cliente.apellidos).label("cliente_nombre"),
+        )
+        .join(MovimientoVigencia, Cuota.movimiento_id == MovimientoVigencia.id)
+        .join(Cliente, MovimientoVigencia.cliente_id == Cliente.id)
+        .where(~Cuota.pagada, Cuota.fecha_vencimiento < al)
+        .order_by(MovimientoVigencia.corredor_id, Cuota.fecha_vencimiento, Cuota.id)
+        .limit(limit)
+    )
+    if corredor is not None:
+        sentencia = sentencia.where(MovimientoVigencia.corredor_id == corredor)
+    return db.execute(sentencia).all()
+
+def registrar_pago(db: Session, cuota_id: int, pagada: bool, fecha_pago: Optional[date] = None) -> Optional[Cuota]:
+    """Marca una cuota como pagada (por defecto, hoy) o anula el pago."""
+    cuota = db.query(Cuota).filter(Cuota.id == cuota_id).first()
+    if cuota is None:
+        return None
+    cuota.pagada = pagada
+    cuota.fecha_pago = (fecha_pago or date.today()) if pagada else None
+    db.commit()
+    db.refresh(cuota)
+    return cuota
@@ -0,0 +1,59 @@
+"""
+Exportación de tablas completas en CSV o NDJSON por streaming.
+
+Las filas se leen con un cursor del lado del servidor (stream_results +
+yield_per) y se escriben a medida que llegan, sin hidratar objetos ORM ni
+armar la respuesta completa en memoria.
+"""
+import csv
+import io
+import json
+from typing import Iterator
+
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+from ..db.session import SessionLocal
+
+FORMATOS_EXPORTACION = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Filas que se piden al cursor del servidor en cada viaje
+FILAS_POR_LOTE = 2000
+
+def exportar_filas(db: Session, sentencia: Select, formato: str) -> Iterator[str]:
+    """Genera el contenido de la exportación de a un bloque de filas por vez."""
+    resultado = db.execute(
+        sentencia.execution_options(stream_results=True, yield_per=FILAS_POR_LOTE)
+    )
+    columnas = list(resultado.keys())
+
+    if formato == "csv":
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        escritor.writerow(columnas)
+        yield buffer.getvalue()
+        for lote in resultado.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            escritor.writerows(lote)
+            yield buffer.getvalue()
+    else:
+        for lote in resultado.partitions():
+            yield "".join(
+                json.dumps(dict(zip(columnas, fila)), default=str, ensure_ascii=False) + "\n"
+                for fila in lote
+            )
+
+def transmitir_exportacion(sentencia: Select, formato: str) -> Iterator[str]:
+    """
+    Igual que exportar_filas, pero con una sesión propia que vive mientras dura
+    la respuesta (la sesión de la dependencia get_db puede cerrarse antes).
+    """
+    db = SessionLocal()
+    try:
+        yield from exportar_filas(db, sentencia, formato)
+    finally:
+        db.close()
@@ -0,0 +1,176 @@
+"""
+Importación de clientes desde planillas CSV/XLSX.
+
+El archivo se procesa como una cadena de generadores (lectura -> normalización
+-> lotes -> validación -> upsert), con un commit por lote, de modo que la
+memoria usada no depende del tamaño del archivo.
+"""
+import csv
+import os
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..schemas.cliente import ImportacionClientes
+from .clientes_masivo import validar_clientes, upsert_clientes
+
+TAMANO_LOTE_IMPORTACION = 1000
+
+FORMATOS_IMPORTACION = ("csv", "xlsx")
+
+# Nombres de columna habituales en planillas heredadas
+ALIAS_COLUMNAS = {
+    "documento": "numero_documento",
+    "nro_documento": "numero_documento",
+    "email": "mail",
+    "e-mail": "mail",
+    "correo": "mail",
+    "telefono": "telefonos",
+    "celular": "movil",
+    "nombre": "nombres",
+    "apellido": "apellidos",
+}
+
+# Estado de las importaciones de este proceso (las terminadas se descartan pasado
+# IMPORTACIONES_RETENCION_SEGUNDOS, junto con su CSV de errores)
+_importaciones: Dict[str, ImportacionClientes] = {}
+_importaciones_lock = threading.Lock()
+
+def leer_csv(ruta: str) -> Iterator[Dict[str, Any]]:
+    """Lee un CSV fila por fila detectando el separador (',' o ';')."""
+    with open(ruta, newline="", encoding="utf-8-sig") as archivo:
+        muestra = archivo.read(4096)
+        archivo.seek(0)
+        try:
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+        except csv.Error:
+            dialecto = csv.excel
+        yield from csv.DictReader(archivo, dialect=dialecto)
+
+def leer_xlsx(ruta: str) -> Iterator[Dict[str, Any]]:
+    """Lee la primera hoja de un XLSX en modo de solo lectura (sin cargarla entera)."""
+    from openpyxl import load_workbook
+
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezados = [str(celda or "") for celda in next(filas, ())]
+        for fila in filas:
+            yield dict(zip(encabezados, fila))
+    finally:
+        libro.close()
+
+def normalizar_fila(fila: Dict[str, Any], alias: Dict[str, str] = ALIAS_COLUMNAS) -> Dict[str, Any]:
+    """
+    Normaliza encabezados y valores: nombres de columna en minúsculas con alias,
+    números enteros como texto, fechas sin hora y celdas vacías omitidas.
+    """
+    normalizada = {}
+    for columna, valor in fila.items():
+        if columna is None or valor is None:
+            continue
+        clave = str(columna).strip().lower().replace(" ", "_")
+        clave = alias.get(clave, clave)
+        if isinstance(valor, datetime):
+            valor = valor.date()
+        elif isinstance(valor, float) and valor.is_integer():
+            valor = str(int(valor))
+        elif isinstance(valor, int) and clave != "corredor":
+            valor = str(valor)
+        elif isinstance(valor, str):
+            valor = valor.strip()
+        if valor == "":
+            continue
+        normalizada[clave] = valor
+    return normalizada
+
+def en_lotes(filas: Iterable[Tuple[int, Dict[str, Any]]], tamano: int) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    """Agrupa un iterable en listas de a lo sumo `tamano` elementos."""
+    iterador = iter(filas)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+def _lector(formato: str):
+    return leer_xlsx if formato == "xlsx" else leer_csv
+
+def purgar_importaciones(retencion: int = settings.IMPORTACIONES_RETENCION_SEGUNDOS) -> None:
+    """Descarta las importaciones terminadas hace más de `retencion` segundos y borra su CSV de errores."""
+    limite = datetime.now(timezone.utc) - timedelta(seconds=retencion)
+    with _importaciones_lock:
+        vencidas = [
+            importacion for importacion in _importaciones.values()
+            if importacion.fecha_fin is not None and importacion.fecha_fin < limite
+        ]
+        for importacion in vencidas:
+            del _importaciones[importacion.id]
+    for importacion in vencidas:
+        if importacion.ruta_errores:
+            try:
+                os.remove(importacion.ruta_errores)
+            except FileNotFoundError:
+                pass
+
+def registrar_importacion(formato: str) -> ImportacionClientes:
+    """Da de alta una importación pendiente y devuelve su estado."""
+    purgar_importaciones()
+    importacion = ImportacionClientes(id=uuid.uuid4().hex, formato=formato)
+    with _importaciones_lock:
+        _importaciones[importacion.id] = importacion
+    return importacion
+
+def obtener_importacion(importacion_id: str) -> Optional[ImportacionClientes]:
+    """Estado de una importación de este proceso, o None si no existe o ya se descartó."""
+    purgar_importaciones()
+    with _importaciones_lock:
+        return _importaciones.get(importacion_id)
+
+def procesar_importacion(db: Session, importacion: ImportacionClientes, ruta: str, user_id: int) -> None:
+    """
+    Procesa el archivo por lotes, actualizando el progreso de `importacion`.
+    Los rechazos se escriben a medida que aparecen en un CSV de errores
+    (fila, numero_documento, error) cuya ruta queda en importacion.ruta_errores.
+    """
+    descriptor, ruta_errores = tempfile.mkstemp(prefix="importacion_errores_", suffix=".csv")
+    importacion.estado = "procesando"
+    try:
+        with os.fdopen(descriptor, "w", newline="", encoding="utf-8") as archivo_errores:
+            escritor = csv.writer(archivo_errores)
+            escritor.writerow(["fila", "numero_documento", "error"])
+
+            filas = enumerate(map(normalizar_fila, _lector(importacion.formato)(ruta)))
+            for lote in en_lotes(filas, TAMANO_LOTE_IMPORTACION):
+                validos, errores = validar_clientes(lote)
+                insertados, actualizados, errores_upsert = upsert_clientes(db, validos, user_id)
+                db.commit()
+
+                datos_por_indice = dict(lote)
+                for error in sorted(errores + errores_upsert, key=lambda e: e["indice"]):
+                    escritor.writerow([
+                        # La fila 1 del archivo es el encabezado
+                        error["indice"] + 2,
+                        datos_por_indice[error["indice"]].get("numero_documento", ""),
+                        error["error"],
+                    ])
+                importacion.filas_procesadas += len(lote)
+                importacion.insertados += insertados
+                importacion.actualizados += actualizados
+                importacion.errores += len(errores) + len(errores_upsert)
+        importacion.ruta_errores = ruta_errores
+        importacion.estado = "terminada"
+    except Exception as e:
+        db.rollback()
+        importacion.ruta_errores = ruta_errores
+        importacion.estado = "fallida"
+        importacion.detalle = str(e)
+        raise
+    finally:
+        importacion.fecha_fin = datetime.now(timezone.utc)
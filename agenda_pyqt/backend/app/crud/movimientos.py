@@ -1,7 +1,57 @@
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Any, Dict, Optional, Sequence
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
 from uuid import UUID
-from ..models.movimiento import MovimientoVigencia
+from ..models.cliente import Cliente
+from ..models.movimiento import CLAVE_POLIZA_ENDOSO_INICIO, MovimientoVigencia
+from ..core.campos import seleccionar_campos
+from .cuotas import regenerar_cuotas
 from ..schemas.movimiento import MovimientoVigenciaCreate
+from ..schemas.movimiento import MovimientoVigencia as MovimientoVigenciaSchema
+
+# Campos que determinan el plan de cuotas: si cambian se rehacen las impagas
+CAMPOS_PLAN_CUOTAS = ("prima", "cuotas", "fecha_inicio")
+
+def columnas_movimiento(movimiento: MovimientoVigenciaCreate, cliente_id: UUID) -> Dict[str, Any]:
+    """Valores de las columnas de un movimiento a partir del formato del frontend (Premio, Vto_Desde...)."""
+    return {
+        "cliente_id": cliente_id,
+        "corredor_id": movimiento.Corredor,
+        "tipo_seguro_id": movimiento.Tipo_seguro,
+        "carpeta": movimiento.Carpeta,
+        "numero_poliza": movimiento.Poliza,
+        "endoso": movimiento.Endoso,
+        "fecha_inicio": movimiento.Vto_Desde,
+        "fecha_vencimiento": movimiento.Vto_Hasta,
+        "moneda": movimiento.Moneda,
+        # Premio es a la vez la prima y la suma asegurada
+        "suma_asegurada": movimiento.Premio,
+        "prima": movimiento.Premio,
+        "cuotas": movimiento.Cuotas,
+        "observaciones": movimiento.Observaciones,
+    }
+
+def existe_movimiento(db: Session, numero_poliza: str, endoso: Optional[str], fecha_inicio: date) -> bool:
+    """Si ya hay un movimiento con esa póliza, endoso e inicio (la clave única uq_movimientos_poliza_endoso_inicio)."""
+    poliza, endoso_clave, inicio = CLAVE_POLIZA_ENDOSO_INICIO
+    return db.query(
+        db.query(MovimientoVigencia)
+        .filter(poliza == numero_poliza, endoso_clave == (endoso or ""), inicio == fecha_inicio)
+        .exists()
+    ).scalar()
+
+def actualizar_movimiento(db: Session, db_movimiento: MovimientoVigencia, valores: Dict[str, Any]) -> None:
+    """
+    Asigna los valores de las columnas y, si cambia el plan de pagos (prima, cuotas
+    o inicio de vigencia), rehace las cuotas impagas. No hace commit.
+    """
+    plan_anterior = [getattr(db_movimiento, campo) for campo in CAMPOS_PLAN_CUOTAS]
+    for columna, valor in valores.items():
+        setattr(db_movimiento, columna, valor)
+    if [getattr(db_movimiento, campo) for campo in CAMPOS_PLAN_CUOTAS] != plan_anterior:
+        db.flush()
+        regenerar_cuotas(db, [db_movimiento.id])
 
 def create_movimiento_vigencia(db: Session, movimiento: MovimientoVigenciaCreate):
     """Crear un nuevo movimiento de vigencia"""
@@ -33,9 +83,10 @@ def update_movimiento_vigencia(db: Session, movimiento_id: int, movimiento: Movi
     try:
         db_movimiento = db.query(MovimientoVigencia).filter(MovimientoVigencia.id == movimiento_id).first()
         if db_movimiento:
-            movimiento_data = movimiento.model_dump()
-            for key, value in movimiento_data.items():
-                setattr(db_movimiento, key, value)
+            cliente_id = db.query(Cliente.id).filter(Cliente.numero_cliente == movimiento.Cliente).scalar()
+            if cliente_id is None:
+                raise ValueError(f"Cliente número {movimiento.Cliente} no encontrado")
+            actualizar_movimiento(db, db_movimiento, columnas_movimiento(movimiento, cliente_id))
             db.commit()
             db.refresh(db_movimiento)
         return db_movimiento
@@ -55,3 +106,123 @@ def delete_movimiento_vigencia(db: Session, movimiento_id: int):
     except Exception as e:
         db.rollback()
         raise e
+
+def movimiento_a_schema(mov: MovimientoVigencia) -> MovimientoVigenciaSchema:
+    """Transforma un movimiento (con su cliente cargado) al formato esperado por el frontend"""
+    return MovimientoVigenciaSchema(
+        Id_movimiento=mov.id,
+        FechaMov=mov.fecha_inicio,
+        Corredor=mov.corredor_id,
+        Cliente=mov.cliente_rel.numero_cliente,
+        Cliente_nombre=f"{mov.cliente_rel.nombres} {mov.cliente_rel.apellidos}",
+        Tipo_seguro=mov.tipo_seguro_id,
+        Carpeta=mov.carpeta,
+        Poliza=mov.numero_poliza,
+        Endoso=mov.endoso,
+        Vto_Desde=mov.fecha_inicio,
+        Vto_Hasta=mov.fecha_vencimiento,
+        Moneda=mov.moneda,
+        Premio=mov.prima,
+        Cuotas=mov.cuotas,
+        Observaciones=mov.observaciones,
+        Actual=mov.actual,
+        Version_anterior=mov.version_anterior_id
+    )
+
+# Expresión SQL de cada campo de schemas.MovimientoVigencia (para el parámetro fields)
+CAMPOS_MOVIMIENTO = {
+    "Id_movimiento": MovimientoVigencia.id,
+    "FechaMov": MovimientoVigencia.fecha_inicio,
+    "Corredor": MovimientoVigencia.corredor_id,
+    "Cliente": Cliente.numero_cliente,
+    "Cliente_nombre": func.coalesce(Cliente.nombres, "") + " " + Cliente.apellidos,
+    "Tipo_seguro": MovimientoVigencia.tipo_seguro_id,
+    "Carpeta": MovimientoVigencia.carpeta,
+    "Poliza": MovimientoVigencia.numero_poliza,
+    "Endoso": MovimientoVigencia.endoso,
+    "Vto_Desde": MovimientoVigencia.fecha_inicio,
+    "Vto_Hasta": MovimientoVigencia.fecha_vencimiento,
+    "Moneda": MovimientoVigencia.moneda,
+    "Premio": MovimientoVigencia.prima,
+    "Cuotas": MovimientoVigencia.cuotas,
+    "Observaciones": MovimientoVigencia.observaciones,
+    "Actual": MovimientoVigencia.actual,
+    "Version_anterior": MovimientoVigencia.version_anterior_id,
+}
+
+# Campos que se leen de la tabla clientes (requieren el join)
+CAMPOS_MOVIMIENTO_CLIENTE = {"Cliente", "Cliente_nombre"}
+
+def seleccionar_movimientos(query: Query, campos: Sequence[str]) -> Query:
+    """
+    Proyecta una consulta de MovimientoVigencia a las columnas de los campos pedidos.
+    Los datos del cliente se leen con un join en la misma sentencia (nunca con una
+    carga diferida por fila) y sólo si se piden.
+    """
+    if CAMPOS_MOVIMIENTO_CLIENTE.intersection(campos):
+        query = query.join(Cliente, Cliente.id == MovimientoVigencia.cliente_id)
+    return seleccionar_campos(query, CAMPOS_MOVIMIENTO, campos)
+
+# Columnas por las que se puede ordenar el listado ("-" delante para orden descendente)
+ORDENES_MOVIMIENTO = {
+    "id": MovimientoVigencia.id,
+    "fecha_inicio": MovimientoVigencia.fecha_inicio,
+    "fecha_vencimiento": MovimientoVigencia.fecha_vencimiento,
+    "poliza": MovimientoVigencia.numero_poliza,
+    "prima": MovimientoVigencia.prima,
+}
+
+def filtrar_movimientos(
+    query: Query,
+    corredor_id: Optional[int] = None,
+    tipo_seguro_id: Optional[int] = None,
+    moneda: Optional[str] = None,
+    fecha_inicio_desde: Optional[date] = None,
+    fecha_inicio_hasta: Optional[date] = None,
+    fecha_vencimiento_desde: Optional[date] = None,
+    fecha_vencimiento_hasta: Optional[date] = None,
+    poliza: Optional[str] = None,
+    actuales: bool = False,
+) -> Query:
+    """
+    Aplica los filtros indicados (los None se ignoran). Los rangos de fechas son
+    inclusivos, poliza filtra por prefijo del número de póliza y actuales deja
+    sólo la versión actual de cada póliza (la cartera activa).
+    """
+    if corredor_id is not None:
+        query = query.filter(MovimientoVigencia.corredor_id == corredor_id)
+    if tipo_seguro_id is not None:
+        query = query.filter(MovimientoVigencia.tipo_seguro_id == tipo_seguro_id)
+    if moneda:
+        query = query.filter(MovimientoVigencia.moneda == moneda)
+    if fecha_inicio_desde:
+        query = query.filter(MovimientoVigencia.fecha_inicio >= fecha_inicio_desde)
+    if fecha_inicio_hasta:
+        query = query.filter(MovimientoVigencia.fecha_inicio <= fecha_inicio_hasta)
+    if fecha_vencimiento_desde:
+        query = query.filter(MovimientoVigencia.fecha_vencimiento >= fecha_vencimiento_desde)
+    if fecha_vencimiento_hasta:
+        query = query.filter(MovimientoVigencia.fecha_vencimiento <= fecha_vencimiento_hasta)
+    if poliza:
+        # LIKE 'prefijo%' (con % y _ escapados): usa ix_movimientos_poliza_prefijo
+        query = query.filter(MovimientoVigencia.numero_poliza.startswith(poliza, autoescape=True))
+    if actuales:
+        query = query.filter(MovimientoVigencia.actual)
+    return query
+
+def ordenar_movimientos(query: Query, orden: str) -> Query:
+    """Ordena por una clave de ORDENES_MOVIMIENTO, desempatando por id para que la paginación sea estable."""
+    descendente = orden.startswith("-")
+    columna = ORDENES_MOVIMIENTO[orden.lstrip("-")]
+    if descendente:
+        return query.order_by(columna.desc(), MovimientoVigencia.id.desc())
+    return query.order_by(columna, MovimientoVigencia.id)
+
+def query_movimientos_por_poliza(db: Session, prefijo: str) -> Query:
+    """
+    Movimientos cuyo número de póliza empieza con `prefijo`, agrupados por póliza y
+    cada una con su cadena de endosos en orden (por inicio de vigencia y alta).
+    """
+    return filtrar_movimientos(db.query(MovimientoVigencia), poliza=prefijo).order_by(
+        MovimientoVigencia.numero_poliza, MovimientoVigencia.fecha_inicio, MovimientoVigencia.id
+    )
@@ -0,0 +1,151 @@
+"""
+Alta de movimientos por lote (por ejemplo, los vehículos de una póliza de flota).
+
+Las referencias de todo el lote se resuelven con una consulta IN por tabla
+(clientes, corredores y tipos de seguro) y los movimientos se insertan con un
+único INSERT ... ON CONFLICT DO NOTHING RETURNING, en la transacción de quien
+llama. Cada elemento que no se puede dar de alta se informa con su índice.
+"""
+from typing import Any, Dict, Iterable, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..models.cliente import Cliente, get_utc_now
+from ..models.corredor import Corredor
+from ..models.movimiento import CLAVE_POLIZA_ENDOSO_INICIO, MovimientoVigencia
+from ..models.tipo_seguro import TipoSeguro
+from ..models.version_poliza import encadenar_versiones
+from ..schemas.movimiento import MovimientoVigenciaCreate
+from .clientes_masivo import formatear_error_validacion
+from .cuotas import generar_cuotas
+from .movimientos import columnas_movimiento
+
+def validar_movimientos(
+    filas: Iterable[Tuple[int, Dict[str, Any]]]
+) -> Tuple[List[Tuple[int, MovimientoVigenciaCreate]], List[Dict[str, Any]]]:
+    """
+    Valida cada fila con MovimientoVigenciaCreate.
+
+    Returns:
+        (filas válidas como (índice, movimiento), errores como {"indice", "error"})
+    """
+    validos: List[Tuple[int, MovimientoVigenciaCreate]] = []
+    errores: List[Dict[str, Any]] = []
+    for indice, datos in filas:
+        try:
+            validos.append((indice, MovimientoVigenciaCreate.model_validate(datos)))
+        except ValidationError as e:
+            errores.append({"indice": indice, "error": formatear_error_validacion(e)})
+    return validos, errores
+
+def resolver_movimientos(
+    db: Session,
+    movimientos: List[Tuple[int, MovimientoVigenciaCreate]]
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Convierte los movimientos en los valores de la tabla: resuelve los números de
+    cliente a su id y verifica corredores y tipos de seguro (una consulta por tabla
+    para todo el lote). También descarta las pólizas repetidas dentro del lote.
+
+    Returns:
+        (filas como (índice, valores), errores como {"indice", "error"})
+    """
+    numeros_cliente = {m.Cliente for _, m in movimientos}
+    corredores = {m.Corredor for _, m in movimientos}
+    tipos = {m.Tipo_seguro for _, m in movimientos}
+    clientes = dict(db.execute(
+        select(Cliente.numero_cliente, Cliente.id).where(Cliente.numero_cliente.in_(numeros_cliente))
+    ).all()) if numeros_cliente else {}
+    corredores_existentes = set(db.execute(
+        select(Corredor.numero).where(Corredor.numero.in_(corredores))
+    ).scalars()) if corredores else set()
+    tipos_existentes = set(db.execute(
+        select(TipoSeguro.Id_tipo).where(TipoSeguro.Id_tipo.in_(tipos))
+    ).scalars()) if tipos else set()
+
+    errores: List[Dict[str, Any]] = []
+    filas: List[Tuple[int, Dict[str, Any]]] = []
+    claves_vistas: Dict[Tuple[str, str, Any], int] = {}
+    ahora = get_utc_now()
+    for indice, movimiento in movimientos:
+        clave = (movimiento.Poliza, movimiento.Endoso or "", movimiento.Vto_Desde)
+        if movimiento.Cliente not in clientes:
+            errores.append({"indice": indice, "error": f"Cliente número {movimiento.Cliente} no encontrado"})
+        elif movimiento.Corredor not in corredores_existentes:
+            errores.append({"indice": indice, "error": f"El corredor {movimiento.Corredor} no existe"})
+        elif movimiento.Tipo_seguro not in tipos_existentes:
+            errores.append({"indice": indice, "error": f"El tipo de seguro {movimiento.Tipo_seguro} no existe"})
+        elif not movimiento.Poliza:
+            errores.append({"indice": indice, "error": "Falta el número de póliza"})
+        elif movimiento.Premio is None:
+            errores.append({"indice": indice, "error": "Falta el premio"})
+        elif clave in claves_vistas:
+            errores.append({
+                "indice": indice,
+                "error": f"Póliza {movimiento.Poliza} repetida (mismo endoso e inicio) en la fila {claves_vistas[clave]}"
+            })
+        else:
+            claves_vistas[clave] = indice
+            filas.append((indice, {
+                **columnas_movimiento(movimiento, clientes[movimiento.Cliente]),
+                "fecha_modificacion": ahora,
+            }))
+    return filas, errores
+
+def insertar_movimientos(
+    db: Session,
+    movimientos: List[Tuple[int, MovimientoVigenciaCreate]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Inserta los movimientos en una sola sentencia y mantiene, en la misma
+    transacción, el resumen de vencimientos, la cadena de versiones y las cuotas.
+    Los que chocan con una póliza/endoso/inicio existente se informan como error
+    sin abortar el resto. No hace commit: lo decide quien llama.
+
+    Returns:
+        (creados como {"indice", "Id_movimiento"}, errores como {"indice", "error"})
+    """
+    filas, errores = resolver_movimientos(db, movimientos)
+    if not filas:
+        return [], errores
+
+    indices_por_clave = {
+        (valores["numero_poliza"], valores["endoso"] or "", valores["fecha_inicio"]): indice
+        for indice, valores in filas
+    }
+    sentencia = insert(MovimientoVigencia).values([valores for _, valores in filas]).on_conflict_do_nothing(
+        index_elements=CLAVE_POLIZA_ENDOSO_INICIO
+    ).returning(
+        MovimientoVigencia.id,
+        MovimientoVigencia.numero_poliza,
+        MovimientoVigencia.endoso,
+        MovimientoVigencia.fecha_inicio,
+        MovimientoVigencia.fecha_vencimiento,
+        MovimientoVigencia.corredor_id,
+        MovimientoVigencia.moneda,
+    )
+    insertados = db.execute(sentencia).all()
+
+    creados: List[Dict[str, Any]] = []
+    for fila in insertados:
+        creados.append({
+            "indice": indices_por_clave.pop((fila.numero_poliza, fila.endoso or "", fila.fecha_inicio)),
+            "Id_movimiento": fila.id,
+        })
+    # Lo que no volvió en RETURNING chocó con un movimiento existente
+    for indice in indices_por_clave.values():
+        errores.append({"indice": indice, "error": "Ya existe un movimiento con esa póliza, endoso e inicio"})
+
+    encadenar_versiones(
+        db.connection(),
+        (fila.numero_poliza for fila in insertados),
+        ((fila.fecha_vencimiento, fila.corredor_id, fila.moneda) for fila in insertados),
+    )
+    generar_cuotas(db, (fila.id for fila in insertados))
+
+    creados.sort(key=lambda creado: creado["indice"])
+    errores.sort(key=lambda error: error["indice"])
+    return creados, errores
@@ -0,0 +1,96 @@
+"""
+Particiones anuales de movimientos_vigencias (PostgreSQL).
+
+Cada año de fecha_inicio tiene su partición (movimientos_vigencias_<año>) y la
+partición DEFAULT recibe las filas de los años que todavía no la tienen. Al
+iniciar la aplicación se crean las de los próximos años y las de los años que
+hayan caído en la DEFAULT, pasando esas filas a su partición. Con una partición
+por año los reportes y consultas por rango de fechas recorren sólo los años que
+piden, y archivar un año es un ALTER TABLE ... DETACH PARTITION.
+"""
+import logging
+from datetime import date
+from typing import List, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from ..core.config import settings
+from ..models.movimiento import MovimientoVigencia
+
+logger = logging.getLogger(__name__)
+
+TABLA = MovimientoVigencia.__tablename__
+PARTICION_DEFAULT = f"{TABLA}_default"
+
+def nombre_particion(anio: int) -> str:
+    return f"{TABLA}_{anio}"
+
+# Clave del bloqueo consultivo que serializa la creación de particiones entre procesos
+BLOQUEO_PARTICIONES = 23
+
+def esta_particionada(conexion: Connection) -> bool:
+    """False si la base todavía no tiene aplicada la migración de particionado."""
+    return conexion.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = CAST(:tabla AS regclass)"), {"tabla": TABLA}
+    ).scalar() is True
+
+def anios_con_particion(conexion: Connection) -> Set[int]:
+    """Años que ya tienen partición propia (por el nombre de las particiones de la tabla)."""
+    nombres = conexion.execute(text("""
+        SELECT hija.relname
+        FROM pg_inherits
+        JOIN pg_class AS hija ON hija.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = CAST(:tabla AS regclass)
+    """), {"tabla": TABLA}).scalars()
+    prefijo = f"{TABLA}_"
+    return {int(nombre[len(prefijo):]) for nombre in nombres if nombre[len(prefijo):].isdigit()}
+
+def anios_en_default(conexion: Connection) -> List[int]:
+    """Años de las filas que quedaron en la partición DEFAULT (normalmente ninguno)."""
+    return list(conexion.execute(text(
+        f"SELECT DISTINCT CAST(extract(year FROM fecha_inicio) AS integer) FROM {PARTICION_DEFAULT} ORDER BY 1"
+    )).scalars())
+
+def crear_particion(conexion: Connection, anio: int) -> None:
+    """
+    Crea la partición de un año moviendo a ella las filas de ese año que estén en la
+    DEFAULT (al adjuntarla PostgreSQL verifica que la DEFAULT ya no tenga ninguna).
+    Los índices de la tabla se crean en la partición al adjuntarla.
+    """
+    particion = nombre_particion(anio)
+    desde, hasta = date(anio, 1, 1).isoformat(), date(anio + 1, 1, 1).isoformat()
+    # Que no entren filas de ese año a la DEFAULT entre el traspaso y el ATTACH
+    conexion.execute(text(f"LOCK TABLE {PARTICION_DEFAULT} IN SHARE ROW EXCLUSIVE MODE"))
+    conexion.execute(text(f"CREATE TABLE {particion} (LIKE {TABLA} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conexion.execute(text(f"""
+        WITH movidas AS (
+            DELETE FROM {PARTICION_DEFAULT}
+            WHERE fecha_inicio >= '{desde}' AND fecha_inicio < '{hasta}'
+            RETURNING *
+        )
+        INSERT INTO {particion} SELECT * FROM movidas
+    """))
+    conexion.execute(text(
+        f"ALTER TABLE {TABLA} ATTACH PARTITION {particion} FOR VALUES FROM ('{desde}') TO ('{hasta}')"
+    ))
+
+def asegurar_particiones(conexion: Connection, anios_futuros: int = settings.PARTICIONES_ANIOS_FUTUROS) -> List[int]:
+    """
+    Crea las particiones que falten: la del año actual, las de los `anios_futuros`
+    siguientes y las de los años que tengan filas en la DEFAULT. Devuelve los años creados.
+    """
+    if not esta_particionada(conexion):
+        logger.warning(f"{TABLA} no está particionada: falta aplicar las migraciones")
+        return []
+    # Varios procesos pueden iniciar a la vez: el segundo espera y ya no encuentra faltantes
+    conexion.execute(text("SELECT pg_advisory_xact_lock(:clave)"), {"clave": BLOQUEO_PARTICIONES})
+    existentes = anios_con_particion(conexion)
+    actual = date.today().year
+    faltantes = sorted(
+        (set(range(actual, actual + anios_futuros + 1)) | set(anios_en_default(conexion))) - existentes
+    )
+    for anio in faltantes:
+        crear_particion(conexion, anio)
+        logger.info(f"Creada la partición {nombre_particion(anio)}")
+    return faltantes
@@ -0,0 +1,86 @@
+"""
+Renovación masiva de pólizas que vencen en un período.
+
+Cada póliza genera el movimiento del período siguiente (misma duración, a
+partir de su vencimiento) con un único INSERT ... SELECT, sin pasar por el ORM.
+"""
+from datetime import date
+from typing import Any, List, Optional
+
+from sqlalchemy import Date, Interval, Select, cast, func, insert, null, select
+from sqlalchemy.orm import Session
+
+from ..models.movimiento import MovimientoVigencia
+from ..models.version_poliza import encadenar_versiones
+from .cuotas import generar_cuotas
+
+# Columnas que se copian del movimiento original al renovado
+COLUMNAS_COPIADAS = [
+    "cliente_id", "corredor_id", "tipo_seguro_id", "carpeta", "numero_poliza",
+    "moneda", "suma_asegurada", "prima", "cuotas",
+]
+
+def sentencia_renovaciones(desde: date, hasta: date, corredor: Optional[int] = None) -> Select:
+    """
+    SELECT de los movimientos renovados: las pólizas que vencen entre desde y hasta
+    (inclusive) con sus fechas desplazadas un período. Se parte sólo de la versión
+    actual de cada póliza, de modo que sale una por póliza aunque tenga endosos y las
+    ya renovadas (cuya versión actual es la renovación) no se vuelven a renovar.
+    """
+    origen = MovimientoVigencia
+    # age() expresa la duración en años/meses/días: una póliza anual del 01/01 se
+    # renueva hasta el 01/01 siguiente aunque haya un 29 de febrero en el medio
+    duracion = func.age(origen.fecha_vencimiento, origen.fecha_inicio, type_=Interval)
+    sentencia = (
+        select(
+            *(getattr(origen, columna).label(columna) for columna in COLUMNAS_COPIADAS),
+            origen.fecha_vencimiento.label("fecha_inicio"),
+            cast(origen.fecha_vencimiento + duracion, Date).label("fecha_vencimiento"),
+            origen.id.label("movimiento_origen"),
+        )
+        # Recorre ix_movimientos_actuales_vencimiento (sólo versiones actuales)
+        .where(origen.actual, origen.fecha_vencimiento.between(desde, hasta))
+        .order_by(origen.fecha_vencimiento, origen.id)
+    )
+    if corredor is not None:
+        sentencia = sentencia.where(origen.corredor_id == corredor)
+    return sentencia
+
+def renovar_movimientos(
+    db: Session, desde: date, hasta: date, corredor: Optional[int] = None, dry_run: bool = True
+) -> List[Any]:
+    """
+    Genera las renovaciones del período. Con dry_run sólo devuelve lo que se crearía
+    (incluido el movimiento de origen); si no, las inserta en una sola sentencia,
+    actualiza el resumen de vencimientos y la cadena de versiones, genera las
+    cuotas y devuelve las filas creadas con su id.
+    No hace commit: lo decide quien llama.
+    """
+    sentencia = sentencia_renovaciones(desde, hasta, corredor)
+    if dry_run:
+        return db.execute(sentencia).all()
+
+    columnas = COLUMNAS_COPIADAS + ["fecha_inicio", "fecha_vencimiento"]
+    origen = sentencia.subquery()
+    insercion = (
+        insert(MovimientoVigencia)
+        .from_select(
+            columnas + ["fecha_modificacion"],
+            select(*(origen.c[columna] for columna in columnas), func.now())
+        )
+        .returning(
+            MovimientoVigencia.id,
+            *(getattr(MovimientoVigencia, columna) for columna in columnas),
+            null().label("movimiento_origen"),
+        )
+    )
+    creados = db.execute(insercion).all()
+    # Cada renovación pasa a ser la versión actual de su póliza; el resumen de
+    # vencimientos se recalcula al final, con los días de las renovaciones
+    encadenar_versiones(
+        db.connection(),
+        (fila.numero_poliza for fila in creados),
+        ((fila.fecha_vencimiento, fila.corredor_id, fila.moneda) for fila in creados),
+    )
+    generar_cuotas(db, (fila.id for fila in creados))
+    return creados
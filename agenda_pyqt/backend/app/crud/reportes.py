@@ -0,0 +1,151 @@
+"""
+Reportes de producción leídos de la vista materializada reporte_produccion_mensual.
+
+La vista se refresca periódicamente sólo si movimientos_vigencias tuvo escrituras
+desde el último refresco. Cada proceso del servidor tiene su hilo de refresco; un
+bloqueo consultivo evita que dos procesos refresquen a la vez y la firma del último
+refresco se guarda en la base (refrescos_reportes), compartida por todos.
+"""
+import logging
+import threading
+import time
+from datetime import date
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import Date, Interval, case, cast, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..db.session import SessionLocal
+from ..models.refresco_reporte import RefrescoReporte
+from ..models.reporte_produccion import NOMBRE_VISTA, reporte_produccion_mensual as vista
+from .tipos_cambio import factor_conversion
+
+logger = logging.getLogger(__name__)
+
+# Dimensiones por las que se puede agrupar el reporte
+DIMENSIONES = {
+    "mes": vista.c.mes,
+    "corredor": vista.c.corredor,
+    "tipo_seguro": vista.c.tipo_seguro_id,
+    "moneda": vista.c.moneda,
+}
+
+def reporte_produccion(
+    db: Session,
+    agrupar: Sequence[str],
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    corredor: Optional[int] = None,
+    tipo_seguro_id: Optional[int] = None,
+    moneda: Optional[str] = None,
+    moneda_reporte: Optional[str] = None,
+) -> List[Any]:
+    """
+    Totales de prima y suma asegurada agrupados por las dimensiones indicadas
+    (claves de DIMENSIONES). desde/hasta filtran por mes de inicio de vigencia.
+    Con moneda_reporte se agregan los totales convertidos a esa moneda con la
+    cotización de cierre de cada mes (None si a algún grupo le falta cotización).
+    """
+    origen = vista
+    if moneda_reporte:
+        cierre_mes = cast(vista.c.mes + func.make_interval(0, 1, 0, -1, type_=Interval), Date)
+        origen = select(
+            *vista.c, factor_conversion(vista.c.moneda, cierre_mes, moneda_reporte).label("factor")
+        ).subquery("produccion")
+    columnas = [origen.c[DIMENSIONES[dimension].name].label(dimension) for dimension in agrupar]
+    totales = [
+        func.sum(origen.c.cantidad).label("cantidad"),
+        func.sum(origen.c.total_prima).label("total_prima"),
+        func.sum(origen.c.total_suma_asegurada).label("total_suma_asegurada"),
+    ]
+    if moneda_reporte:
+        completo = func.count(origen.c.factor) == func.count()
+        totales += [
+            case((completo, func.sum(origen.c.total_prima * origen.c.factor))).label("total_prima_reporte"),
+            case((completo, func.sum(origen.c.total_suma_asegurada * origen.c.factor))).label(
+                "total_suma_asegurada_reporte"
+            ),
+        ]
+    sentencia = select(*columnas, *totales).group_by(*columnas).order_by(*columnas)
+    if desde:
+        sentencia = sentencia.where(origen.c.mes >= desde.replace(day=1))
+    if hasta:
+        sentencia = sentencia.where(origen.c.mes <= hasta)
+    if corredor is not None:
+        sentencia = sentencia.where(origen.c.corredor == corredor)
+    if tipo_seguro_id is not None:
+        sentencia = sentencia.where(origen.c.tipo_seguro_id == tipo_seguro_id)
+    if moneda is not None:
+        sentencia = sentencia.where(origen.c.moneda == moneda)
+    return db.execute(sentencia).all()
+
+def refrescar_reporte_produccion(db: Session) -> None:
+    """
+    Recalcula la vista sin bloquear las lecturas (CONCURRENTLY usa el índice único).
+    No hace commit: lo decide quien llama.
+    """
+    db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {NOMBRE_VISTA}"))
+
+# Clase del bloqueo consultivo del refresco (primer argumento de pg_try_advisory_xact_lock)
+BLOQUEO_REPORTES = 15
+
+# Filas insertadas, actualizadas y borradas en todas las particiones de movimientos
+SQL_ESCRITURAS_MOVIMIENTOS = """
+    SELECT coalesce(sum(n_tup_ins + n_tup_upd + n_tup_del), 0)
+    FROM pg_stat_user_tables
+    WHERE relid IN (SELECT relid FROM pg_partition_tree('movimientos_vigencias'::regclass) WHERE isleaf)
+"""
+
+def firma_movimientos(db: Session) -> int:
+    """
+    Cantidad acumulada de escrituras en movimientos según las estadísticas del
+    servidor. Sólo crece (también con las transacciones anuladas, lo que a lo sumo
+    provoca un refresco de más) y una transacción que confirma tarde la incrementa
+    al terminar, aunque sus filas tengan una fecha_modificacion anterior.
+    """
+    return int(db.execute(text(SQL_ESCRITURAS_MOVIMIENTOS)).scalar())
+
+def refrescar_si_hay_cambios(db: Session) -> bool:
+    """
+    Refresca la vista sólo si hubo escrituras en movimientos desde el último
+    refresco de cualquier proceso: la firma de ese refresco se guarda en
+    refrescos_reportes en la misma transacción. Si otro proceso está refrescando
+    no hace nada.
+    """
+    if not db.execute(select(func.pg_try_advisory_xact_lock(BLOQUEO_REPORTES, 0))).scalar():
+        db.rollback()
+        return False
+    # La firma se lee antes del refresco: lo que se escriba durante él provoca el siguiente
+    firma = firma_movimientos(db)
+    ultima = db.execute(select(RefrescoReporte.firma).where(RefrescoReporte.vista == NOMBRE_VISTA)).scalar()
+    if firma == ultima:
+        db.rollback()
+        return False
+    refrescar_reporte_produccion(db)
+    sentencia = insert(RefrescoReporte).values(vista=NOMBRE_VISTA, firma=firma, fecha=func.now())
+    db.execute(sentencia.on_conflict_do_update(
+        index_elements=[RefrescoReporte.vista],
+        set_={"firma": sentencia.excluded.firma, "fecha": sentencia.excluded.fecha},
+    ))
+    db.commit()
+    return True
+
+def iniciar_refresco_periodico(intervalo: int) -> threading.Thread:
+    """Lanza un hilo que cada `intervalo` segundos refresca la vista si hubo cambios."""
+    def ciclo():
+        while True:
+            time.sleep(intervalo)
+            db = SessionLocal()
+            try:
+                if refrescar_si_hay_cambios(db):
+                    logger.debug("Vista de producción refrescada")
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error al refrescar la vista de producción: {str(e)}")
+            finally:
+                db.close()
+
+    hilo = threading.Thread(target=ciclo, name="refresco-reportes", daemon=True)
+    hilo.start()
+    return hilo
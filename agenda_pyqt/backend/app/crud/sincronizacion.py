@@ -0,0 +1,58 @@
+"""
+Consulta de cambios para la sincronización incremental del cliente de escritorio.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from sqlalchemy.orm import Session, contains_eager, noload
+
+from ..core.config import settings
+from ..models.cliente import Cliente, get_utc_now
+from ..models.corredor import Corredor
+from ..models.movimiento import MovimientoVigencia
+from ..models.registro_eliminado import RegistroEliminado
+from .movimientos import movimiento_a_schema
+
+def cambios_desde(db: Session, desde: datetime) -> Dict[str, Any]:
+    """
+    Clientes, corredores y movimientos creados o modificados después de `desde`,
+    y los registros eliminados en ese período.
+
+    El valor "hasta" devuelto se atrasa settings.SYNC_MARGEN_SEGUNDOS para no perder
+    cambios de transacciones que confirmaron después de esta consulta; los registros
+    de ese margen se repiten en la consulta siguiente y el cliente debe aplicarlos
+    de forma idempotente.
+    """
+    if desde.tzinfo is None:
+        desde = desde.replace(tzinfo=timezone.utc)
+    hasta = get_utc_now() - timedelta(seconds=settings.SYNC_MARGEN_SEGUNDOS)
+
+    clientes = db.query(Cliente)\
+        .options(noload(Cliente.movimientos_vigencias))\
+        .filter(Cliente.fecha_modificacion > desde)\
+        .order_by(Cliente.fecha_modificacion)\
+        .all()
+    corredores = db.query(Corredor)\
+        .options(noload(Corredor.movimientos))\
+        .filter(Corredor.fecha_modificacion > desde)\
+        .order_by(Corredor.fecha_modificacion)\
+        .all()
+    movimientos = db.query(MovimientoVigencia)\
+        .join(MovimientoVigencia.cliente_rel)\
+        .options(contains_eager(MovimientoVigencia.cliente_rel))\
+        .filter(MovimientoVigencia.fecha_modificacion > desde)\
+        .order_by(MovimientoVigencia.fecha_modificacion)\
+        .all()
+    eliminados = db.query(RegistroEliminado)\
+        .filter(RegistroEliminado.fecha_eliminacion > desde)\
+        .order_by(RegistroEliminado.fecha_eliminacion)\
+        .all()
+
+    return {
+        "desde": desde,
+        "hasta": max(hasta, desde),
+        "clientes": clientes,
+        "corredores": corredores,
+        "movimientos": [movimiento_a_schema(mov) for mov in movimientos],
+        "eliminados": eliminados,
+    }
@@ -0,0 +1,86 @@
+"""
+Tipos de cambio: cotizaciones puntuales con caché LRU y TTL y expresiones SQL para
+normalizar importes a una moneda de reporte dentro de las propias consultas
+(los agregados se convierten en la base, no fila por fila en Python).
+"""
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import ColumnElement, case, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.cache import CacheTTL
+from ..core.config import settings
+from ..db.session import SessionLocal
+from ..models.tipo_cambio import TipoCambio
+from ..schemas.tipo_cambio import TipoCambioBase
+
+def cotizacion(moneda, fecha) -> ColumnElement:
+    """
+    Cotización vigente de `moneda` en `fecha` (columnas o valores): la última con
+    fecha <= fecha, como subconsulta correlacionada que resuelve la clave primaria
+    (moneda, fecha). 1 para la moneda base; NULL si no hay cotización.
+    """
+    if isinstance(moneda, str):
+        moneda = literal(moneda)
+    valor = (
+        select(TipoCambio.valor)
+        .where(TipoCambio.moneda == moneda, TipoCambio.fecha <= fecha)
+        .order_by(TipoCambio.fecha.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return case((moneda == settings.MONEDA_BASE, 1.0), else_=valor)
+
+def factor_conversion(moneda, fecha, moneda_reporte: str) -> ColumnElement:
+    """Expresión por la que se multiplica un importe en `moneda` para llevarlo a `moneda_reporte`."""
+    factor = cotizacion(moneda, fecha)
+    if moneda_reporte != settings.MONEDA_BASE:
+        factor = factor / cotizacion(moneda_reporte, fecha)
+    return factor
+
+# Cotizaciones puntuales por (moneda, fecha). Las faltantes no se guardan: la del día
+# puede cargarse después. Con TTL corto porque la carga de otro proceso no la invalida.
+cache_cotizaciones = CacheTTL(
+    settings.TIPOS_CAMBIO_CACHE_SEGUNDOS, settings.TIPOS_CAMBIO_CACHE, nombre="cotizaciones", guardar_none=False
+)
+
+def _cargar_cotizacion(moneda: str, fecha: date) -> Optional[float]:
+    db = SessionLocal()
+    try:
+        return db.execute(select(cotizacion(moneda, fecha))).scalar()
+    finally:
+        db.close()
+
+def get_cotizacion(moneda: str, fecha: date) -> Optional[float]:
+    """Cotización vigente de una moneda en una fecha (con caché LRU por moneda y fecha)."""
+    return cache_cotizaciones.obtener((moneda, fecha), lambda: _cargar_cotizacion(moneda, fecha))
+
+def invalidar_cotizaciones() -> None:
+    cache_cotizaciones.invalidar()
+
+def get_tipos_cambio(
+    db: Session, moneda: Optional[str] = None, desde: Optional[date] = None, hasta: Optional[date] = None
+) -> List[TipoCambio]:
+    query = db.query(TipoCambio)
+    if moneda is not None:
+        query = query.filter(TipoCambio.moneda == moneda)
+    if desde is not None:
+        query = query.filter(TipoCambio.fecha >= desde)
+    if hasta is not None:
+        query = query.filter(TipoCambio.fecha <= hasta)
+    return query.order_by(TipoCambio.moneda, TipoCambio.fecha).all()
+
+def guardar_tipos_cambio(db: Session, tipos: List[TipoCambioBase]) -> int:
+    """Inserta o actualiza las cotizaciones por (moneda, fecha) en una sentencia y vacía la caché."""
+    if not tipos:
+        return 0
+    sentencia = insert(TipoCambio).values([tipo.model_dump() for tipo in tipos])
+    db.execute(sentencia.on_conflict_do_update(
+        index_elements=[TipoCambio.moneda, TipoCambio.fecha],
+        set_={"valor": sentencia.excluded.valor, "fecha_modificacion": sentencia.excluded.fecha_modificacion},
+    ))
+    db.commit()
+    invalidar_cotizaciones()
+    return len(tipos)
@@ -1,20 +1,46 @@
+from typing import Any, Dict, List
 from sqlalchemy.orm import Session
+from ..core.cache import CacheTTL
+from ..core.config import settings
 from ..models.tipo_seguro import TipoSeguro
-from ..schemas.tipo_seguro import TipoSeguroCreate, TipoSeguroUpdate
+from ..schemas.tipo_seguro import TipoSeguro as TipoSeguroSchema, TipoSeguroCreate, TipoSeguroUpdate
+
+# Listados de tipos de seguro (datos de referencia: cambian rara vez)
+cache_tipos_seguros = CacheTTL(settings.REFERENCIAS_CACHE_SEGUNDOS, nombre="tipos_seguros")
+
+# Campo de la API -> atributo del modelo
+COLUMNAS_TIPO_SEGURO = {
+    "id_tipo": "Id_tipo",
+    "aseguradora": "Aseguradora",
+    "codigo": "Codigo",
+    "descripcion": "Descripcion",
+}
+
+def a_columnas(datos: Dict[str, Any]) -> Dict[str, Any]:
+    """Convierte los campos de un schema a los atributos del modelo"""
+    return {COLUMNAS_TIPO_SEGURO[campo]: valor for campo, valor in datos.items()}
 
 def get_tipo_seguro(db: Session, tipo_id: int):
     """Obtener un tipo de seguro por ID"""
-    return db.query(TipoSeguro).filter(TipoSeguro.id == tipo_id).first()
+    return db.query(TipoSeguro).filter(TipoSeguro.Id_tipo == tipo_id).first()
 
 def get_tipos_seguros(db: Session, skip: int = 0, limit: int = 100):
     """Obtener lista de tipos de seguro"""
-    return db.query(TipoSeguro).offset(skip).limit(limit).all()
+    return db.query(TipoSeguro).order_by(TipoSeguro.Id_tipo).offset(skip).limit(limit).all()
+
+def get_tipos_seguros_cacheados(db: Session, skip: int = 0, limit: int = 100) -> List[TipoSeguroSchema]:
+    """Lista de tipos de seguro guardada en memoria hasta que se modifica un tipo (o vence el TTL)"""
+    return cache_tipos_seguros.obtener(
+        (skip, limit),
+        lambda: [TipoSeguroSchema.model_validate(tipo) for tipo in get_tipos_seguros(db, skip, limit)]
+    )
 
 def create_tipo_seguro(db: Session, tipo: TipoSeguroCreate):
     """Crear un nuevo tipo de seguro"""
-    db_tipo = TipoSeguro(**tipo.dict())
+    db_tipo = TipoSeguro(**a_columnas(tipo.model_dump()))
     db.add(db_tipo)
     db.commit()
+    cache_tipos_seguros.invalidar()
     db.refresh(db_tipo)
     return db_tipo
 
@@ -22,9 +48,10 @@ def update_tipo_seguro(db: Session, tipo_id: int, tipo: TipoSeguroUpdate):
     """Actualizar un tipo de seguro existente"""
     db_tipo = get_tipo_seguro(db, tipo_id)
     if db_tipo:
-        for key, value in tipo.dict(exclude_unset=True).items():
+        for key, value in a_columnas(tipo.model_dump(exclude_unset=True)).items():
             setattr(db_tipo, key, value)
         db.commit()
+        cache_tipos_seguros.invalidar()
         db.refresh(db_tipo)
     return db_tipo
 
@@ -34,5 +61,6 @@ def delete_tipo_seguro(db: Session, tipo_id: int):
     if db_tipo:
         db.delete(db_tipo)
         db.commit()
+        cache_tipos_seguros.invalidar()
         return True
     return False
@@ -0,0 +1,49 @@
+"""
+Consultas de vencimientos de pólizas.
+"""
+from datetime import date
+from typing import Any, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.movimiento import MovimientoVigencia
+from ..models.vencimiento_diario import VencimientoDiario
+from .movimientos import CAMPOS_MOVIMIENTO, filtrar_movimientos, seleccionar_movimientos
+
+def resumen_vencimientos(db: Session, desde: date, hasta: date, corredor: Optional[int] = None) -> List[Any]:
+    """
+    Cantidad de pólizas y total de primas por día y moneda, leídos del resumen
+    precalculado vencimientos_diarios (sin recorrer movimientos_vigencias).
+    """
+    sentencia = (
+        select(
+            VencimientoDiario.fecha,
+            VencimientoDiario.moneda,
+            func.sum(VencimientoDiario.cantidad).label("cantidad"),
+            func.sum(VencimientoDiario.total_prima).label("total_prima"),
+        )
+        .where(VencimientoDiario.fecha.between(desde, hasta))
+        .group_by(VencimientoDiario.fecha, VencimientoDiario.moneda)
+        .order_by(VencimientoDiario.fecha, VencimientoDiario.moneda)
+    )
+    if corredor is not None:
+        sentencia = sentencia.where(VencimientoDiario.corredor == corredor)
+    return db.execute(sentencia).all()
+
+def movimientos_por_vencer(
+    db: Session, desde: date, hasta: date, corredor: Optional[int] = None, limit: int = 500
+) -> List[Any]:
+    """
+    Pólizas que vencen en el período, ordenadas por fecha de vencimiento. Igual
+    que el resumen, sólo la versión actual de cada póliza (recorre el índice
+    parcial ix_movimientos_actuales_vencimiento).
+    """
+    query = filtrar_movimientos(
+        db.query(MovimientoVigencia),
+        corredor_id=corredor,
+        fecha_vencimiento_desde=desde,
+        fecha_vencimiento_hasta=hasta,
+        actuales=True,
+    ).order_by(MovimientoVigencia.fecha_vencimiento, MovimientoVigencia.id)
+    return seleccionar_movimientos(query, list(CAMPOS_MOVIMIENTO)).limit(limit).all()
@@ -7,3 +7,11 @@ from ..models.cliente import Cliente  # noqa
 from ..models.corredor import Corredor  # noqa
 from ..models.tipo_seguro import TipoSeguro  # noqa
 from ..models.movimiento import MovimientoVigencia  # noqa
+from ..models.registro_eliminado import RegistroEliminado  # noqa
+from ..models.vencimiento_diario import VencimientoDiario  # noqa
+from ..models.tasa_comision import TasaComision  # noqa
+from ..models.cuota import Cuota  # noqa
+from ..models.tipo_cambio import TipoCambio  # noqa
+from ..models.refresco_reporte import RefrescoReporte  # noqa
+from ..models import version_poliza  # noqa
+from ..models.reporte_produccion import reporte_produccion_mensual  # noqa
@@ -0,0 +1,35 @@
+"""
+Bloqueos consultivos de PostgreSQL por clave (pg_advisory_xact_lock).
+
+Serializan entre transacciones el recálculo de datos derivados (resumen de
+vencimientos, cadena de versiones): quien llega segundo espera al commit del
+primero y sus sentencias siguientes ya ven sus cambios. Se liberan solos al
+terminar la transacción. En otros motores no hacen nada.
+"""
+import zlib
+from typing import Any, Iterable
+
+from sqlalchemy import Integer, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Connection
+
+def numero_bloqueo(clave: Any) -> int:
+    """Entero de 32 bits con signo que identifica la clave (el mismo en todos los procesos)."""
+    return zlib.crc32(str(clave).encode("utf-8")) - (1 << 31)
+
+def bloquear_claves(conexion: Connection, clase: int, claves: Iterable[Any]) -> None:
+    """
+    Toma el bloqueo (clase, clave) de cada clave hasta el fin de la transacción,
+    en orden para que dos transacciones con claves en común no se interbloqueen.
+    """
+    if conexion.dialect.name != "postgresql":
+        return
+    numeros = sorted({numero_bloqueo(clave) for clave in claves})
+    if not numeros:
+        return
+    ordenados = (
+        select(func.unnest(bindparam("claves", numeros, type_=ARRAY(Integer))).label("clave"))
+        .order_by("clave")
+        .subquery()
+    )
+    conexion.execute(select(func.pg_advisory_xact_lock(clase, ordenados.c.clave)))
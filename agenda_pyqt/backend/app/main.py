@@ -5,7 +5,9 @@ from .db.session import engine, SessionLocal
 from .api.api_v1.api import api_router
 from .core.config import settings
 from .db.init_db import init_db
-from .routers import clientes, movimientos
+from .routers import clientes, movimientos, sync, reportes, comisiones, cuotas, tipos_cambio, tipos_seguros, cache
+from .crud.reportes import iniciar_refresco_periodico
+from .crud.particiones import asegurar_particiones
 import logging
 
 # Configurar logging
@@ -35,6 +37,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Total-Count-Estimado", "X-Next-Cursor"],
 )
 
 # Incluir el router principal de la API v1 (incluye corredores)
@@ -43,6 +46,26 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 # Incluir routers adicionales
 app.include_router(clientes.router, prefix=f"{settings.API_V1_STR}/clientes", tags=["clientes"])
 app.include_router(movimientos.router, prefix=f"{settings.API_V1_STR}/movimientos", tags=["movimientos"])
+app.include_router(sync.router, prefix=f"{settings.API_V1_STR}/sync", tags=["sync"])
+app.include_router(reportes.router, prefix=f"{settings.API_V1_STR}/reportes", tags=["reportes"])
+app.include_router(comisiones.router, prefix=f"{settings.API_V1_STR}/comisiones", tags=["comisiones"])
+app.include_router(cuotas.router, prefix=f"{settings.API_V1_STR}/cuotas", tags=["cuotas"])
+app.include_router(tipos_cambio.router, prefix=f"{settings.API_V1_STR}/tipos-cambio", tags=["tipos-cambio"])
+app.include_router(tipos_seguros.router, prefix=f"{settings.API_V1_STR}/tipos-seguros", tags=["tipos_seguros"])
+app.include_router(cache.router, prefix=f"{settings.API_V1_STR}/cache", tags=["cache"])
+
+@app.on_event("startup")
+def crear_particiones_movimientos():
+    # Particiones anuales de movimientos_vigencias (sólo PostgreSQL)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conexion:
+            asegurar_particiones(conexion)
+
+@app.on_event("startup")
+def iniciar_tareas_periodicas():
+    # La vista materializada de reportes sólo existe en PostgreSQL
+    if engine.dialect.name == "postgresql" and settings.REPORTES_REFRESCO_SEGUNDOS > 0:
+        iniciar_refresco_periodico(settings.REPORTES_REFRESCO_SEGUNDOS)
 
 @app.get("/")
 def read_root():
@@ -3,6 +3,13 @@ from .cliente import Cliente
 from .corredor import Corredor
 from .tipo_seguro import TipoSeguro
 from .movimiento import MovimientoVigencia
+from .registro_eliminado import RegistroEliminado
+from .vencimiento_diario import VencimientoDiario
+from .tasa_comision import TasaComision
+from .cuota import Cuota
+from .tipo_cambio import TipoCambio
+from .refresco_reporte import RefrescoReporte
+from . import version_poliza  # noqa: registra el mantenimiento de la cadena de versiones
 from ..db.base import Base
 
 # Para mantener compatibilidad con código existente
@@ -14,5 +21,11 @@ __all__ = [
     "Corredor",
     "TipoSeguro",
     "MovimientoVigencia",
+    "RegistroEliminado",
+    "VencimientoDiario",
+    "TasaComision",
+    "Cuota",
+    "TipoCambio",
+    "RefrescoReporte",
     "Base"
 ]
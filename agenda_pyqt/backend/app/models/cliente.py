@@ -1,7 +1,7 @@
 """
 Modelos relacionados con la entidad Cliente.
 """
-from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey, DateTime, Sequence, BigInteger
+from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey, DateTime, Sequence, BigInteger, DDL, Index, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -51,7 +51,12 @@ class Cliente(Base):
     creado_por_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
     modificado_por_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
     fecha_creacion = Column(DateTime(timezone=True), default=get_utc_now)
-    fecha_modificacion = Column(DateTime(timezone=True), default=get_utc_now, onupdate=get_utc_now)
+    fecha_modificacion = Column(DateTime(timezone=True), default=get_utc_now, onupdate=get_utc_now, index=True)
+
+    __table_args__ = (
+        # Listado por corredor ordenado por fecha de modificación y su ETag
+        Index("ix_clientes_corredor_fecha_modificacion", "corredor", "fecha_modificacion"),
+    )
 
     # Relaciones
     creado_por_usuario = relationship("Usuario", foreign_keys=[creado_por_id], back_populates="clientes_creados")
@@ -60,3 +65,18 @@ class Cliente(Base):
                                        primaryjoin="Cliente.id == MovimientoVigencia.cliente_id",
                                        cascade="all, delete-orphan")
     corredor_rel = relationship("Corredor", back_populates="clientes")
+
+# Índices de búsqueda (pg_trgm + unaccent) usados por crud.busqueda_clientes.
+# En bases existentes los crea la migración ddbca5cfcbd3.
+for _sentencia in (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text AS "
+    "$$ SELECT public.unaccent('public.unaccent', $1) $$ "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT",
+    "CREATE INDEX IF NOT EXISTS ix_clientes_busqueda_trgm ON clientes USING gin "
+    "(f_unaccent(lower(nombres || ' ' || apellidos || ' ' || numero_documento || ' ' || mail)) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_clientes_documento_trgm ON clientes USING gin "
+    "(regexp_replace(numero_documento, '[^0-9A-Za-z]', '', 'g') gin_trgm_ops)",
+):
+    event.listen(Cliente.__table__, "after_create", DDL(_sentencia).execute_if(dialect="postgresql"))
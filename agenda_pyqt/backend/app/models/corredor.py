@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy import Column, Integer, String, Text, DateTime, func
 from sqlalchemy.orm import relationship
 from ..db.base import Base
+from .cliente import get_utc_now
 
 class Corredor(Base):
     __tablename__ = "corredores"
@@ -21,6 +22,10 @@ class Corredor(Base):
     # Datos adicionales
     observaciones = Column(Text)  # Observaciones adicionales
 
+    # Auditoría (usada para ETags y sincronización incremental)
+    fecha_modificacion = Column(DateTime(timezone=True), default=get_utc_now, onupdate=get_utc_now,
+                                server_default=func.now(), nullable=False, index=True)
+
     # Relaciones
     clientes = relationship("Cliente", back_populates="corredor_rel")  # Relación con los clientes
     movimientos = relationship("MovimientoVigencia", back_populates="corredor_rel")
@@ -0,0 +1,26 @@
+"""
+Modelo de las cuotas en que se paga la prima de un movimiento.
+"""
+from sqlalchemy import Column, Integer, Float, Date, Boolean, Index, UniqueConstraint, text
+from ..db.base import Base
+
+class Cuota(Base):
+    """Modelo para la tabla cuotas (una fila por cuota de cada movimiento)."""
+    __tablename__ = "cuotas"
+
+    id = Column(Integer, primary_key=True)
+    # Sin clave foránea: movimientos_vigencias está particionada y su id solo no es
+    # único en la base. Se borran con el movimiento (MovimientoVigencia.cuotas_rel)
+    movimiento_id = Column(Integer, nullable=False)
+    numero = Column(Integer, nullable=False)  # 1..cantidad de cuotas
+    monto = Column(Float, nullable=False)
+    fecha_vencimiento = Column(Date, nullable=False)
+    pagada = Column(Boolean, nullable=False, default=False, server_default=text("false"))
+    fecha_pago = Column(Date)
+
+    __table_args__ = (
+        UniqueConstraint("movimiento_id", "numero", name="uq_cuotas_movimiento_numero"),
+        # Cuotas vencidas: sólo se indexan las pendientes, que son pocas frente al histórico pagado
+        Index("ix_cuotas_pendientes_vencimiento", "fecha_vencimiento",
+              postgresql_where=text("NOT pagada"), sqlite_where=text("NOT pagada")),
+    )
@@ -1,10 +1,20 @@
 """
 Modelos relacionados con la entidad MovimientoVigencia.
+
+En PostgreSQL movimientos_vigencias está particionada por rango de fecha_inicio,
+una partición por año más una DEFAULT (ver crud.particiones). La clave primaria
+de una tabla particionada tiene que incluir la columna de partición, por lo que
+allí es (id, fecha_inicio); para el ORM y los demás motores sigue siendo id.
 """
-from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, BigInteger
+from sqlalchemy import (
+    Column, DDL, Integer, String, Date, Float, ForeignKey, BigInteger, Boolean, DateTime, Index,
+    PrimaryKeyConstraint, event, func, literal_column, text,
+)
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from ..db.base import Base
+from .cliente import get_utc_now
 
 class MovimientoVigencia(Base):
     """Modelo para la tabla movimientos_vigencias."""
@@ -26,7 +36,75 @@ class MovimientoVigencia(Base):
     cuotas = Column(Integer)
     observaciones = Column(String(500))
 
+    # Cadena de versiones de la póliza, mantenida por models.version_poliza. Sin clave
+    # foránea: en la tabla particionada id solo no es único (ver encabezado)
+    version_anterior_id = Column(Integer)
+    actual = Column(Boolean, nullable=False, default=False, server_default=text("false"))
+
+    # Auditoría (usada para ETags y sincronización incremental)
+    fecha_modificacion = Column(DateTime(timezone=True), default=get_utc_now, onupdate=get_utc_now,
+                                server_default=func.now(), nullable=False, index=True)
+
     # Relaciones
     cliente_rel = relationship("Cliente", back_populates="movimientos_vigencias")
     corredor_rel = relationship("Corredor", back_populates="movimientos")
     tipo_seguro_rel = relationship("TipoSeguro", back_populates="movimientos")
+    # Las cuotas se borran con el movimiento desde el ORM (no hay ON DELETE CASCADE, ver Cuota)
+    cuotas_rel = relationship(
+        "Cuota", primaryjoin="MovimientoVigencia.id == foreign(Cuota.movimiento_id)",
+        cascade="all, delete-orphan",
+    )
+
+    __table_args__ = (
+        # Próximos vencimientos
+        Index("ix_movimientos_fecha_vencimiento", "fecha_vencimiento"),
+        # Filtros del listado: igualdad por corredor / tipo de seguro y rango de fechas
+        Index("ix_movimientos_corredor_vencimiento", "corredor_id", "fecha_vencimiento"),
+        Index("ix_movimientos_corredor_inicio", "corredor_id", "fecha_inicio"),
+        # Liquidación de comisiones de un período
+        Index("ix_movimientos_fecha_inicio", "fecha_inicio"),
+        Index("ix_movimientos_tipo_seguro_vencimiento", "tipo_seguro_id", "fecha_vencimiento"),
+        # Movimientos de un cliente ordenados por id
+        Index("ix_movimientos_cliente_id", "cliente_id", "id"),
+        # Búsqueda por prefijo de póliza (LIKE 'abc%') con cualquier collation
+        Index("ix_movimientos_poliza_prefijo", "numero_poliza", "endoso",
+              postgresql_ops={"numero_poliza": "text_pattern_ops", "endoso": "text_pattern_ops"}),
+        # Versiones actuales: la cartera activa recorre sólo estas filas
+        Index("ix_movimientos_poliza_actual", "numero_poliza",
+              postgresql_where=text("actual"), sqlite_where=text("actual")),
+        Index("ix_movimientos_actuales_vencimiento", "fecha_vencimiento",
+              postgresql_where=text("actual"), sqlite_where=text("actual")),
+        # Versión siguiente de un movimiento (recorrer la cadena hacia adelante)
+        Index("ix_movimientos_version_anterior", "version_anterior_id"),
+        {"postgresql_partition_by": "RANGE (fecha_inicio)", "info": {"columna_particion": "fecha_inicio"}},
+    )
+
+# Una póliza o endoso por período: clave del upsert de los bordereaux de las aseguradoras
+# (las renovaciones repiten número de póliza y endoso con otra fecha de inicio).
+# El '' va como literal: ON CONFLICT sólo reconoce el índice si la expresión es idéntica
+CLAVE_POLIZA_ENDOSO_INICIO = (
+    MovimientoVigencia.numero_poliza,
+    func.coalesce(MovimientoVigencia.endoso, literal_column("''")),
+    MovimientoVigencia.fecha_inicio,
+)
+Index("uq_movimientos_poliza_endoso_inicio", *CLAVE_POLIZA_ENDOSO_INICIO, unique=True)
+
+@compiles(PrimaryKeyConstraint, "postgresql")
+def _clave_primaria_particionada(constraint, compiler, **kw):
+    """Agrega la columna de partición a la clave primaria de las tablas particionadas."""
+    sql = compiler.visit_primary_key_constraint(constraint, **kw)
+    columna = constraint.table.info.get("columna_particion")
+    if columna and columna not in constraint.columns and sql.endswith(")"):
+        sql = f"{sql[:-1]}, {compiler.preparer.quote(columna)})"
+    return sql
+
+# Partición que recibe las filas de los años que todavía no tienen la suya; en bases
+# nuevas se crea con la tabla y las anuales, al iniciar la aplicación
+event.listen(
+    MovimientoVigencia.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS movimientos_vigencias_default "
+        "PARTITION OF movimientos_vigencias DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,19 @@
+"""
+Modelo del último refresco de cada vista materializada de reportes.
+"""
+from sqlalchemy import BigInteger, Column, DateTime, String
+from ..db.base import Base
+from .cliente import get_utc_now
+
+class RefrescoReporte(Base):
+    """
+    Una fila por vista: la firma de escrituras en movimientos con la que se refrescó
+    por última vez (crud.reportes.firma_movimientos). Se actualiza en la misma
+    transacción que el refresco, así todos los procesos del servidor comparan
+    contra el mismo valor y sólo uno refresca por cada cambio.
+    """
+    __tablename__ = "refrescos_reportes"
+
+    vista = Column(String(63), primary_key=True)  # Nombre de la vista materializada
+    firma = Column(BigInteger, nullable=False)
+    fecha = Column(DateTime(timezone=True), default=get_utc_now, nullable=False)  # Último refresco
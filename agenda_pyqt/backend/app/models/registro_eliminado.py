@@ -0,0 +1,34 @@
+"""
+Modelo para el registro de eliminaciones (tombstones) usado por la sincronización incremental.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, event, insert
+from ..db.base_class import Base
+from .cliente import Cliente, get_utc_now
+from .corredor import Corredor
+from .movimiento import MovimientoVigencia
+
+class RegistroEliminado(Base):
+    """Modelo para la tabla registros_eliminados: una fila por registro borrado."""
+    __tablename__ = "registros_eliminados"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tabla = Column(String(50), nullable=False)
+    registro_id = Column(String(64), nullable=False)
+    fecha_eliminacion = Column(DateTime(timezone=True), default=get_utc_now, nullable=False, index=True)
+
+def _registrar_eliminacion(tabla: str, atributo_id: str):
+    def listener(mapper, connection, target):
+        connection.execute(
+            insert(RegistroEliminado.__table__).values(
+                tabla=tabla,
+                registro_id=str(getattr(target, atributo_id)),
+                fecha_eliminacion=get_utc_now()
+            )
+        )
+    return listener
+
+# Las eliminaciones hechas a través del ORM (incluidas las cascadas) dejan su
+# tombstone en la misma transacción
+event.listen(Cliente, "after_delete", _registrar_eliminacion("clientes", "id"))
+event.listen(Corredor, "after_delete", _registrar_eliminacion("corredores", "numero"))
+event.listen(MovimientoVigencia, "after_delete", _registrar_eliminacion("movimientos_vigencias", "id"))
@@ -0,0 +1,50 @@
+"""
+Vista materializada de producción mensual (PostgreSQL).
+
+Agrupa movimientos_vigencias por mes de inicio, corredor, tipo de seguro y
+moneda. Los reportes la leen en lugar de agregar la tabla de movimientos; se
+refresca con REFRESH MATERIALIZED VIEW CONCURRENTLY (ver crud.reportes), lo
+que exige el índice único sobre las columnas de agrupación.
+"""
+from sqlalchemy import Column, Date, DDL, Float, Integer, MetaData, String, Table, event
+
+from .movimiento import MovimientoVigencia
+
+NOMBRE_VISTA = "reporte_produccion_mensual"
+
+SQL_CREAR_VISTA = f"""
+CREATE MATERIALIZED VIEW IF NOT EXISTS {NOMBRE_VISTA} AS
+SELECT date_trunc('month', fecha_inicio)::date AS mes,
+       COALESCE(corredor_id, 0) AS corredor,
+       tipo_seguro_id,
+       COALESCE(moneda, '') AS moneda,
+       count(*) AS cantidad,
+       COALESCE(sum(prima), 0) AS total_prima,
+       COALESCE(sum(suma_asegurada), 0) AS total_suma_asegurada
+FROM movimientos_vigencias
+GROUP BY 1, 2, 3, 4
+"""
+
+SQL_CREAR_INDICE = (
+    f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{NOMBRE_VISTA}_clave "
+    f"ON {NOMBRE_VISTA} (mes, corredor, tipo_seguro_id, moneda)"
+)
+
+# La vista no es una tabla del modelo: tiene su propio MetaData para que
+# create_all no intente crearla.
+reporte_produccion_mensual = Table(
+    NOMBRE_VISTA,
+    MetaData(),
+    Column("mes", Date),  # Primer día del mes de inicio de vigencia
+    Column("corredor", Integer),  # Número de corredor (0: sin corredor)
+    Column("tipo_seguro_id", Integer),
+    Column("moneda", String(10)),  # '' si no se indicó
+    Column("cantidad", Integer),
+    Column("total_prima", Float),
+    Column("total_suma_asegurada", Float),
+)
+
+# En bases nuevas se crea junto con movimientos_vigencias; en las existentes,
+# con la migración 7a3f0c95e4d1.
+for _sentencia in (SQL_CREAR_VISTA, SQL_CREAR_INDICE):
+    event.listen(MovimientoVigencia.__table__, "after_create", DDL(_sentencia).execute_if(dialect="postgresql"))
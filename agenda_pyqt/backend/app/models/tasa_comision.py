@@ -0,0 +1,26 @@
+"""
+Modelo de la tabla de tasas de comisión por tipo de seguro y corredor.
+"""
+from sqlalchemy import Column, DateTime, Integer, Float, ForeignKey, UniqueConstraint, func
+from ..db.base import Base
+from .cliente import get_utc_now
+
+class TasaComision(Base):
+    """
+    Porcentaje de la prima que se liquida como comisión. Una fila con corredor
+    NULL es la tasa general del tipo de seguro; las filas con corredor la
+    reemplazan para ese corredor.
+    """
+    __tablename__ = "tasas_comision"
+
+    id = Column(Integer, primary_key=True, index=True)
+    corredor = Column(Integer, ForeignKey("corredores.numero"), nullable=True)
+    tipo_seguro_id = Column(Integer, ForeignKey("tipos_de_seguros.Id_tipo"), nullable=False)
+    porcentaje = Column(Float, nullable=False)  # Sobre la prima
+    # Forma parte de la firma de las liquidaciones guardadas (crud.comisiones)
+    fecha_modificacion = Column(DateTime(timezone=True), default=get_utc_now, onupdate=get_utc_now,
+                                server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("corredor", "tipo_seguro_id", name="uq_tasas_comision_corredor_tipo"),
+    )
@@ -0,0 +1,21 @@
+"""
+Modelo de la tabla de tipos de cambio diarios.
+"""
+from sqlalchemy import Column, Date, DateTime, Float, String, func
+from ..db.base import Base
+from .cliente import get_utc_now
+
+class TipoCambio(Base):
+    """
+    Cotización de una moneda un día, expresada en la moneda base (settings.MONEDA_BASE).
+    La moneda base no necesita filas: su cotización es siempre 1. Un día sin fila
+    toma la última cotización anterior.
+    """
+    __tablename__ = "tipos_cambio"
+
+    moneda = Column(String(10), primary_key=True)  # '$', 'U$S', ...
+    fecha = Column(Date, primary_key=True)
+    valor = Column(Float, nullable=False)  # Unidades de la moneda base por unidad de `moneda`
+    # Forma parte de la firma de las liquidaciones guardadas (crud.comisiones)
+    fecha_modificacion = Column(DateTime(timezone=True), default=get_utc_now, onupdate=get_utc_now,
+                                server_default=func.now(), nullable=False)
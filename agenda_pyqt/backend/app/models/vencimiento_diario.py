@@ -0,0 +1,120 @@
+"""
+Modelo del resumen diario de vencimientos (tabla precalculada para el tablero).
+
+Cada fila acumula la cantidad de pólizas y el total de primas que vencen un día,
+por corredor y moneda, contando sólo la versión actual de cada póliza. Se mantiene
+de forma incremental: los cambios hechos a través del ORM en MovimientoVigencia
+marcan sus días/corredores/monedas y, al final de cada flush y en la misma
+transacción, se recalculan sólo esos junto con los de las filas que el
+reencadenamiento de versiones deja de tener o pasa a tener como actual (el
+recálculo lo dispara version_poliza, después de bloquear las pólizas).
+
+En PostgreSQL el recálculo de cada clave toma un bloqueo consultivo hasta el
+commit: dos transacciones que tocan el mismo día no borran e insertan a la vez,
+y la segunda recalcula viendo lo que confirmó la primera. Estos bloqueos se
+toman siempre después de los de las pólizas (version_poliza).
+"""
+from datetime import date
+from typing import Iterable, Set, Tuple
+
+from sqlalchemy import Column, Date, Float, Integer, String, delete, event, func, inspect, insert, select, tuple_
+from sqlalchemy.engine import Connection
+
+from ..db.base_class import Base
+from ..db.bloqueos import bloquear_claves
+from .movimiento import MovimientoVigencia
+
+# Clave de un día del resumen: (fecha, corredor, moneda)
+ClaveVencimiento = Tuple[date, int, str]
+
+# Claves por tanda en el recálculo (cada una aporta tres parámetros al IN)
+TAMANO_LOTE_CLAVES = 500
+
+# Clase de los bloqueos consultivos del recálculo (primer argumento de pg_advisory_xact_lock)
+BLOQUEO_VENCIMIENTOS = 13
+
+class VencimientoDiario(Base):
+    """Modelo para la tabla vencimientos_diarios."""
+    __tablename__ = "vencimientos_diarios"
+
+    fecha = Column(Date, primary_key=True)  # Fecha de vencimiento
+    corredor = Column(Integer, primary_key=True)  # Número de corredor (0: sin corredor)
+    moneda = Column(String(10), primary_key=True)  # Moneda ('': sin moneda)
+    cantidad = Column(Integer, nullable=False)  # Pólizas que vencen ese día
+    total_prima = Column(Float, nullable=False)  # Suma de las primas
+
+# Expresiones que convierten un movimiento en su clave del resumen
+_corredor = func.coalesce(MovimientoVigencia.corredor_id, 0)
+_moneda = func.coalesce(MovimientoVigencia.moneda, "")
+
+def recalcular_vencimientos_diarios(conexion: Connection, claves: Iterable[ClaveVencimiento]) -> None:
+    """
+    Recalcula las filas del resumen de las claves indicadas a partir de
+    movimientos_vigencias (borra y vuelve a insertar el agregado).
+    Las altas masivas que no pasan por el ORM no la llaman directamente: pasan las
+    claves afectadas a encadenar_versiones, que la llama una vez al final.
+    """
+    claves = list({_clave(*clave) for clave in claves})
+    bloquear_claves(conexion, BLOQUEO_VENCIMIENTOS, claves)
+    tabla = VencimientoDiario.__table__
+    for inicio in range(0, len(claves), TAMANO_LOTE_CLAVES):
+        lote = claves[inicio:inicio + TAMANO_LOTE_CLAVES]
+        conexion.execute(
+            delete(tabla).where(tuple_(tabla.c.fecha, tabla.c.corredor, tabla.c.moneda).in_(lote))
+        )
+        agregado = (
+            select(
+                MovimientoVigencia.fecha_vencimiento, _corredor, _moneda,
+                func.count(), func.coalesce(func.sum(MovimientoVigencia.prima), 0)
+            )
+            .where(
+                MovimientoVigencia.actual,
+                tuple_(MovimientoVigencia.fecha_vencimiento, _corredor, _moneda).in_(lote),
+            )
+            .group_by(MovimientoVigencia.fecha_vencimiento, _corredor, _moneda)
+        )
+        conexion.execute(
+            insert(tabla).from_select(["fecha", "corredor", "moneda", "cantidad", "total_prima"], agregado)
+        )
+
+def reconstruir_vencimientos_diarios(conexion: Connection) -> None:
+    """Regenera el resumen completo (carga inicial o reparación)."""
+    tabla = VencimientoDiario.__table__
+    conexion.execute(delete(tabla))
+    conexion.execute(
+        insert(tabla).from_select(
+            ["fecha", "corredor", "moneda", "cantidad", "total_prima"],
+            select(
+                MovimientoVigencia.fecha_vencimiento, _corredor, _moneda,
+                func.count(), func.coalesce(func.sum(MovimientoVigencia.prima), 0)
+            )
+            .where(MovimientoVigencia.actual)
+            .group_by(MovimientoVigencia.fecha_vencimiento, _corredor, _moneda)
+        )
+    )
+
+def _clave(fecha, corredor, moneda) -> ClaveVencimiento:
+    return fecha, corredor or 0, moneda or ""
+
+def _claves_pendientes(conexion: Connection) -> Set[ClaveVencimiento]:
+    return conexion.info.setdefault("vencimientos_pendientes", set())
+
+def _valor_anterior(target, atributo: str):
+    historial = inspect(target).attrs[atributo].history
+    return historial.deleted[0] if historial.deleted else getattr(target, atributo)
+
+def _marcar_movimiento(mapper, connection, target):
+    _claves_pendientes(connection).add(_clave(target.fecha_vencimiento, target.corredor_id, target.moneda))
+
+def _marcar_movimiento_modificado(mapper, connection, target):
+    # El día anterior pierde el movimiento y el nuevo lo gana
+    _claves_pendientes(connection).add(_clave(
+        _valor_anterior(target, "fecha_vencimiento"),
+        _valor_anterior(target, "corredor_id"),
+        _valor_anterior(target, "moneda"),
+    ))
+    _marcar_movimiento(mapper, connection, target)
+
+event.listen(MovimientoVigencia, "after_insert", _marcar_movimiento)
+event.listen(MovimientoVigencia, "after_update", _marcar_movimiento_modificado)
+event.listen(MovimientoVigencia, "after_delete", _marcar_movimiento)
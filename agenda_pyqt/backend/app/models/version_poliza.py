@@ -0,0 +1,144 @@
+"""
+Cadena de versiones de cada póliza (movimiento original, endosos y renovaciones).
+
+Los movimientos de un mismo número de póliza, ordenados por inicio de vigencia y
+alta, forman una cadena: cada uno apunta al anterior (version_anterior_id) y sólo
+el último tiene actual = true. Igual que el resumen de vencimientos, la cadena se
+mantiene en la misma transacción: los cambios hechos a través del ORM marcan sus
+pólizas, al final de cada flush se reencadenan sólo esas y los movimientos de esas
+pólizas cargados en la sesión se expiran para que relean actual y version_anterior_id.
+
+La cartera activa se lee del índice parcial de las versiones actuales y no necesita
+descartar versiones viejas. Como la tabla está particionada por fecha_inicio no
+puede tener un índice único sólo por póliza, así que nada en la base impide dos
+versiones actuales: en PostgreSQL el reencadenamiento toma un bloqueo consultivo
+por póliza hasta el commit (db.bloqueos), de modo que dos transacciones nunca
+reencadenan la misma póliza a la vez y la segunda ve la cadena que dejó la primera.
+
+Los bloqueos se toman siempre en el mismo orden: primero los de las pólizas y después
+los del resumen de vencimientos (vencimiento_diario), una sola vez por flush o por
+alta masiva con la unión de las claves. Si una transacción tomara días del resumen
+antes que pólizas y otra al revés, podrían esperarse mutuamente.
+"""
+from typing import Iterable, Set
+
+from sqlalchemy import event, func, inspect, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..db.bloqueos import bloquear_claves
+from .movimiento import MovimientoVigencia
+from .vencimiento_diario import ClaveVencimiento, recalcular_vencimientos_diarios
+
+# Pólizas por tanda en el reencadenamiento
+TAMANO_LOTE_POLIZAS = 1000
+
+# Clase de los bloqueos consultivos por póliza (primer argumento de pg_advisory_xact_lock)
+BLOQUEO_VERSIONES = 21
+
+def encadenar_versiones(
+    conexion: Connection, polizas: Iterable[str], claves_vencimiento: Iterable[ClaveVencimiento] = ()
+) -> None:
+    """
+    Recalcula version_anterior_id y actual de todos los movimientos de las pólizas
+    indicadas (sólo escribe las filas que cambian) y después, en un solo recálculo,
+    el resumen de vencimientos de las filas modificadas (sólo cuenta las actuales)
+    más las claves_vencimiento recibidas. Antes toma el bloqueo de cada póliza hasta
+    el fin de la transacción, y recién al final los de los días del resumen.
+    Las altas masivas que no pasan por el ORM deben llamarla con los números de
+    póliza afectados y las claves del resumen que tocaron, en lugar de llamar antes
+    a recalcular_vencimientos_diarios.
+    """
+    polizas = list(set(polizas))
+    bloquear_claves(conexion, BLOQUEO_VERSIONES, polizas)
+    tabla = MovimientoVigencia.__table__
+    claves_vencimiento = set(claves_vencimiento)
+    for inicio in range(0, len(polizas), TAMANO_LOTE_POLIZAS):
+        lote = polizas[inicio:inicio + TAMANO_LOTE_POLIZAS]
+        versiones = (
+            select(
+                tabla.c.id,
+                func.lag(tabla.c.id).over(
+                    partition_by=tabla.c.numero_poliza, order_by=(tabla.c.fecha_inicio, tabla.c.id)
+                ).label("anterior"),
+                (func.row_number().over(
+                    partition_by=tabla.c.numero_poliza, order_by=(tabla.c.fecha_inicio.desc(), tabla.c.id.desc())
+                ) == 1).label("actual"),
+            )
+            .where(tabla.c.numero_poliza.in_(lote))
+            .subquery("versiones")
+        )
+        # Primero se bajan las que dejan de ser actuales, para que en ningún momento
+        # haya dos actuales de la misma póliza (sin particionar, el índice único lo exige)
+        claves_vencimiento.update(conexion.execute(
+            update(tabla)
+            .where(tabla.c.id == versiones.c.id, tabla.c.actual, ~versiones.c.actual)
+            .values(actual=False)
+            .returning(tabla.c.fecha_vencimiento, tabla.c.corredor_id, tabla.c.moneda)
+        ).all())
+        claves_vencimiento.update(conexion.execute(
+            update(tabla)
+            .where(
+                tabla.c.id == versiones.c.id,
+                or_(
+                    tabla.c.actual != versiones.c.actual,
+                    tabla.c.version_anterior_id.is_distinct_from(versiones.c.anterior),
+                ),
+            )
+            .values(actual=versiones.c.actual, version_anterior_id=versiones.c.anterior)
+            .returning(tabla.c.fecha_vencimiento, tabla.c.corredor_id, tabla.c.moneda)
+        ).all())
+    if claves_vencimiento:
+        recalcular_vencimientos_diarios(conexion, (tuple(clave) for clave in claves_vencimiento))
+
+def _polizas_pendientes(conexion: Connection) -> Set[str]:
+    return conexion.info.setdefault("versiones_pendientes", set())
+
+def _marcar_poliza(mapper, connection, target):
+    _polizas_pendientes(connection).add(target.numero_poliza)
+
+def _cambio_de_poliza(mapper, connection, target):
+    historial = inspect(target).attrs.numero_poliza.history
+    if historial.deleted:
+        # La póliza de origen pierde el movimiento, que entra a la nueva como no
+        # actual hasta reencadenarla
+        _polizas_pendientes(connection).add(historial.deleted[0])
+        target.actual = False
+
+event.listen(MovimientoVigencia, "after_insert", _marcar_poliza)
+event.listen(MovimientoVigencia, "before_update", _cambio_de_poliza)
+event.listen(MovimientoVigencia, "after_update", _marcar_poliza)
+event.listen(MovimientoVigencia, "after_delete", _marcar_poliza)
+
+@event.listens_for(Session, "after_flush")
+def _actualizar_versiones(session, flush_context):
+    """
+    Reencadena las pólizas marcadas en el flush y recalcula una sola vez el resumen
+    de vencimientos, con las claves marcadas por vencimiento_diario y las de las
+    filas reencadenadas (así los bloqueos de pólizas van antes que los del resumen).
+    """
+    conexion = session.connection()
+    polizas = conexion.info.pop("versiones_pendientes", None)
+    claves = conexion.info.pop("vencimientos_pendientes", None)
+    if polizas:
+        encadenar_versiones(conexion, polizas, claves or ())
+        session.info.setdefault("versiones_a_expirar", set()).update(polizas)
+    elif claves:
+        recalcular_vencimientos_diarios(conexion, claves)
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expirar_versiones(session, flush_context):
+    """
+    El reencadenamiento escribe con UPDATE de Core, que no toca los objetos cargados:
+    se expiran actual y version_anterior_id de los movimientos de esas pólizas para
+    que el próximo acceso los relea (los objetos recién insertados ya son persistentes aquí).
+    """
+    polizas = session.info.pop("versiones_a_expirar", None)
+    if not polizas:
+        return
+    for objeto in list(session.identity_map.values()):
+        if not isinstance(objeto, MovimientoVigencia):
+            continue
+        poliza = inspect(objeto).dict.get("numero_poliza")
+        if poliza is None or poliza in polizas:
+            session.expire(objeto, ["actual", "version_anterior_id"])
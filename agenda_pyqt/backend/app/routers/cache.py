@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+
+from ..core.cache import CACHES
+from ..core.security import check_admin_permission
+from ..models.usuario import Usuario
+
+router = APIRouter()
+
+@router.get("/")
+def read_cache(current_user: Usuario = Depends(check_admin_permission)):
+    """Contadores de aciertos y fallos de las cachés en memoria de este proceso (sólo administradores)."""
+    return {nombre: cache.estadisticas() for nombre, cache in CACHES.items()}
@@ -1,22 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Literal, Optional
 from uuid import UUID
 import logging
+import os
+import shutil
+import tempfile
 import traceback
-from sqlalchemy import or_
 
 from ..db.session import SessionLocal
 from ..models.cliente import Cliente
 from ..models.usuario import Usuario
 from ..schemas import cliente as schemas
 from ..core.security import get_current_active_user
+from ..core.paginacion import codificar_cursor, decodificar_cursor, paginar_con_total, agregar_headers_total
+from ..crud.busqueda_clientes import buscar_clientes, filtro_busqueda
+from ..crud.clientes_masivo import validar_clientes, insertar_clientes
+from ..crud import importacion_clientes
+from ..crud.exportacion import FORMATOS_EXPORTACION, transmitir_exportacion
+from ..core.config import settings
+from ..core.etag import agregar_versiones, calcular_etag, etag_pagina, no_modificado
+from ..core.campos import parsear_campos, seleccionar_campos, respuesta_campos
+from ..core.serializacion import respuesta_lista
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Campos que admite el parámetro fields del listado de clientes
+CAMPOS_CLIENTE = {
+    campo: getattr(Cliente, campo)
+    for campo in schemas.Cliente.model_fields
+    if campo != "movimientos_vigencias"
+}
+
 # Dependencia para obtener la sesión de la base de datos
 def get_db():
     db = SessionLocal()
@@ -51,46 +71,165 @@ def create_cliente(
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error al crear el cliente: {str(e)}")
 
+@router.post("/bulk", response_model=schemas.ClienteBulkResultado)
+def create_clientes_bulk(
+    clientes: List[Dict[str, Any]] = Body(..., description="Lista de clientes con el formato de ClienteCreate"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Alta masiva de clientes en una sola transacción.
+    Cada elemento se valida por separado: los inválidos o duplicados se devuelven
+    en "errores" con su índice y el resto se crea igualmente.
+    """
+    if len(clientes) > settings.CLIENTES_BULK_MAXIMO:
+        raise HTTPException(
+            status_code=413,
+            detail=f"El lote supera el máximo de {settings.CLIENTES_BULK_MAXIMO} clientes"
+        )
+    try:
+        logger.debug(f"Alta masiva de {len(clientes)} clientes. Usuario: {current_user.email}")
+        validos, errores = validar_clientes(enumerate(clientes))
+        creados, errores_insercion = insertar_clientes(db, validos, current_user.id)
+        db.commit()
+        logger.debug(f"Clientes creados: {len(creados)}, con errores: {len(errores) + len(errores_insercion)}")
+        return schemas.ClienteBulkResultado(
+            creados=creados,
+            errores=sorted(errores + errores_insercion, key=lambda error: error["indice"])
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error en el alta masiva de clientes: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error en el alta masiva de clientes: {str(e)}")
+
+def _ejecutar_importacion(importacion: schemas.ImportacionClientes, ruta: str, user_id: int):
+    """Tarea en segundo plano: usa su propia sesión y borra el archivo subido al terminar."""
+    db = SessionLocal()
+    try:
+        importacion_clientes.procesar_importacion(db, importacion, ruta, user_id)
+        logger.debug(f"Importación {importacion.id} terminada: {importacion.model_dump()}")
+    except Exception as e:
+        logger.error(f"Error en la importación {importacion.id}: {str(e)}")
+        logger.error(traceback.format_exc())
+    finally:
+        db.close()
+        os.remove(ruta)
+
+@router.post("/importar", response_model=schemas.ImportacionClientes, status_code=202)
+def importar_clientes(
+    background_tasks: BackgroundTasks,
+    archivo: UploadFile = File(..., description="Planilla CSV o XLSX con una fila de encabezados"),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Importa clientes desde una planilla CSV o XLSX en segundo plano.
+    Los clientes se insertan o actualizan según su numero_documento. El progreso se
+    consulta en GET /importar/{id} y los rechazos en GET /importar/{id}/errores.
+    """
+    formato = os.path.splitext(archivo.filename or "")[1].lower().lstrip(".")
+    if formato not in importacion_clientes.FORMATOS_IMPORTACION:
+        raise HTTPException(status_code=400, detail="El archivo debe ser .csv o .xlsx")
+
+    # Copiar la subida a disco por bloques para no cargarla en memoria
+    descriptor, ruta = tempfile.mkstemp(prefix="importacion_", suffix=f".{formato}")
+    with os.fdopen(descriptor, "wb") as destino:
+        shutil.copyfileobj(archivo.file, destino)
+
+    importacion = importacion_clientes.registrar_importacion(formato)
+    logger.debug(f"Importación {importacion.id} ({archivo.filename}) iniciada por {current_user.email}")
+    background_tasks.add_task(_ejecutar_importacion, importacion, ruta, current_user.id)
+    return importacion
+
+@router.get("/importar/{importacion_id}", response_model=schemas.ImportacionClientes)
+def read_importacion(
+    importacion_id: str,
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Obtiene el progreso de una importación de clientes."""
+    importacion = importacion_clientes.obtener_importacion(importacion_id)
+    if importacion is None:
+        raise HTTPException(status_code=404, detail="Importación no encontrada")
+    return importacion
+
+@router.get("/importar/{importacion_id}/errores")
+def read_importacion_errores(
+    importacion_id: str,
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Descarga el CSV con las filas rechazadas de una importación terminada."""
+    importacion = importacion_clientes.obtener_importacion(importacion_id)
+    if importacion is None:
+        raise HTTPException(status_code=404, detail="Importación no encontrada")
+    if not importacion.ruta_errores:
+        raise HTTPException(status_code=409, detail="La importación todavía no terminó")
+    return FileResponse(
+        importacion.ruta_errores,
+        media_type="text/csv",
+        filename=f"errores_importacion_{importacion_id}.csv"
+    )
+
 @router.get("/", response_model=List[schemas.Cliente])
 def read_clientes(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas, ej: nombres,apellidos,mail"),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
-    Obtiene la lista de clientes.
+    Obtiene la lista de clientes ordenada por número de cliente.
+
+    Parámetros:
+    - skip: Número de registros a saltar (paginación por desplazamiento, se mantiene por compatibilidad)
+    - limit: Número máximo de registros a devolver
+    - cursor: Cursor opaco devuelto en el header X-Next-Cursor de la página anterior.
+      Si se indica, se ignora skip y la página se obtiene con un rango sobre el índice
+      de numero_cliente, por lo que su costo no depende de la profundidad.
+    - fields: Si se indica, sólo se leen y devuelven esos campos (numero_cliente
+      se incluye siempre).
+
+    Sin cursor, el total de registros se devuelve en el header X-Total-Count.
+    Admite If-None-Match: el ETag se calcula con la página leída y, si no hubo
+    cambios, devuelve 304 sin serializarla.
     """
     try:
         logger.debug(f"Obteniendo clientes. Usuario: {current_user.email} (ID: {current_user.id})")
-        clientes = db.query(Cliente).offset(skip).limit(limit).all()
+        campos = parsear_campos(fields, CAMPOS_CLIENTE, "numero_cliente")
+        query = db.query(Cliente).order_by(Cliente.numero_cliente)
+
+        # Leer sólo columnas (sin objetos ORM): todas o las pedidas en fields
+        query = seleccionar_campos(query, CAMPOS_CLIENTE, campos or list(CAMPOS_CLIENTE))
+        query = agregar_versiones(query, Cliente.fecha_modificacion)
+        total = None
+        if cursor:
+            posicion = decodificar_cursor(cursor, numero_cliente=int)
+            clientes = query.filter(Cliente.numero_cliente > posicion["numero_cliente"]).limit(limit).all()
+        else:
+            clientes, total, estimado = paginar_con_total(db, query, skip, limit)
+            agregar_headers_total(response, total, estimado)
         logger.debug(f"Clientes encontrados: {len(clientes)}")
-        
-        # Transformar los clientes al formato del schema
-        return [
-            schemas.Cliente(
-                id=cliente.id,
-                numero_cliente=cliente.numero_cliente,
-                nombres=cliente.nombres,
-                apellidos=cliente.apellidos,
-                tipo_documento=cliente.tipo_documento,
-                numero_documento=cliente.numero_documento,
-                fecha_nacimiento=cliente.fecha_nacimiento,
-                direccion=cliente.direccion,
-                localidad=cliente.localidad,
-                telefonos=cliente.telefonos,
-                movil=cliente.movil,
-                mail=cliente.mail,
-                corredor=cliente.corredor,
-                observaciones=cliente.observaciones,
-                creado_por_id=cliente.creado_por_id,
-                modificado_por_id=cliente.modificado_por_id,
-                fecha_creacion=cliente.fecha_creacion,
-                fecha_modificacion=cliente.fecha_modificacion,
-                movimientos_vigencias=[]  # Lista vacía por defecto
+
+        etag = etag_pagina(clientes, "numero_cliente", skip, limit, cursor, campos, total)
+        respuesta_304 = no_modificado(request, etag)
+        if respuesta_304:
+            return respuesta_304
+        response.headers["ETag"] = etag
+
+        # Si la página está completa puede haber más registros: devolver el cursor siguiente
+        if limit > 0 and len(clientes) == limit:
+            response.headers["X-Next-Cursor"] = codificar_cursor(
+                {"numero_cliente": clientes[-1].numero_cliente}
             )
-            for cliente in clientes
-        ]
+
+        if campos:
+            return respuesta_campos(clientes, campos, response)
+        return respuesta_lista(schemas.Cliente, clientes, response)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error al obtener clientes: {str(e)}")
         logger.error(traceback.format_exc())
@@ -99,6 +238,8 @@ def read_clientes(
 @router.get("/por-corredor/{corredor_numero}", response_model=List[schemas.ClientePorCorredor])
 def read_clientes_por_corredor(
     corredor_numero: int,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
     search: str = None,
@@ -114,6 +255,10 @@ def read_clientes_por_corredor(
     - skip: Número de registros a saltar (para paginación)
     - limit: Número máximo de registros a devolver
     - search: Texto para buscar en nombres, apellidos, documento o email
+
+    El total de registros de la búsqueda se devuelve en el header X-Total-Count.
+    Admite If-None-Match: el ETag se calcula con la página leída y, si no hubo
+    cambios, devuelve 304 sin serializarla.
     """
     try:
         logger.debug(f"Usuario {current_user.email} buscando clientes para el corredor: {corredor_numero}")
@@ -122,29 +267,23 @@ def read_clientes_por_corredor(
         # Construir la query base
         query = db.query(Cliente).filter(Cliente.corredor == corredor_numero)
         
-        # Agregar búsqueda si se especifica
+        # Agregar búsqueda si se especifica (usa los índices trigram)
         if search:
-            search = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Cliente.nombres.ilike(search),
-                    Cliente.apellidos.ilike(search),
-                    Cliente.numero_documento.ilike(search),
-                    Cliente.mail.ilike(search)
-                )
-            )
+            query = query.filter(filtro_busqueda(search))
         
         # Log de la query SQL
         logger.debug(f"Query SQL: {query.statement}")
-        
-        # Ejecutar la query con orden y límites
-        clientes = query.order_by(Cliente.fecha_modificacion.desc())\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
-        
-        # Obtener el total de registros para esta búsqueda
-        total = query.count()
+
+        # Ejecutar la query con orden y límites; el total se calcula en la misma sentencia
+        clientes, total, estimado = paginar_con_total(
+            db, query.order_by(Cliente.fecha_modificacion.desc()), skip, limit
+        )
+        etag = etag_pagina(clientes, "numero_cliente", skip, limit, search, total)
+        respuesta_304 = no_modificado(request, etag)
+        if respuesta_304:
+            return respuesta_304
+        response.headers["ETag"] = etag
+        agregar_headers_total(response, total, estimado)
         
         if not clientes:
             logger.debug(f"No se encontraron clientes para el corredor {corredor_numero}")
@@ -155,6 +294,8 @@ def read_clientes_por_corredor(
         
         return clientes
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error al buscar clientes por corredor: {str(e)}")
         logger.error(f"Detalles del error: {traceback.format_exc()}")
@@ -163,17 +304,83 @@ def read_clientes_por_corredor(
             detail=f"Error al buscar clientes para el corredor {corredor_numero}: {str(e)}"
         )
 
+@router.get("/search", response_model=List[schemas.ClienteBusqueda])
+def search_clientes(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto a buscar"),
+    corredor: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Busca clientes por nombres, apellidos, documento o email.
+    Ignora mayúsculas y tildes, tolera errores de tipeo y acepta documentos
+    parciales con o sin puntos y guiones. Los resultados se ordenan por relevancia.
+    """
+    try:
+        logger.debug(f"Usuario {current_user.email} buscando clientes: q={q}, corredor={corredor}")
+        resultados = buscar_clientes(db, q.strip(), corredor=corredor, limit=limit)
+        return [
+            schemas.ClienteBusqueda(
+                id=cliente.id,
+                numero_cliente=cliente.numero_cliente,
+                nombres=cliente.nombres,
+                apellidos=cliente.apellidos,
+                numero_documento=cliente.numero_documento,
+                mail=cliente.mail,
+                corredor=cliente.corredor,
+                relevancia=relevancia or 0.0
+            )
+            for cliente, relevancia in resultados
+        ]
+    except Exception as e:
+        logger.error(f"Error al buscar clientes: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error al buscar clientes: {str(e)}")
+
+@router.get("/export")
+def export_clientes(
+    formato: Literal["csv", "ndjson"] = "csv",
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Exporta todos los clientes en CSV o NDJSON.
+    La respuesta se transmite a medida que se leen las filas, con memoria constante.
+    """
+    logger.debug(f"Exportación de clientes en {formato}. Usuario: {current_user.email}")
+    sentencia = select(*Cliente.__table__.columns).order_by(Cliente.numero_cliente)
+    return StreamingResponse(
+        transmitir_exportacion(sentencia, formato),
+        media_type=FORMATOS_EXPORTACION[formato],
+        headers={"Content-Disposition": f'attachment; filename="clientes.{formato}"'}
+    )
+
 @router.get("/{cliente_id}", response_model=schemas.Cliente)
 def read_cliente(
     cliente_id: UUID, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
+    """
+    Obtiene un cliente por su ID.
+    Admite If-None-Match: si no hubo cambios devuelve 304 sin cargar el cliente.
+    """
     try:
         logger.debug(f"Buscando cliente {cliente_id}. Usuario: {current_user.email}")
+        if "if-none-match" in request.headers:
+            # Validar el ETag leyendo sólo la fecha de modificación
+            fila = db.query(Cliente.fecha_modificacion).filter(Cliente.id == cliente_id).first()
+            if fila is not None:
+                respuesta_304 = no_modificado(request, calcular_etag(cliente_id, fila.fecha_modificacion))
+                if respuesta_304:
+                    return respuesta_304
+
         db_cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
         if db_cliente is None:
             raise HTTPException(status_code=404, detail="Cliente no encontrado")
+        response.headers["ETag"] = calcular_etag(cliente_id, db_cliente.fecha_modificacion)
         return db_cliente
     except HTTPException:
         raise
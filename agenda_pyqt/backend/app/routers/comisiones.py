@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException, Path
+from sqlalchemy.orm import Session
+from typing import List
+import logging
+import traceback
+
+from ..db.session import get_db
+from ..models.usuario import Usuario
+from ..schemas.comision import TasaComision, TasaComisionBase, LiquidacionComisiones
+from ..core.security import get_current_active_user
+from ..crud.comisiones import get_tasas, reemplazar_tasas, liquidar_comisiones
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/tasas", response_model=List[TasaComision])
+def read_tasas(
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Tabla de tasas de comisión por tipo de seguro y corredor."""
+    return get_tasas(db)
+
+@router.put("/tasas", response_model=List[TasaComision])
+def update_tasas(
+    tasas: List[TasaComisionBase],
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Reemplaza la tabla de tasas completa."""
+    claves = [(tasa.corredor, tasa.tipo_seguro_id) for tasa in tasas]
+    if len(set(claves)) != len(claves):
+        raise HTTPException(status_code=400, detail="Hay tasas repetidas para el mismo corredor y tipo de seguro")
+    try:
+        logger.debug(f"Reemplazo de {len(tasas)} tasas de comisión por {current_user.email}")
+        return reemplazar_tasas(db, tasas)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error al actualizar las tasas de comisión: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Error al actualizar las tasas de comisión: {str(e)}")
+
+@router.post("/liquidaciones/{anio}/{mes}", response_model=LiquidacionComisiones)
+def liquidar(
+    anio: int = Path(..., ge=1900, le=2100),
+    mes: int = Path(..., ge=1, le=12),
+    recalcular: bool = False,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Calcula y graba la comisión de los movimientos que empiezan en el mes y
+    devuelve los totales por usuario, corredor y moneda. Si los movimientos del
+    mes no cambiaron desde la última liquidación se devuelve la guardada, salvo
+    recalcular=true.
+    """
+    try:
+        logger.debug(f"Liquidación de comisiones {anio}-{mes:02d} solicitada por {current_user.email}")
+        return liquidar_comisiones(db, anio, mes, recalcular)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error al liquidar comisiones: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error al liquidar comisiones: {str(e)}")
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Optional
+import logging
+
+from ..db.session import get_db
+from ..models.usuario import Usuario
+from ..schemas.cuota import Cuota, CuotaPago, CuotaVencida
+from ..core.security import get_current_active_user
+from ..crud.cuotas import cuotas_vencidas, get_cuotas_movimiento, registrar_pago
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/vencidas", response_model=List[CuotaVencida])
+def read_cuotas_vencidas(
+    corredor: Optional[int] = None,
+    al: Optional[date] = Query(None, description="Vencidas antes de esta fecha (por defecto, hoy)"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Cuotas impagas ya vencidas, por corredor y de la más atrasada a la más reciente."""
+    al = al or date.today()
+    filas = cuotas_vencidas(db, al, corredor, limit)
+    return [
+        CuotaVencida(**dict(zip(fila._fields, fila)), dias_atraso=(al - fila.fecha_vencimiento).days)
+        for fila in filas
+    ]
+
+@router.get("/movimiento/{movimiento_id}", response_model=List[Cuota])
+def read_cuotas_movimiento(
+    movimiento_id: int,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Plan de cuotas de un movimiento."""
+    return get_cuotas_movimiento(db, movimiento_id)
+
+@router.patch("/{cuota_id}", response_model=Cuota)
+def update_pago_cuota(
+    cuota_id: int,
+    pago: CuotaPago,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Registra (o anula) el pago de una cuota."""
+    cuota = registrar_pago(db, cuota_id, pago.pagada, pago.fecha_pago)
+    if cuota is None:
+        raise HTTPException(status_code=404, detail="Cuota no encontrada")
+    logger.debug(f"Cuota {cuota_id} pagada={pago.pagada} por {current_user.email}")
+    return cuota
@@ -1,12 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import date, timedelta
+from typing import Any, Dict, List, Literal, Optional
 from uuid import UUID
 import logging
+import os
+import shutil
+import tempfile
+import traceback
 
 from ..db.session import SessionLocal
+from ..core.config import settings
 from .. import models, schemas
 from ..core.security import get_current_active_user
+from ..core.paginacion import paginar_con_total, agregar_headers_total
+from ..core.etag import agregar_versiones, calcular_etag, etag_lista, etag_pagina, no_modificado
+from ..crud.exportacion import FORMATOS_EXPORTACION, transmitir_exportacion
+from ..core.campos import parsear_campos, respuesta_campos
+from ..core.serializacion import respuesta_lista
+from ..crud.vencimientos import resumen_vencimientos, movimientos_por_vencer
+from ..crud.renovaciones import renovar_movimientos
+from ..crud.cuotas import generar_cuotas
+from ..crud import bordereaux
+from ..crud.movimientos_masivo import validar_movimientos, insertar_movimientos
+from ..crud.importacion_clientes import FORMATOS_IMPORTACION
+from ..crud.movimientos import (
+    CAMPOS_MOVIMIENTO, CAMPOS_MOVIMIENTO_CLIENTE, ORDENES_MOVIMIENTO, actualizar_movimiento, columnas_movimiento,
+    existe_movimiento, movimiento_a_schema, seleccionar_movimientos, filtrar_movimientos, ordenar_movimientos,
+    query_movimientos_por_poliza,
+)
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -23,30 +48,25 @@ def get_db():
 
 @router.post("/", response_model=schemas.MovimientoVigencia)
 def create_movimiento(movimiento: schemas.MovimientoVigenciaCreate, db: Session = Depends(get_db)):
+    duplicado = (
+        f"Ya existe un movimiento de la póliza {movimiento.Poliza} con endoso "
+        f"{movimiento.Endoso or '(sin endoso)'} e inicio {movimiento.Vto_Desde}"
+    )
     try:
         # Buscar el cliente por su número
         cliente = db.query(models.Cliente).filter(models.Cliente.numero_cliente == movimiento.Cliente).first()
         if not cliente:
             raise HTTPException(status_code=404, detail=f"Cliente número {movimiento.Cliente} no encontrado")
+        if existe_movimiento(db, movimiento.Poliza, movimiento.Endoso, movimiento.Vto_Desde):
+            raise HTTPException(status_code=409, detail=duplicado)
 
         # Crear el movimiento con los campos correctos
-        db_movimiento = models.MovimientoVigencia(
-            cliente_id=cliente.id,  # UUID del cliente
-            corredor_id=movimiento.Corredor,
-            tipo_seguro_id=movimiento.Tipo_seguro,
-            carpeta=movimiento.Carpeta,
-            numero_poliza=movimiento.Poliza,
-            endoso=movimiento.Endoso,
-            fecha_inicio=movimiento.Vto_Desde,
-            fecha_vencimiento=movimiento.Vto_Hasta,
-            moneda=movimiento.Moneda,
-            suma_asegurada=movimiento.Premio,  # Asumiendo que Premio es la suma asegurada
-            prima=movimiento.Premio,  # Asumiendo que Premio es también la prima
-            cuotas=movimiento.Cuotas,
-            observaciones=movimiento.Observaciones
-        )
+        db_movimiento = models.MovimientoVigencia(**columnas_movimiento(movimiento, cliente.id))
         
         db.add(db_movimiento)
+        db.flush()
+        # Plan de cuotas en la misma transacción que el movimiento
+        generar_cuotas(db, [db_movimiento.id])
         db.commit()
         db.refresh(db_movimiento)
 
@@ -66,55 +86,339 @@ def create_movimiento(movimiento: schemas.MovimientoVigenciaCreate, db: Session
             Moneda=movimiento.Moneda,
             Premio=movimiento.Premio,
             Cuotas=movimiento.Cuotas,
-            Observaciones=movimiento.Observaciones
+            Observaciones=movimiento.Observaciones,
+            Actual=db_movimiento.actual,
+            Version_anterior=db_movimiento.version_anterior_id
         )
 
+    except HTTPException:
+        db.rollback()
+        raise
+    except IntegrityError as e:
+        db.rollback()
+        # Otra transacción dio de alta la misma póliza, endoso e inicio después de la verificación
+        if existe_movimiento(db, movimiento.Poliza, movimiento.Endoso, movimiento.Vto_Desde):
+            raise HTTPException(status_code=409, detail=duplicado)
+        logger.error(f"Error al crear movimiento: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
+        db.rollback()
         logger.error(f"Error al crear movimiento: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/batch", response_model=schemas.MovimientoBatchResultado)
+def create_movimientos_batch(
+    movimientos: List[Dict[str, Any]] = Body(..., description="Lista de movimientos con el formato de MovimientoVigenciaCreate"),
+    db: Session = Depends(get_db)
+):
+    """
+    Alta de varios movimientos (por ejemplo, una póliza de flota) en una sola
+    transacción: clientes, corredores y tipos de seguro se buscan con una consulta
+    por tabla y los movimientos se insertan en una sola sentencia. Cada elemento se
+    valida por separado: los inválidos o repetidos se devuelven en "errores" con su
+    índice y el resto se crea igualmente.
+    """
+    if len(movimientos) > settings.MOVIMIENTOS_BATCH_MAXIMO:
+        raise HTTPException(
+            status_code=413,
+            detail=f"El lote supera el máximo de {settings.MOVIMIENTOS_BATCH_MAXIMO} movimientos"
+        )
+    try:
+        validos, errores = validar_movimientos(enumerate(movimientos))
+        creados, errores_insercion = insertar_movimientos(db, validos)
+        db.commit()
+        logger.debug(f"Movimientos creados: {len(creados)}, con errores: {len(errores) + len(errores_insercion)}")
+        return schemas.MovimientoBatchResultado(
+            creados=creados,
+            errores=sorted(errores + errores_insercion, key=lambda error: error["indice"])
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error en el alta de movimientos por lote: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error en el alta de movimientos por lote: {str(e)}")
+
 @router.get("/", response_model=List[schemas.MovimientoVigencia])
-def read_movimientos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    movimientos = db.query(models.MovimientoVigencia).offset(skip).limit(limit).all()
-    
-    # Transformar los movimientos al formato esperado por el frontend
-    return [
-        schemas.MovimientoVigencia(
-            Id_movimiento=mov.id,
-            FechaMov=mov.fecha_inicio,
-            Corredor=mov.corredor_id,
-            Cliente=mov.cliente_rel.numero_cliente,
-            Cliente_nombre=f"{mov.cliente_rel.nombres} {mov.cliente_rel.apellidos}",
-            Tipo_seguro=mov.tipo_seguro_id,
-            Carpeta=mov.carpeta,
-            Poliza=mov.numero_poliza,
-            Endoso=mov.endoso,
-            Vto_Desde=mov.fecha_inicio,
-            Vto_Hasta=mov.fecha_vencimiento,
-            Moneda=mov.moneda,
-            Premio=mov.prima,
-            Cuotas=mov.cuotas,
-            Observaciones=mov.observaciones
-        ) 
-        for mov in movimientos
-    ]
+def read_movimientos(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    corredor_id: Optional[int] = None,
+    tipo_seguro_id: Optional[int] = None,
+    moneda: Optional[str] = None,
+    fecha_inicio_desde: Optional[date] = None,
+    fecha_inicio_hasta: Optional[date] = None,
+    fecha_vencimiento_desde: Optional[date] = None,
+    fecha_vencimiento_hasta: Optional[date] = None,
+    poliza: Optional[str] = Query(None, min_length=1, max_length=100, description="Prefijo del número de póliza"),
+    actuales: bool = Query(False, description="Sólo la versión actual de cada póliza (cartera activa)"),
+    orden: str = Query(
+        "id",
+        pattern=f"^-?({'|'.join(ORDENES_MOVIMIENTO)})$",
+        description=f"Orden del listado: {', '.join(ORDENES_MOVIMIENTO)} (con '-' delante, descendente)"
+    ),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas, ej: Poliza,Vto_Hasta"),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtiene la lista de movimientos de vigencia.
+
+    Filtros opcionales (se combinan con AND): corredor_id, tipo_seguro_id, moneda,
+    rangos inclusivos de fecha_inicio y fecha_vencimiento, prefijo de póliza y
+    actuales (sin los endosos y períodos reemplazados).
+    Los filtros por corredor o tipo de seguro con rango de fechas usan los índices
+    compuestos de movimientos_vigencias.
+
+    Con fields sólo se leen y devuelven esos campos (Id_movimiento se incluye siempre)
+    y la tabla clientes se une sólo si se piden Cliente o Cliente_nombre.
+    """
+    campos = parsear_campos(fields, CAMPOS_MOVIMIENTO, "Id_movimiento")
+    filtros = dict(
+        corredor_id=corredor_id,
+        tipo_seguro_id=tipo_seguro_id,
+        moneda=moneda,
+        fecha_inicio_desde=fecha_inicio_desde,
+        fecha_inicio_hasta=fecha_inicio_hasta,
+        fecha_vencimiento_desde=fecha_vencimiento_desde,
+        fecha_vencimiento_hasta=fecha_vencimiento_hasta,
+        poliza=poliza,
+        actuales=actuales,
+    )
+    query = ordenar_movimientos(filtrar_movimientos(db.query(models.MovimientoVigencia), **filtros), orden)
+
+    # Leer sólo columnas (sin objetos ORM): todas o las pedidas en fields
+    seleccion = campos or list(CAMPOS_MOVIMIENTO)
+    query = seleccionar_movimientos(query, seleccion)
+    # Si la respuesta incluye datos del cliente, el ETag considera también sus cambios
+    versiones = [models.MovimientoVigencia.fecha_modificacion]
+    if CAMPOS_MOVIMIENTO_CLIENTE.intersection(seleccion):
+        versiones.append(models.Cliente.fecha_modificacion)
+    movimientos, total, estimado = paginar_con_total(db, agregar_versiones(query, *versiones), skip, limit)
+
+    etag = etag_pagina(movimientos, "Id_movimiento", skip, limit, campos, orden, sorted(filtros.items()), total)
+    respuesta_304 = no_modificado(request, etag)
+    if respuesta_304:
+        return respuesta_304
+    response.headers["ETag"] = etag
+    agregar_headers_total(response, total, estimado)
+    if campos:
+        return respuesta_campos(movimientos, campos, response)
+    return respuesta_lista(schemas.MovimientoVigencia, movimientos, response)
+
+@router.get("/export")
+def export_movimientos(
+    formato: Literal["csv", "ndjson"] = "csv",
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Exporta todos los movimientos de vigencia, con el número de cliente, en CSV o NDJSON.
+    La respuesta se transmite a medida que se leen las filas, con memoria constante.
+    """
+    logger.debug(f"Exportación de movimientos en {formato}. Usuario: {current_user.email}")
+    sentencia = (
+        select(*models.MovimientoVigencia.__table__.columns, models.Cliente.numero_cliente)
+        .join(models.Cliente, models.Cliente.id == models.MovimientoVigencia.cliente_id)
+        .order_by(models.MovimientoVigencia.id)
+    )
+    return StreamingResponse(
+        transmitir_exportacion(sentencia, formato),
+        media_type=FORMATOS_EXPORTACION[formato],
+        headers={"Content-Disposition": f'attachment; filename="movimientos.{formato}"'}
+    )
+
+@router.get("/vencimientos", response_model=schemas.Vencimientos)
+def read_vencimientos(
+    desde: Optional[date] = Query(None, description="Primer día del período (por defecto, hoy)"),
+    hasta: Optional[date] = Query(None, description="Último día del período (por defecto, desde + 30 días)"),
+    corredor: Optional[int] = None,
+    limit: int = Query(500, ge=1, le=5000, description="Máximo de pólizas en el detalle"),
+    db: Session = Depends(get_db)
+):
+    """
+    Pólizas que vencen en un período.
+    Devuelve el resumen por día y moneda (cantidad y total de primas), leído de la
+    tabla precalculada vencimientos_diarios, y el detalle de las pólizas ordenado
+    por fecha de vencimiento. Ambos consideran sólo la versión actual de cada
+    póliza (sin los endosos y períodos reemplazados).
+    """
+    desde = desde or date.today()
+    hasta = hasta or desde + timedelta(days=30)
+    if hasta < desde:
+        raise HTTPException(status_code=400, detail="'hasta' no puede ser anterior a 'desde'")
+
+    dias = resumen_vencimientos(db, desde, hasta, corredor)
+    movimientos = movimientos_por_vencer(db, desde, hasta, corredor, limit)
+    return schemas.Vencimientos(
+        desde=desde,
+        hasta=hasta,
+        corredor=corredor,
+        dias=[schemas.VencimientoDia.model_validate(dia) for dia in dias],
+        movimientos=[dict(zip(mov._fields, mov)) for mov in movimientos]
+    )
+
+@router.post("/renovaciones", response_model=schemas.RenovacionResultado)
+def renovar_vencimientos(
+    solicitud: schemas.RenovacionSolicitud,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Renueva en una sola transacción las pólizas que vencen entre desde y hasta:
+    crea para cada una el movimiento del período siguiente (misma duración, desde
+    su vencimiento). Con dry_run (por defecto) sólo devuelve lo que se crearía.
+    Las pólizas ya renovadas se omiten, por lo que se puede repetir sin duplicar.
+    """
+    if solicitud.hasta < solicitud.desde:
+        raise HTTPException(status_code=400, detail="'hasta' no puede ser anterior a 'desde'")
+    try:
+        logger.debug(f"Renovación {solicitud.model_dump()} solicitada por {current_user.email}")
+        renovaciones = renovar_movimientos(
+            db, solicitud.desde, solicitud.hasta, solicitud.corredor, solicitud.dry_run
+        )
+        if not solicitud.dry_run:
+            db.commit()
+        logger.debug(f"Renovaciones {'a crear' if solicitud.dry_run else 'creadas'}: {len(renovaciones)}")
+        return schemas.RenovacionResultado(
+            dry_run=solicitud.dry_run,
+            cantidad=len(renovaciones),
+            renovaciones=[schemas.Renovacion.model_validate(fila) for fila in renovaciones]
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error en la renovación de movimientos: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error en la renovación de movimientos: {str(e)}")
+
+@router.get("/poliza/{prefijo:path}", response_model=List[schemas.MovimientoVigencia])
+def read_movimientos_by_poliza(
+    prefijo: str,
+    response: Response,
+    limit: int = Query(200, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Busca pólizas por número (o su comienzo) y devuelve, para cada una, su cadena
+    de endosos en orden. El prefijo se resuelve con ix_movimientos_poliza_prefijo,
+    sin recorrer la tabla; los números con '/' se aceptan tal cual.
+    """
+    if not prefijo or len(prefijo) > 100:
+        raise HTTPException(status_code=400, detail="El prefijo debe tener entre 1 y 100 caracteres")
+    # Sin ETag ni total: ambos obligarían a recorrer todas las coincidencias de un prefijo corto
+    query = query_movimientos_por_poliza(db, prefijo)
+    movimientos = seleccionar_movimientos(query, list(CAMPOS_MOVIMIENTO)).limit(limit).all()
+    return respuesta_lista(schemas.MovimientoVigencia, movimientos, response)
+
+def _ejecutar_bordereau(importacion: schemas.ImportacionBordereau, ruta: str):
+    """Tarea en segundo plano: usa su propia sesión y borra el archivo subido al terminar."""
+    db = SessionLocal()
+    try:
+        bordereaux.procesar_bordereau(db, importacion, ruta)
+        logger.debug(f"Bordereau {importacion.id} terminado: {importacion.model_dump()}")
+    except Exception as e:
+        logger.error(f"Error en el bordereau {importacion.id}: {str(e)}")
+        logger.error(traceback.format_exc())
+    finally:
+        db.close()
+        os.remove(ruta)
+
+@router.post("/bordereaux", response_model=schemas.ImportacionBordereau, status_code=202)
+def importar_bordereau(
+    background_tasks: BackgroundTasks,
+    aseguradora: str = Query(..., description="Aseguradora que envía el archivo (TipoSeguro.Aseguradora)"),
+    archivo: UploadFile = File(..., description="Bordereau CSV o XLSX con una fila de encabezados"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Ingesta en segundo plano el bordereau mensual de una aseguradora. Cada fila
+    inserta o actualiza el movimiento de su póliza/endoso/inicio de vigencia; los
+    clientes se buscan por numero_documento y los tipos por código. El progreso se
+    consulta en GET /bordereaux/{id} y los rechazos en GET /bordereaux/{id}/errores.
+    """
+    formato = os.path.splitext(archivo.filename or "")[1].lower().lstrip(".")
+    if formato not in FORMATOS_IMPORTACION:
+        raise HTTPException(status_code=400, detail="El archivo debe ser .csv o .xlsx")
+    if db.query(models.TipoSeguro.Id_tipo).filter(models.TipoSeguro.Aseguradora == aseguradora).first() is None:
+        raise HTTPException(status_code=404, detail=f"No hay tipos de seguro de la aseguradora {aseguradora}")
+
+    # Copiar la subida a disco por bloques para no cargarla en memoria
+    descriptor, ruta = tempfile.mkstemp(prefix="bordereau_", suffix=f".{formato}")
+    with os.fdopen(descriptor, "wb") as destino:
+        shutil.copyfileobj(archivo.file, destino)
+
+    importacion = bordereaux.registrar_importacion(aseguradora, formato)
+    logger.debug(f"Bordereau {importacion.id} ({archivo.filename}) de {aseguradora} iniciado por {current_user.email}")
+    background_tasks.add_task(_ejecutar_bordereau, importacion, ruta)
+    return importacion
+
+@router.get("/bordereaux/{importacion_id}", response_model=schemas.ImportacionBordereau)
+def read_bordereau(
+    importacion_id: str,
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Obtiene el progreso de la ingesta de un bordereau."""
+    importacion = bordereaux.obtener_importacion(importacion_id)
+    if importacion is None:
+        raise HTTPException(status_code=404, detail="Ingesta no encontrada")
+    return importacion
+
+@router.get("/bordereaux/{importacion_id}/errores")
+def read_bordereau_errores(
+    importacion_id: str,
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Descarga el CSV con las filas rechazadas de una ingesta terminada."""
+    importacion = bordereaux.obtener_importacion(importacion_id)
+    if importacion is None:
+        raise HTTPException(status_code=404, detail="Ingesta no encontrada")
+    if not importacion.ruta_errores:
+        raise HTTPException(status_code=409, detail="La ingesta todavía no terminó")
+    return FileResponse(
+        importacion.ruta_errores,
+        media_type="text/csv",
+        filename=f"errores_bordereau_{importacion_id}.csv"
+    )
 
 @router.get("/{movimiento_id}", response_model=schemas.MovimientoVigencia)
-def read_movimiento(movimiento_id: int, db: Session = Depends(get_db)):
+def read_movimiento(movimiento_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    if "if-none-match" in request.headers:
+        # Validar el ETag leyendo sólo la fecha de modificación
+        fila = db.query(models.MovimientoVigencia.fecha_modificacion)\
+            .filter(models.MovimientoVigencia.id == movimiento_id).first()
+        if fila is not None:
+            respuesta_304 = no_modificado(request, calcular_etag(movimiento_id, fila.fecha_modificacion))
+            if respuesta_304:
+                return respuesta_304
+
     db_movimiento = db.query(models.MovimientoVigencia).filter(models.MovimientoVigencia.id == movimiento_id).first()
     if db_movimiento is None:
         raise HTTPException(status_code=404, detail="Movimiento no encontrado")
+    response.headers["ETag"] = calcular_etag(movimiento_id, db_movimiento.fecha_modificacion)
     return db_movimiento
 
 @router.get("/cliente/{cliente_id}", response_model=List[schemas.MovimientoVigencia])
-def read_movimientos_by_cliente(cliente_id: UUID, db: Session = Depends(get_db)):
+def read_movimientos_by_cliente(cliente_id: UUID, request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Obtiene los movimientos de un cliente.
+    Los datos del cliente se leen en la misma consulta que los movimientos, de modo
+    que la cantidad de sentencias no depende de cuántos movimientos tenga.
+    """
     # Verificar si el cliente existe
-    cliente = db.query(models.Cliente).filter(models.Cliente.id == cliente_id).first()
+    cliente = db.query(models.Cliente.fecha_modificacion).filter(models.Cliente.id == cliente_id).first()
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente no encontrado")
     
-    movimientos = db.query(models.MovimientoVigencia).filter(models.MovimientoVigencia.cliente_id == cliente_id).all()
-    return movimientos
+    query = db.query(models.MovimientoVigencia)\
+        .filter(models.MovimientoVigencia.cliente_id == cliente_id)\
+        .order_by(models.MovimientoVigencia.id)
+    etag = etag_lista(query, models.MovimientoVigencia.fecha_modificacion, cliente.fecha_modificacion)
+    respuesta_304 = no_modificado(request, etag)
+    if respuesta_304:
+        return respuesta_304
+    response.headers["ETag"] = etag
+
+    movimientos = seleccionar_movimientos(query, list(CAMPOS_MOVIMIENTO)).all()
+    return respuesta_lista(schemas.MovimientoVigencia, movimientos, response)
 
 @router.put("/{movimiento_id}", response_model=schemas.MovimientoVigencia)
 def update_movimiento(movimiento_id: int, movimiento: schemas.MovimientoVigenciaCreate, db: Session = Depends(get_db)):
@@ -122,10 +426,14 @@ def update_movimiento(movimiento_id: int, movimiento: schemas.MovimientoVigencia
     if db_movimiento is None:
         raise HTTPException(status_code=404, detail="Movimiento no encontrado")
     
-    for key, value in movimiento.dict().items():
-        setattr(db_movimiento, key, value)
+    cliente_id = db.query(models.Cliente.id).filter(models.Cliente.numero_cliente == movimiento.Cliente).scalar()
+    if cliente_id is None:
+        raise HTTPException(status_code=404, detail=f"Cliente número {movimiento.Cliente} no encontrado")
+
+    # Si cambia el plan de pagos, las cuotas impagas se rehacen en la misma transacción
+    actualizar_movimiento(db, db_movimiento, columnas_movimiento(movimiento, cliente_id))
     db.commit()
-    return db_movimiento
+    return movimiento_a_schema(db_movimiento)
 
 @router.delete("/{movimiento_id}")
 def delete_movimiento(
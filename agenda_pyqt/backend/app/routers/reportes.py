@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Optional
+import logging
+import traceback
+
+from ..db.session import get_db
+from ..models.usuario import Usuario
+from ..schemas.reporte import ReporteProduccionFila
+from ..core.security import get_current_active_user
+from ..crud.reportes import DIMENSIONES, reporte_produccion, refrescar_reporte_produccion
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/produccion", response_model=List[ReporteProduccionFila])
+def read_reporte_produccion(
+    agrupar: str = Query(
+        "corredor,tipo_seguro,moneda,mes",
+        description=f"Dimensiones separadas por comas: {', '.join(DIMENSIONES)}"
+    ),
+    desde: Optional[date] = Query(None, description="Desde el mes de esta fecha"),
+    hasta: Optional[date] = Query(None, description="Hasta el mes de esta fecha"),
+    corredor: Optional[int] = None,
+    tipo_seguro_id: Optional[int] = None,
+    moneda: Optional[str] = None,
+    moneda_reporte: Optional[str] = Query(
+        None, description="Agregar los totales convertidos a esta moneda (cotización de cierre de cada mes)"
+    ),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Totales de prima y suma asegurada por corredor, tipo de seguro, moneda y/o mes.
+    Se leen de la vista materializada reporte_produccion_mensual, que se refresca
+    periódicamente cuando hay cambios (o con POST /reportes/produccion/refrescar).
+    """
+    dimensiones = [dimension.strip() for dimension in agrupar.split(",") if dimension.strip()]
+    desconocidas = [dimension for dimension in dimensiones if dimension not in DIMENSIONES]
+    if desconocidas:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Dimensiones desconocidas: {', '.join(desconocidas)}. Disponibles: {', '.join(DIMENSIONES)}"
+        )
+    try:
+        logger.debug(f"Reporte de producción por {dimensiones}. Usuario: {current_user.email}")
+        filas = reporte_produccion(
+            db, list(dict.fromkeys(dimensiones)), desde, hasta, corredor, tipo_seguro_id, moneda, moneda_reporte
+        )
+        return [ReporteProduccionFila.model_validate(fila) for fila in filas]
+    except Exception as e:
+        logger.error(f"Error al generar el reporte de producción: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error al generar el reporte de producción: {str(e)}")
+
+@router.post("/produccion/refrescar", status_code=204)
+def refrescar_produccion(
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Refresca la vista de producción en el momento (por ejemplo, desde un cron)."""
+    try:
+        logger.debug(f"Refresco de la vista de producción solicitado por {current_user.email}")
+        refrescar_reporte_produccion(db)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error al refrescar la vista de producción: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error al refrescar la vista de producción: {str(e)}")
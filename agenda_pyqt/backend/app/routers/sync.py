@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import datetime
+import logging
+import traceback
+
+from ..db.session import get_db
+from ..models.usuario import Usuario
+from ..schemas.sincronizacion import Sincronizacion
+from ..core.security import get_current_active_user
+from ..crud.sincronizacion import cambios_desde
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("", response_model=Sincronizacion)
+def sync(
+    since: datetime = Query(..., description="Fecha del último 'hasta' recibido (ISO 8601, UTC si no tiene zona)"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Devuelve los clientes, corredores y movimientos creados o modificados después
+    de `since`, y los registros eliminados en ese período, para refrescar el
+    cliente de escritorio sin recargar las tablas completas.
+    """
+    try:
+        logger.debug(f"Sincronización desde {since}. Usuario: {current_user.email}")
+        return cambios_desde(db, since)
+    except Exception as e:
+        logger.error(f"Error en la sincronización: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error en la sincronización: {str(e)}")
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Optional
+import logging
+
+from ..db.session import get_db
+from ..models.usuario import Usuario
+from ..schemas.tipo_cambio import TipoCambio, TipoCambioBase, Cotizacion
+from ..core.config import settings
+from ..core.security import get_current_active_user
+from ..crud.tipos_cambio import get_tipos_cambio, guardar_tipos_cambio, get_cotizacion
+from ..crud.comisiones import invalidar_liquidaciones
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/", response_model=List[TipoCambio])
+def read_tipos_cambio(
+    moneda: Optional[str] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Cotizaciones cargadas, por moneda y fecha."""
+    return get_tipos_cambio(db, moneda, desde, hasta)
+
+@router.put("/", response_model=int)
+def update_tipos_cambio(
+    tipos: List[TipoCambioBase],
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Carga o corrige cotizaciones (upsert por moneda y fecha). Devuelve cuántas se guardaron."""
+    if any(tipo.moneda == settings.MONEDA_BASE for tipo in tipos):
+        raise HTTPException(status_code=400, detail=f"La moneda base ({settings.MONEDA_BASE}) no lleva cotización")
+    try:
+        logger.debug(f"Carga de {len(tipos)} tipos de cambio por {current_user.email}")
+        guardados = guardar_tipos_cambio(db, tipos)
+        # Las liquidaciones en caché incluyen totales convertidos
+        invalidar_liquidaciones()
+        return guardados
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error al guardar tipos de cambio: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Error al guardar tipos de cambio: {str(e)}")
+
+@router.get("/cotizacion", response_model=Cotizacion)
+def read_cotizacion(
+    moneda: str,
+    fecha: Optional[date] = Query(None, description="Por defecto, hoy"),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Cotización vigente de una moneda en una fecha (la última cargada hasta ese día)."""
+    fecha = fecha or date.today()
+    return Cotizacion(moneda=moneda, fecha=fecha, moneda_base=settings.MONEDA_BASE,
+                      valor=get_cotizacion(moneda, fecha))
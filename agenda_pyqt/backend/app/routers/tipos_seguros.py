@@ -4,52 +4,60 @@ from typing import List
 
 from ..db.session import get_db
 from .. import models, schemas
+from ..core.security import get_current_active_user
+from ..crud import tipos_seguros as crud_tipos
 
-router = APIRouter(
-    prefix="/tipos-seguros",
-    tags=["tipos_seguros"]
-)
+router = APIRouter()
 
 @router.post("/", response_model=schemas.TipoSeguro)
-def create_tipo_seguro(tipo_seguro: schemas.TipoSeguroCreate, db: Session = Depends(get_db)):
-    db_tipo = models.TipoSeguro(**tipo_seguro.model_dump())
-    db.add(db_tipo)
-    db.commit()
-    db.refresh(db_tipo)
-    return db_tipo
+def create_tipo_seguro(
+    tipo_seguro: schemas.TipoSeguroCreate,
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(get_current_active_user)
+):
+    if crud_tipos.get_tipo_seguro(db, tipo_seguro.id_tipo) is not None:
+        raise HTTPException(status_code=400, detail=f"Ya existe el tipo de seguro {tipo_seguro.id_tipo}")
+    return crud_tipos.create_tipo_seguro(db, tipo_seguro)
 
 @router.get("/", response_model=List[schemas.TipoSeguro])
-def read_tipos_seguros(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    tipos = db.query(models.TipoSeguro).offset(skip).limit(limit).all()
-    return tipos
+def read_tipos_seguros(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(get_current_active_user)
+):
+    """Lista de tipos de seguro; cada página se guarda en memoria hasta que se modifica un tipo."""
+    return crud_tipos.get_tipos_seguros_cacheados(db, skip, limit)
 
 @router.get("/{id_tipo}", response_model=schemas.TipoSeguro)
-def read_tipo_seguro(id_tipo: int, db: Session = Depends(get_db)):
-    db_tipo = db.query(models.TipoSeguro).filter(models.TipoSeguro.id_tipo == id_tipo).first()
+def read_tipo_seguro(
+    id_tipo: int,
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(get_current_active_user)
+):
+    db_tipo = crud_tipos.get_tipo_seguro(db, id_tipo)
     if db_tipo is None:
         raise HTTPException(status_code=404, detail="Tipo de seguro no encontrado")
     return db_tipo
 
 @router.put("/{id_tipo}", response_model=schemas.TipoSeguro)
-def update_tipo_seguro(id_tipo: int, tipo_seguro: schemas.TipoSeguroUpdate, db: Session = Depends(get_db)):
-    db_tipo = db.query(models.TipoSeguro).filter(models.TipoSeguro.id_tipo == id_tipo).first()
+def update_tipo_seguro(
+    id_tipo: int,
+    tipo_seguro: schemas.TipoSeguroUpdate,
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(get_current_active_user)
+):
+    db_tipo = crud_tipos.update_tipo_seguro(db, id_tipo, tipo_seguro)
     if db_tipo is None:
         raise HTTPException(status_code=404, detail="Tipo de seguro no encontrado")
-    
-    update_data = tipo_seguro.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_tipo, field, value)
-    
-    db.commit()
-    db.refresh(db_tipo)
     return db_tipo
 
 @router.delete("/{id_tipo}")
-def delete_tipo_seguro(id_tipo: int, db: Session = Depends(get_db)):
-    db_tipo = db.query(models.TipoSeguro).filter(models.TipoSeguro.id_tipo == id_tipo).first()
-    if db_tipo is None:
+def delete_tipo_seguro(
+    id_tipo: int,
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(get_current_active_user)
+):
+    if not crud_tipos.delete_tipo_seguro(db, id_tipo):
         raise HTTPException(status_code=404, detail="Tipo de seguro no encontrado")
-    
-    db.delete(db_tipo)
-    db.commit()
     return {"message": "Tipo de seguro eliminado"}
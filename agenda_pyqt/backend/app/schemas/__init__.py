@@ -25,12 +25,39 @@ from .movimiento import (
     MovimientoVigenciaBase,
     MovimientoVigenciaCreate,
     MovimientoVigenciaUpdate,
+    MovimientoBatchCreado,
+    MovimientoBatchResultado,
+    VencimientoDia,
+    Vencimientos,
+    RenovacionSolicitud,
+    Renovacion,
+    RenovacionResultado,
+    FilaBordereau,
+    ImportacionBordereau,
 )
 from .corredor import (
     Corredor,
     CorredorBase,
     CorredorCreate,
     CorredorUpdate,
+    CorredorResumen,
+    PrimaMoneda,
+)
+from .comision import (
+    TasaComision,
+    TasaComisionBase,
+    ComisionGrupo,
+    LiquidacionComisiones,
+)
+from .cuota import (
+    Cuota,
+    CuotaPago,
+    CuotaVencida,
+)
+from .tipo_cambio import (
+    TipoCambio,
+    TipoCambioBase,
+    Cotizacion,
 )
 from .tipo_seguro import (
     TipoSeguro,
@@ -48,9 +75,18 @@ __all__ = [
     'Usuario', 'UsuarioCreate', 'UsuarioUpdate', 'UsuarioBase',
     'User', 'UserCreate', 'UserUpdate', 'UserBase',
     # Corredor schemas
-    'Corredor', 'CorredorCreate', 'CorredorUpdate', 'CorredorBase',
+    'Corredor', 'CorredorCreate', 'CorredorUpdate', 'CorredorBase', 'CorredorResumen', 'PrimaMoneda',
     # MovimientoVigencia schemas
     'MovimientoVigencia', 'MovimientoVigenciaCreate', 'MovimientoVigenciaUpdate', 'MovimientoVigenciaBase',
+    'MovimientoBatchCreado', 'MovimientoBatchResultado',
+    'VencimientoDia', 'Vencimientos', 'RenovacionSolicitud', 'Renovacion', 'RenovacionResultado',
+    'FilaBordereau', 'ImportacionBordereau',
+    # Comisiones schemas
+    'TasaComision', 'TasaComisionBase', 'ComisionGrupo', 'LiquidacionComisiones',
+    # Cuotas schemas
+    'Cuota', 'CuotaPago', 'CuotaVencida',
+    # TipoCambio schemas
+    'TipoCambio', 'TipoCambioBase', 'Cotizacion',
     # TipoSeguro schemas
     'TipoSeguro', 'TipoSeguroCreate', 'TipoSeguroUpdate', 'TipoSeguroBase',
 ]
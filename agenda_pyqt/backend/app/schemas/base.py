@@ -24,3 +24,8 @@ def validate_email(value: Optional[str]) -> Optional[str]:
     if not re.match(EMAIL_REGEX, value.lower()):
         raise ValueError('Formato de email inválido')
     return value.lower()
+
+class ErrorFila(BaseModel):
+    """Error asociado a un elemento de una operación por lotes."""
+    indice: int = Field(description="Posición del elemento en el lote (desde 0)")
+    error: str = Field(description="Motivo por el que el elemento no se procesó")
@@ -1,17 +1,17 @@
 """
 Schemas relacionados con la entidad Cliente.
 """
-from datetime import date, datetime
+from datetime import date, datetime, timezone
 from typing import Optional, List
 from uuid import UUID
 from pydantic import BaseModel, Field, field_validator, ConfigDict, constr
 
-from .base import validate_phone, validate_email
+from .base import validate_phone, validate_email, ErrorFila
 from .movimiento import MovimientoVigencia
 
 class ClienteBase(BaseModel):
     """Modelo base para clientes con validaciones de campos."""
-    nombres: Optional[str] = Field(default="", max_length=100, description="Nombres del cliente")
+    nombres: str = Field(default="", max_length=100, description="Nombres del cliente")
     apellidos: str = Field(max_length=100, description="Apellidos del cliente")
     tipo_documento: str = Field(max_length=50, description="Tipo de documento de identidad")
     numero_documento: str = Field(max_length=50, description="Número de documento")
@@ -83,3 +83,41 @@ class ClientePorCorredor(BaseModel):
 
     class Config:
         from_attributes = True
+
+class ClienteBusqueda(BaseModel):
+    """Schema para resultados de la búsqueda de clientes, ordenados por relevancia"""
+    id: UUID
+    numero_cliente: int
+    nombres: str
+    apellidos: str
+    numero_documento: str
+    mail: str
+    corredor: Optional[int] = None
+    relevancia: float = Field(description="Similitud entre el término buscado y el cliente (0 a 1)")
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ClienteBulkCreado(BaseModel):
+    """Cliente creado en un alta masiva"""
+    indice: int = Field(description="Posición del cliente en el lote (desde 0)")
+    id: UUID
+    numero_cliente: int
+
+class ClienteBulkResultado(BaseModel):
+    """Resultado de un alta masiva de clientes"""
+    creados: List[ClienteBulkCreado] = []
+    errores: List[ErrorFila] = []
+
+class ImportacionClientes(BaseModel):
+    """Estado y progreso de una importación de clientes desde CSV/XLSX"""
+    id: str
+    formato: str = Field(description="Formato del archivo: csv o xlsx")
+    estado: str = Field(default="pendiente", description="pendiente, procesando, terminada o fallida")
+    filas_procesadas: int = 0
+    insertados: int = 0
+    actualizados: int = 0
+    errores: int = 0
+    detalle: Optional[str] = Field(default=None, description="Motivo del fallo, si la importación falló")
+    fecha_inicio: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    fecha_fin: Optional[datetime] = None
+    ruta_errores: Optional[str] = Field(default=None, exclude=True)
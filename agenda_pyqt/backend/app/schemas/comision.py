@@ -0,0 +1,35 @@
+"""
+Schemas de tasas y liquidaciones de comisiones.
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict
+
+class TasaComisionBase(BaseModel):
+    corredor: Optional[int] = Field(default=None, description="Número de corredor (None: tasa general del tipo)")
+    tipo_seguro_id: int
+    porcentaje: float = Field(ge=0, le=100, description="Porcentaje sobre la prima")
+
+class TasaComision(TasaComisionBase):
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ComisionGrupo(BaseModel):
+    """Totales de la liquidación de un usuario con un corredor en una moneda."""
+    usuario_id: int = Field(description="Usuario que dio de alta a los clientes")
+    corredor: int = Field(description="Número de corredor (0: sin corredor)")
+    moneda: str = Field(description="Moneda ('' si no se indicó)")
+    cantidad: int = Field(description="Cantidad de movimientos")
+    total_prima: float
+    total_comision: float = Field(description="Comisión según tasas_comision")
+    comision_usuario: float = Field(description="Parte de la comisión según el porcentaje del usuario")
+    total_prima_base: Optional[float] = Field(default=None, description="Prima en la moneda base (None si falta cotización)")
+    total_comision_base: Optional[float] = Field(default=None, description="Comisión en la moneda base")
+
+class LiquidacionComisiones(BaseModel):
+    anio: int
+    mes: int
+    cerrado: bool = Field(description="El período ya terminó")
+    movimientos: int = Field(description="Movimientos del período")
+    actualizados: int = Field(description="Movimientos cuya comisión cambió en esta liquidación")
+    grupos: List[ComisionGrupo]
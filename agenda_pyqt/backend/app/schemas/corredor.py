@@ -1,6 +1,7 @@
 """
 Schemas relacionados con la entidad Corredor.
 """
+from datetime import date
 from typing import Optional, List
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 
@@ -55,3 +56,18 @@ class Corredor(CorredorBase):
     movimientos: List[MovimientoVigencia] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+class PrimaMoneda(BaseModel):
+    """Pólizas activas de un corredor en una moneda."""
+    moneda: str = Field(description="Moneda de las primas ('' si no se indicó)")
+    cantidad: int = Field(description="Cantidad de pólizas activas")
+    total_prima: float = Field(description="Suma de las primas")
+
+class CorredorResumen(BaseModel):
+    """Indicadores de la cartera de un corredor."""
+    numero: int
+    clientes: int = Field(description="Clientes asignados al corredor")
+    polizas_activas: int = Field(description="Versiones actuales de póliza que no vencieron")
+    vencen_proximos: int = Field(description="Pólizas activas que vencen hasta la fecha 'hasta'")
+    hasta: date = Field(description="Último día del período de vencimientos")
+    primas: List[PrimaMoneda] = []
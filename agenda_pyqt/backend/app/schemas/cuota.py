@@ -0,0 +1,38 @@
+"""
+Schemas de las cuotas de los movimientos.
+"""
+from datetime import date
+from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
+
+class Cuota(BaseModel):
+    id: int
+    movimiento_id: int
+    numero: int = Field(description="Número de cuota (1..cantidad)")
+    monto: float
+    fecha_vencimiento: date
+    pagada: bool
+    fecha_pago: Optional[date] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class CuotaPago(BaseModel):
+    """Registro (o anulación) del pago de una cuota."""
+    pagada: bool = True
+    fecha_pago: Optional[date] = Field(default=None, description="Por defecto, hoy (si pagada)")
+
+class CuotaVencida(BaseModel):
+    """Cuota impaga con vencimiento pasado, con los datos de la póliza para la cobranza."""
+    id: int
+    movimiento_id: int
+    numero: int
+    monto: float
+    fecha_vencimiento: date
+    dias_atraso: int
+    corredor: Optional[int] = Field(default=None, description="Número de corredor")
+    numero_poliza: str
+    moneda: Optional[str] = None
+    cliente: int = Field(description="Número de cliente")
+    cliente_nombre: str
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,9 +1,12 @@
 """
 Schemas relacionados con la entidad MovimientoVigencia.
 """
-from datetime import date
-from typing import Optional
-from pydantic import BaseModel, Field, ConfigDict, conint
+from datetime import date, datetime, timezone
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field, ConfigDict, conint, field_validator, model_validator
+
+from .base import ErrorFila
 
 class MovimientoVigenciaBase(BaseModel):
     """Modelo base para movimientos de vigencia."""
@@ -49,3 +52,110 @@ class MovimientoVigencia(MovimientoVigenciaBase):
     """Modelo completo de movimiento de vigencia."""
     Id_movimiento: int = Field(description="ID del movimiento")
     Cliente_nombre: str = Field(description="Nombre completo del cliente")
+    Actual: Optional[bool] = Field(default=None, description="Es la versión actual de la póliza")
+    Version_anterior: Optional[int] = Field(default=None, description="Movimiento al que reemplaza esta versión")
+
+class MovimientoBatchCreado(BaseModel):
+    """Movimiento creado en un alta por lote."""
+    indice: int = Field(description="Posición del movimiento en el lote (desde 0)")
+    Id_movimiento: int
+
+class MovimientoBatchResultado(BaseModel):
+    """Resultado de un alta de movimientos por lote."""
+    creados: List[MovimientoBatchCreado] = []
+    errores: List[ErrorFila] = []
+
+class VencimientoDia(BaseModel):
+    """Pólizas que vencen un día, por moneda."""
+    fecha: date
+    moneda: str = Field(description="Moneda de las primas ('' si no se indicó)")
+    cantidad: int = Field(description="Cantidad de pólizas que vencen ese día")
+    total_prima: float = Field(description="Suma de las primas")
+
+    model_config = ConfigDict(from_attributes=True)
+
+class Vencimientos(BaseModel):
+    """Vencimientos de un período: resumen por día y detalle de las pólizas."""
+    desde: date
+    hasta: date
+    corredor: Optional[int] = None
+    dias: List[VencimientoDia] = []
+    movimientos: List[MovimientoVigencia] = []
+
+class RenovacionSolicitud(BaseModel):
+    """Parámetros de una renovación masiva."""
+    desde: date = Field(description="Renovar las pólizas que vencen desde esta fecha")
+    hasta: date = Field(description="... hasta esta fecha (inclusive)")
+    corredor: Optional[int] = Field(default=None, description="Limitar a un corredor")
+    dry_run: bool = Field(default=True, description="Sólo informar lo que se crearía, sin guardar")
+
+class Renovacion(BaseModel):
+    """Movimiento generado (o a generar, en dry-run) por una renovación."""
+    id: Optional[int] = Field(default=None, description="Id del movimiento creado (None en dry-run)")
+    movimiento_origen: Optional[int] = Field(default=None, description="Movimiento renovado (sólo en dry-run)")
+    cliente_id: UUID
+    corredor_id: Optional[int] = None
+    tipo_seguro_id: int
+    numero_poliza: str
+    moneda: Optional[str] = None
+    prima: float
+    suma_asegurada: float
+    fecha_inicio: date
+    fecha_vencimiento: date
+
+    model_config = ConfigDict(from_attributes=True)
+
+class RenovacionResultado(BaseModel):
+    """Resultado de una renovación masiva."""
+    dry_run: bool
+    cantidad: int = Field(description="Movimientos creados (o que se crearían)")
+    renovaciones: List[Renovacion] = []
+
+class FilaBordereau(BaseModel):
+    """Póliza o endoso informado por una aseguradora en su bordereau mensual."""
+    numero_documento: str = Field(max_length=50, description="Documento del cliente")
+    codigo: str = Field(max_length=5, description="Código del tipo de seguro en la aseguradora")
+    numero_poliza: str = Field(min_length=1, max_length=100)
+    endoso: Optional[str] = Field(default=None, max_length=100)
+    fecha_inicio: date
+    fecha_vencimiento: date
+    moneda: Optional[str] = Field(default=None, max_length=10)
+    suma_asegurada: float
+    prima: float
+    cuotas: Optional[int] = Field(default=None, ge=1)
+    corredor: Optional[int] = Field(default=None, description="Por defecto, el corredor del cliente")
+    carpeta: Optional[str] = Field(default=None, max_length=100)
+    observaciones: Optional[str] = Field(default=None, max_length=500)
+
+    @field_validator('fecha_inicio', 'fecha_vencimiento', mode='before')
+    def validate_fecha(cls, v):
+        # Las aseguradoras suelen enviar las fechas como dd/mm/aaaa
+        # (sin strptime, que es lento para cientos de miles de filas)
+        if isinstance(v, str) and "/" in v:
+            partes = v.split("/")
+            if len(partes) != 3 or not all(parte.isdigit() for parte in partes):
+                raise ValueError("la fecha debe tener el formato dd/mm/aaaa")
+            dia, mes, anio = map(int, partes)
+            return date(anio, mes, dia)
+        return v
+
+    @model_validator(mode='after')
+    def validate_vigencia(self):
+        if self.fecha_vencimiento <= self.fecha_inicio:
+            raise ValueError("fecha_vencimiento debe ser posterior a fecha_inicio")
+        return self
+
+class ImportacionBordereau(BaseModel):
+    """Estado y progreso de la ingesta de un bordereau de una aseguradora"""
+    id: str
+    aseguradora: str
+    formato: str = Field(description="Formato del archivo: csv o xlsx")
+    estado: str = Field(default="pendiente", description="pendiente, procesando, terminada o fallida")
+    filas_procesadas: int = 0
+    insertados: int = 0
+    actualizados: int = 0
+    errores: int = 0
+    detalle: Optional[str] = Field(default=None, description="Motivo del fallo, si la ingesta falló")
+    fecha_inicio: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    fecha_fin: Optional[datetime] = None
+    ruta_errores: Optional[str] = Field(default=None, exclude=True)
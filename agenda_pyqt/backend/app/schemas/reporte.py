@@ -0,0 +1,22 @@
+"""
+Schemas de los reportes de producción.
+"""
+from datetime import date
+from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
+
+class ReporteProduccionFila(BaseModel):
+    """Totales de un grupo del reporte; las dimensiones no agrupadas quedan en None."""
+    mes: Optional[date] = Field(default=None, description="Primer día del mes de inicio de vigencia")
+    corredor: Optional[int] = Field(default=None, description="Número de corredor (0: sin corredor)")
+    tipo_seguro: Optional[int] = Field(default=None, description="Id del tipo de seguro")
+    moneda: Optional[str] = None
+    cantidad: int = Field(description="Cantidad de movimientos")
+    total_prima: float
+    total_suma_asegurada: float
+    total_prima_reporte: Optional[float] = Field(
+        default=None, description="Prima convertida a moneda_reporte (si se pidió y hay cotizaciones)"
+    )
+    total_suma_asegurada_reporte: Optional[float] = None
+
+    model_config = ConfigDict(from_attributes=True)
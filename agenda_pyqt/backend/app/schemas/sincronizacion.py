@@ -0,0 +1,27 @@
+"""
+Schemas para la sincronización incremental.
+"""
+from datetime import datetime
+from typing import List
+from pydantic import BaseModel, Field, ConfigDict
+
+from .cliente import Cliente
+from .corredor import Corredor
+from .movimiento import MovimientoVigencia
+
+class RegistroEliminado(BaseModel):
+    """Registro borrado después de la fecha pedida."""
+    tabla: str = Field(description="clientes, corredores o movimientos_vigencias")
+    registro_id: str = Field(description="Clave primaria del registro borrado")
+    fecha_eliminacion: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class Sincronizacion(BaseModel):
+    """Cambios ocurridos desde una fecha."""
+    desde: datetime
+    hasta: datetime = Field(description="Valor a enviar como 'since' en la próxima consulta")
+    clientes: List[Cliente] = []
+    corredores: List[Corredor] = []
+    movimientos: List[MovimientoVigencia] = []
+    eliminados: List[RegistroEliminado] = []
@@ -0,0 +1,21 @@
+"""
+Schemas de los tipos de cambio.
+"""
+from datetime import date
+from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
+
+class TipoCambioBase(BaseModel):
+    moneda: str = Field(max_length=10, description="Moneda cotizada ('U$S', ...)")
+    fecha: date
+    valor: float = Field(gt=0, description="Unidades de la moneda base por unidad de la moneda")
+
+class TipoCambio(TipoCambioBase):
+    model_config = ConfigDict(from_attributes=True)
+
+class Cotizacion(BaseModel):
+    """Cotización vigente de una moneda en una fecha."""
+    moneda: str
+    fecha: date
+    moneda_base: str
+    valor: Optional[float] = Field(default=None, description="None si no hay cotización a esa fecha")
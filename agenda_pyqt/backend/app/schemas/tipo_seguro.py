@@ -1,29 +1,36 @@
 """
 Schemas relacionados con la entidad TipoSeguro.
+
+La API usa nombres en minúsculas; las columnas del modelo empiezan con
+mayúscula (Id_tipo, Aseguradora, ...), por eso los campos también se leen
+con ese nombre al validar desde el modelo.
 """
 from typing import Optional
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict
 
 class TipoSeguroBase(BaseModel):
     """Modelo base para tipos de seguro."""
-    aseguradora: str = Field(description="Nombre de la aseguradora")
-    codigo: str = Field(description="Código del tipo de seguro")
-    descripcion: str = Field(description="Descripción del tipo de seguro")
+    aseguradora: str = Field(max_length=15, validation_alias=AliasChoices("aseguradora", "Aseguradora"),
+                             description="Nombre de la aseguradora")
+    codigo: str = Field(max_length=5, validation_alias=AliasChoices("codigo", "Codigo"),
+                        description="Código del tipo de seguro")
+    descripcion: str = Field(max_length=30, validation_alias=AliasChoices("descripcion", "Descripcion"),
+                             description="Descripción del tipo de seguro")
 
     model_config = ConfigDict(from_attributes=True)
 
 class TipoSeguroCreate(TipoSeguroBase):
     """Modelo para crear nuevos tipos de seguro."""
-    id_tipo: int = Field(description="ID del tipo de seguro")
+    id_tipo: int = Field(validation_alias=AliasChoices("id_tipo", "Id_tipo"), description="ID del tipo de seguro")
 
 class TipoSeguroUpdate(BaseModel):
     """Modelo para actualizar tipos de seguro existentes."""
-    aseguradora: Optional[str] = Field(None)
-    codigo: Optional[str] = Field(None)
-    descripcion: Optional[str] = Field(None)
+    aseguradora: Optional[str] = Field(None, max_length=15)
+    codigo: Optional[str] = Field(None, max_length=5)
+    descripcion: Optional[str] = Field(None, max_length=30)
 
     model_config = ConfigDict(from_attributes=True)
 
 class TipoSeguro(TipoSeguroBase):
     """Modelo completo de tipo de seguro."""
-    id_tipo: int = Field(description="ID del tipo de seguro")
+    id_tipo: int = Field(validation_alias=AliasChoices("id_tipo", "Id_tipo"), description="ID del tipo de seguro")
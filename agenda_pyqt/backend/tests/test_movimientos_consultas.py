@@ -0,0 +1,111 @@
+"""
+Pruebas de regresión de la cantidad de consultas SQL de los listados de movimientos.
+
+A diferencia del resto de las pruebas, no necesitan el servidor levantado: montan
+el router de movimientos sobre una base SQLite en memoria y cuentan las sentencias
+que ejecuta cada petición. La cantidad no debe depender del tamaño de la página
+(una carga diferida del cliente por fila la haría crecer con cada movimiento).
+"""
+import uuid
+from datetime import date
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models import Cliente, Corredor, MovimientoVigencia, TipoSeguro
+from app.routers import movimientos
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+SesionPrueba = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+Base.metadata.create_all(bind=engine)
+
+def get_db_prueba():
+    db = SesionPrueba()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app = FastAPI()
+app.include_router(movimientos.router, prefix="/movimientos")
+app.dependency_overrides[movimientos.get_db] = get_db_prueba
+client = TestClient(app)
+
+def crear_datos(cantidad_clientes=30, movimientos_por_cliente=3):
+    """Carga corredor, tipo de seguro, clientes y sus movimientos. Devuelve los ids de los clientes."""
+    db = SesionPrueba()
+    db.add(Corredor(numero=1, apellidos="PEREZ", documento="1", direccion="CALLE 1",
+                    localidad="MONTEVIDEO", mail="corredor@prueba.com"))
+    db.add(TipoSeguro(Id_tipo=1, Aseguradora="BSE", Codigo="AUT", Descripcion="AUTOMOVILES"))
+    ids = []
+    for i in range(1, cantidad_clientes + 1):
+        cliente = Cliente(id=uuid.uuid4(), numero_cliente=i, nombres=f"NOMBRE{i}", apellidos=f"APELLIDO{i}",
+                          tipo_documento="CI", numero_documento=f"{i:08d}", fecha_nacimiento=date(1980, 1, 1),
+                          direccion="CALLE 123", telefonos="2600000", movil="099000000",
+                          mail=f"cliente{i}@prueba.com", corredor=1, creado_por_id=1, modificado_por_id=1)
+        db.add(cliente)
+        ids.append(cliente.id)
+        for j in range(movimientos_por_cliente):
+            db.add(MovimientoVigencia(cliente_id=cliente.id, corredor_id=1, tipo_seguro_id=1, carpeta="C",
+                                      numero_poliza=f"P{i}-{j}", fecha_inicio=date(2024, 1, 1),
+                                      fecha_vencimiento=date(2025, 1, 1), moneda="UYU",
+                                      suma_asegurada=1000, prima=100))
+    db.commit()
+    db.close()
+    return ids
+
+IDS_CLIENTES = crear_datos()
+
+def contar_sentencias(url):
+    """Hace la petición y devuelve (respuesta, cantidad de sentencias SQL ejecutadas)."""
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return response, len(sentencias)
+
+def test_listado_cantidad_fija_de_consultas():
+    """El listado de movimientos ejecuta las mismas sentencias con 1, 10 o 90 filas"""
+    cantidades = set()
+    for limit in (1, 10, 90):
+        response, sentencias = contar_sentencias(f"/movimientos/?limit={limit}")
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        assert response.json()[0]["Cliente_nombre"] == "NOMBRE1 APELLIDO1"
+        cantidades.add(sentencias)
+    assert len(cantidades) == 1, f"La cantidad de sentencias varía con la página: {cantidades}"
+
+def test_movimientos_por_cliente_cantidad_fija_de_consultas():
+    """Los movimientos de un cliente se obtienen con una cantidad fija de sentencias"""
+    db = SesionPrueba()
+    cliente_id = IDS_CLIENTES[0]
+    antes, sentencias_antes = contar_sentencias(f"/movimientos/cliente/{cliente_id}")
+    for j in range(20):
+        db.add(MovimientoVigencia(cliente_id=cliente_id, corredor_id=1, tipo_seguro_id=1, carpeta="C",
+                                  numero_poliza=f"EXTRA-{j}", fecha_inicio=date(2024, 1, 1),
+                                  fecha_vencimiento=date(2025, 1, 1), moneda="UYU",
+                                  suma_asegurada=1000, prima=100))
+    db.commit()
+    db.close()
+
+    despues, sentencias_despues = contar_sentencias(f"/movimientos/cliente/{cliente_id}")
+    assert antes.status_code == despues.status_code == 200
+    assert len(despues.json()) == len(antes.json()) + 20
+    assert all(mov["Cliente"] == 1 for mov in despues.json())
+    assert sentencias_despues == sentencias_antes
+
+if __name__ == "__main__":
+    print("Iniciando pruebas de consultas de movimientos...")
+    test_listado_cantidad_fija_de_consultas()
+    test_movimientos_por_cliente_cantidad_fija_de_consultas()
+    print("OK")
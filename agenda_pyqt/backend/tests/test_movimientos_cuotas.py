@@ -0,0 +1,148 @@
+"""
+Pruebas del plan de cuotas de un movimiento al crearlo y al modificarlo, y del
+rechazo de un alta repetida.
+
+Igual que test_movimientos_consultas, no necesitan el servidor levantado: montan
+el router de movimientos sobre una base SQLite en memoria.
+"""
+import uuid
+from datetime import date
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models import Cliente, Corredor, Cuota, TipoSeguro
+from app.routers import movimientos
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+SesionPrueba = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+Base.metadata.create_all(bind=engine)
+
+def get_db_prueba():
+    db = SesionPrueba()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app = FastAPI()
+app.include_router(movimientos.router, prefix="/movimientos")
+app.dependency_overrides[movimientos.get_db] = get_db_prueba
+client = TestClient(app)
+
+def crear_datos():
+    """Carga el corredor, el tipo de seguro y el cliente número 1."""
+    db = SesionPrueba()
+    db.add(Corredor(numero=1, apellidos="PEREZ", documento="1", direccion="CALLE 1",
+                    localidad="MONTEVIDEO", mail="corredor@prueba.com"))
+    db.add(TipoSeguro(Id_tipo=1, Aseguradora="BSE", Codigo="AUT", Descripcion="AUTOMOVILES"))
+    db.add(Cliente(id=uuid.uuid4(), numero_cliente=1, nombres="NOMBRE1", apellidos="APELLIDO1",
+                   tipo_documento="CI", numero_documento="00000001", fecha_nacimiento=date(1980, 1, 1),
+                   direccion="CALLE 123", telefonos="2600000", movil="099000000",
+                   mail="cliente1@prueba.com", corredor=1, creado_por_id=1, modificado_por_id=1))
+    db.commit()
+    db.close()
+
+crear_datos()
+
+def datos_movimiento(poliza, **cambios):
+    datos = {
+        "FechaMov": "2025-01-10", "Corredor": 1, "Cliente": 1, "Tipo_seguro": 1, "Carpeta": "C",
+        "Poliza": poliza, "Vto_Desde": "2025-01-10", "Vto_Hasta": "2026-01-10", "Moneda": "UYU",
+        "Premio": 300, "Cuotas": 3,
+    }
+    datos.update(cambios)
+    return datos
+
+def leer_cuotas(movimiento_id):
+    """(numero, monto, fecha_vencimiento, pagada) de las cuotas del movimiento."""
+    db = SesionPrueba()
+    try:
+        return [
+            (cuota.numero, cuota.monto, cuota.fecha_vencimiento, cuota.pagada)
+            for cuota in db.query(Cuota).filter(Cuota.movimiento_id == movimiento_id).order_by(Cuota.numero)
+        ]
+    finally:
+        db.close()
+
+def pagar_primera_cuota(movimiento_id):
+    db = SesionPrueba()
+    db.query(Cuota).filter(Cuota.movimiento_id == movimiento_id, Cuota.numero == 1).update(
+        {"pagada": True, "fecha_pago": date(2025, 1, 15)}
+    )
+    db.commit()
+    db.close()
+
+def test_alta_genera_cuotas():
+    """El alta genera una cuota mensual por cada una indicada, que suman el premio"""
+    response = client.post("/movimientos/", json=datos_movimiento("CUO-1"))
+    assert response.status_code == 200
+    assert leer_cuotas(response.json()["Id_movimiento"]) == [
+        (1, 100.0, date(2025, 1, 10), False),
+        (2, 100.0, date(2025, 2, 10), False),
+        (3, 100.0, date(2025, 3, 10), False),
+    ]
+
+def test_modificar_premio_rehace_cuotas_impagas():
+    """Un PUT que cambia el premio rehace las cuotas impagas y conserva la pagada"""
+    movimiento_id = client.post("/movimientos/", json=datos_movimiento("CUO-2")).json()["Id_movimiento"]
+    pagar_primera_cuota(movimiento_id)
+
+    response = client.put(f"/movimientos/{movimiento_id}", json=datos_movimiento("CUO-2", Premio=600))
+    assert response.status_code == 200
+    assert response.json()["Premio"] == 600
+    assert leer_cuotas(movimiento_id) == [
+        (1, 100.0, date(2025, 1, 10), True),
+        (2, 200.0, date(2025, 2, 10), False),
+        (3, 200.0, date(2025, 3, 10), False),
+    ]
+
+def test_modificar_inicio_mueve_vencimientos():
+    """Un PUT que cambia el inicio de vigencia mueve los vencimientos de las cuotas impagas"""
+    movimiento_id = client.post("/movimientos/", json=datos_movimiento("CUO-3", Cuotas=2)).json()["Id_movimiento"]
+
+    response = client.put(f"/movimientos/{movimiento_id}",
+                          json=datos_movimiento("CUO-3", Cuotas=2, Vto_Desde="2025-03-05"))
+    assert response.status_code == 200
+    assert leer_cuotas(movimiento_id) == [
+        (1, 150.0, date(2025, 3, 5), False),
+        (2, 150.0, date(2025, 4, 5), False),
+    ]
+
+def test_modificar_otros_campos_no_toca_cuotas():
+    """Un PUT que no cambia premio, cuotas ni inicio deja las cuotas como estaban"""
+    movimiento_id = client.post("/movimientos/", json=datos_movimiento("CUO-4")).json()["Id_movimiento"]
+    pagar_primera_cuota(movimiento_id)
+    antes = leer_cuotas(movimiento_id)
+
+    response = client.put(f"/movimientos/{movimiento_id}",
+                          json=datos_movimiento("CUO-4", Observaciones="Cambio de carpeta", Carpeta="D"))
+    assert response.status_code == 200
+    assert leer_cuotas(movimiento_id) == antes
+
+def test_alta_repetida_devuelve_conflicto():
+    """Un alta con la misma póliza, endoso e inicio que otra devuelve 409 sin crear cuotas"""
+    assert client.post("/movimientos/", json=datos_movimiento("CUO-5")).status_code == 200
+
+    response = client.post("/movimientos/", json=datos_movimiento("CUO-5", Premio=900))
+    assert response.status_code == 409
+    assert "CUO-5" in response.json()["detail"]
+
+def test_alta_cliente_inexistente_devuelve_404():
+    """Un alta para un cliente que no existe devuelve 404 y no un error interno"""
+    response = client.post("/movimientos/", json=datos_movimiento("CUO-6", Cliente=999))
+    assert response.status_code == 404
+
+if __name__ == "__main__":
+    print("Iniciando pruebas de cuotas de movimientos...")
+    test_alta_genera_cuotas()
+    test_modificar_premio_rehace_cuotas_impagas()
+    test_modificar_inicio_mueve_vencimientos()
+    test_modificar_otros_campos_no_toca_cuotas()
+    test_alta_repetida_devuelve_conflicto()
+    test_alta_cliente_inexistente_devuelve_404()
+    print("OK")
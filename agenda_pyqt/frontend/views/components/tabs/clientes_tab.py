@@ -8,10 +8,17 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Campos del cliente que se muestran en la tabla
+CAMPOS_TABLA_CLIENTES = [
+    "numero_cliente", "nombres", "apellidos", "tipo_documento", "numero_documento",
+    "fecha_nacimiento", "telefonos", "movil", "mail", "direccion", "localidad",
+]
+
 class ClientesTab(QWidget):
     def __init__(self, token):
         super().__init__()
         self.token = token
+        self.etag = None  # ETag de la última lista cargada
         self.setup_ui()
         
     def setup_ui(self):
@@ -86,13 +93,22 @@ class ClientesTab(QWidget):
         """Carga los clientes desde la API"""
         try:
             logger.debug("Intentando cargar clientes...")
+            headers = {"Authorization": f"Bearer {self.token}"}
+            if self.etag:
+                headers["If-None-Match"] = self.etag
             response = requests.get(
                 "http://localhost:8000/api/v1/clientes/",
-                headers={"Authorization": f"Bearer {self.token}"}
+                headers=headers,
+                # Pedir sólo las columnas que muestra la tabla
+                params={"fields": ",".join(CAMPOS_TABLA_CLIENTES)}
             )
             logger.debug(f"Respuesta del servidor: {response.status_code}")
             
+            if response.status_code == 304:
+                logger.debug("Sin cambios desde la última carga de clientes")
+                return
             response.raise_for_status()
+            self.etag = response.headers.get("ETag")
             clientes = response.json()
             logger.debug(f"Clientes cargados: {len(clientes)}")
             
@@ -12,6 +12,7 @@ class CorredoresTab(QWidget):
     def __init__(self, token):
         super().__init__()
         self.token = token
+        self.etag = None  # ETag de la última lista cargada
         self.setup_ui()
         
     def setup_ui(self):
@@ -85,13 +86,20 @@ class CorredoresTab(QWidget):
         """Carga los corredores desde la API"""
         try:
             logger.debug(f"Intentando cargar corredores con token: {self.token[:10]}...")
+            headers = {"Authorization": f"Bearer {self.token}"}
+            if self.etag:
+                headers["If-None-Match"] = self.etag
             response = requests.get(
                 "http://localhost:8000/api/v1/corredores/",
-                headers={"Authorization": f"Bearer {self.token}"}
+                headers=headers
             )
             logger.debug(f"Respuesta del servidor: {response.status_code}")
             
+            if response.status_code == 304:
+                logger.debug("Sin cambios desde la última carga de corredores")
+                return
             response.raise_for_status()
+            self.etag = response.headers.get("ETag")
             corredores = response.json()
             logger.debug(f"Corredores cargados: {len(corredores)}")
             
@@ -12,6 +12,7 @@ class MovimientosTab(QWidget):
     def __init__(self, token):
         super().__init__()
         self.token = token
+        self.etag = None  # ETag de la última lista cargada
         self.setup_ui()
         
     def setup_ui(self):
@@ -87,13 +88,20 @@ class MovimientosTab(QWidget):
         """Carga los movimientos desde la API"""
         try:
             logger.debug("Intentando cargar movimientos...")
+            headers = {"Authorization": f"Bearer {self.token}"}
+            if self.etag:
+                headers["If-None-Match"] = self.etag
             response = requests.get(
                 "http://localhost:8000/api/v1/movimientos/",
-                headers={"Authorization": f"Bearer {self.token}"}
+                headers=headers
             )
             logger.debug(f"Respuesta del servidor: {response.status_code}")
             
+            if response.status_code == 304:
+                logger.debug("Sin cambios desde la última carga de movimientos")
+                return
             response.raise_for_status()
+            self.etag = response.headers.get("ETag")
             movimientos = response.json()
             logger.debug(f"Movimientos cargados: {len(movimientos)}")
             